@@ -10,8 +10,16 @@ from homeassistant.core import HomeAssistant
 
 from . import registry
 from .client import CudyClient
-from .const import DOMAIN, PLATFORMS as DEFAULT_PLATFORMS
+from .const import (
+    CONF_MAX_CONCURRENT_REQUESTS,
+    DEFAULT_MAX_CONCURRENT_REQUESTS,
+    DOMAIN,
+    MODULE_SYSTEM,
+    PLATFORMS as DEFAULT_PLATFORMS,
+)
 from .model_detect import detect_model
+from .services import async_setup_services
+from .storage import CudyStorage
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -25,15 +33,25 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         username=entry.data.get("username"),
         password=entry.data.get("password"),
         use_https=use_https,
+        # one pooled connection per request the poll may run in parallel
+        connection_limit=entry.options.get(
+            CONF_MAX_CONCURRENT_REQUESTS, DEFAULT_MAX_CONCURRENT_REQUESTS
+        ),
     )
 
+    integration = registry.create_integration(hass, entry, client)
+
+    # the only refresh during startup; model detection reuses its system page
+    await integration.async_setup()
+
+    system = (integration.coordinator.data or {}).get(MODULE_SYSTEM)
     try:
-        model = await detect_model(client)
+        model = await detect_model(client, system=system)
     except Exception:
         _LOGGER.debug("Model detection failed, falling back to Generic", exc_info=True)
         model = "Generic"
 
-    integration = await registry.create_model_integration(model, hass, entry, client)
+    registry.assign_model(integration, model)
 
     if hasattr(integration, "platforms") and getattr(integration, "platforms") is not None:
         platforms = list(getattr(integration, "platforms"))
@@ -53,27 +71,16 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
             _LOGGER.debug("Skipping missing platform module: %s.%s", __package__, platform)
     platforms = filtered
 
-    if hasattr(integration, "async_setup"):
-        try:
-            maybe_coro = integration.async_setup()
-            if inspect.isawaitable(maybe_coro):
-                await maybe_coro
-        except Exception:
-            _LOGGER.exception("Error while running integration.async_setup()")
-
-    coordinator = getattr(integration, "coordinator", None)
-    if coordinator is not None and hasattr(coordinator, "async_config_entry_first_refresh"):
-        try:
-            await coordinator.async_config_entry_first_refresh()
-        except Exception:
-            _LOGGER.debug("Coordinator first refresh failed (continuing setup)", exc_info=True)
-
     hass.data.setdefault(DOMAIN, {})[entry.entry_id] = {
         "client": client,
         "integration": integration,
         "coordinator": getattr(integration, "coordinator", None),
         "platforms": platforms,
     }
+    async_setup_services(hass)
+
+    # scan tiers, concurrency and tracked devices are read at setup
+    entry.async_on_unload(entry.add_update_listener(_async_reload_entry))
 
     try:
         await hass.config_entries.async_forward_entry_setups(entry, platforms)
@@ -83,6 +90,10 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     return True
 
 
+async def _async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     data: dict[str, Any] | None = hass.data.get(DOMAIN, {}).pop(entry.entry_id, None)
     if not data:
@@ -106,4 +117,8 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
             except Exception:
                 _LOGGER.debug("Error closing CudyClient", exc_info=True)
 
-    return True
\ No newline at end of file
+    return True
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    await CudyStorage(hass, entry.entry_id).async_remove()
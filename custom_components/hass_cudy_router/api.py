@@ -1,17 +1,173 @@
 from __future__ import annotations
 
-from typing import Any
+import asyncio
+import hashlib
+import logging
+import re
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Iterable
 
 from aiohttp import ClientResponseError
 
-from .client import CudyClient
+from .client import CudyClient, PageValidators
 from .const import *
+from .devices import attach_device_list
+from .metrics import PollMetrics, RequestTiming
 from .parser import parse_html
+from .tracing import record, span
+
+_LOGGER = logging.getLogger(__name__)
+
+# e.g. hass.async_add_executor_job
+Executor = Callable[..., Awaitable[Any]]
+
+# answers that say nothing about whether the router has the page
+_RETRY_STATUSES = frozenset({401, 403, 408, 429})
+# answers that say it does not
+_GONE_STATUSES = frozenset({404, 410})
+
+# per-request noise that never reaches the parsed data (login/CSRF tokens)
+_VOLATILE_RE = re.compile(
+    r'(name="(?:token|_csrf)"\s+value=")[^"]*(")|(\b(?:token|_csrf)\s*[:=]\s*[\'"])[^\'"]*([\'"])'
+)
+
+
+@dataclass
+class ParseStats:
+    """Time spent parsing pages off the event loop."""
+
+    jobs: int = 0
+    pages: int = 0
+    queue_seconds: float = 0.0
+    parse_seconds: float = 0.0
+    last_queue_seconds: float = 0.0
+    last_parse_seconds: float = 0.0
+    # pages whose body (or HTTP validators) matched the previous poll
+    unchanged_pages: int = 0
+    not_modified_pages: int = 0
+
+
+@dataclass
+class _CachedPage:
+    digest: bytes
+    parsed: Any
+    validators: PageValidators
+
+
+def page_digest(html: str, strip_volatile: bool = True) -> bytes:
+    """Fingerprint of a page body, ignoring per-request tokens if asked."""
+    if strip_volatile:
+        html = _VOLATILE_RE.sub(r"\1\2\3\4", html)
+    return hashlib.blake2b(html.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+
+
+def _parse_batch(
+    pages: dict[str, str],
+) -> tuple[dict[str, Any], dict[str, tuple[float, float]], float, float]:
+    """Parse every page of one poll; runs in the executor.
+
+    Also returns when each page's parse began and ended (perf_counter).
+    """
+    started = time.perf_counter()
+    parsed: dict[str, Any] = {}
+    spans: dict[str, tuple[float, float]] = {}
+    for module, html in pages.items():
+        begin = time.perf_counter()
+        parsed[module] = parse_html(module, html)
+        spans[module] = (begin, time.perf_counter())
+    return parsed, spans, started, time.perf_counter()
 
 
 class CudyApi:
-    def __init__(self, client: CudyClient) -> None:
+    def __init__(
+        self,
+        client: CudyClient,
+        max_concurrent_requests: int = DEFAULT_MAX_CONCURRENT_REQUESTS,
+        executor: Executor | None = None,
+        strip_volatile: bool = True,
+    ) -> None:
         self._client = client
+        self._executor = executor
+        self._strip_volatile = strip_volatile
+        self.parse_stats = ParseStats()
+        # rolling per-module request timings for the diagnostic sensors
+        self.metrics = PollMetrics()
+        # last body digest and parse result per module
+        self._pages: dict[str, _CachedPage] = {}
+        # small uhttpd instances choke on many parallel requests
+        self._max_concurrent_requests = max(1, int(max_concurrent_requests))
+
+        # modules the router serves; None until the first probe
+        self._capabilities: set[str] | None = None
+        self._capabilities_probed_at: float | None = None
+        # module -> empty answers in a row
+        self._misses: dict[str, int] = {}
+
+    @property
+    def capabilities(self) -> set[str] | None:
+        return self._capabilities
+
+    @property
+    def capabilities_probed_at(self) -> float | None:
+        return self._capabilities_probed_at
+
+    def restore_capabilities(self, modules: set[str] | None, probed_at: float | None) -> None:
+        """Seed the capability map, e.g. from storage."""
+        if not modules:
+            self.invalidate_capabilities()
+            return
+        self._capabilities = {m for m in modules if m in CAPABILITY_URLS}
+        self._capabilities_probed_at = probed_at
+
+    def invalidate_capabilities(self) -> None:
+        """Force the next poll to probe every module again."""
+        self._capabilities = None
+        self._capabilities_probed_at = None
+        self._misses.clear()
+        self._pages.clear()
+
+    def _probe_due(self) -> bool:
+        if self._capabilities is None or self._capabilities_probed_at is None:
+            return True
+        return time.time() - self._capabilities_probed_at >= CAPABILITY_REPROBE_INTERVAL
+
+    def _update_capabilities(
+        self,
+        polled: list[str],
+        answered: set[str],
+        transient: set[str],
+        gone: set[str],
+        probing: bool,
+    ) -> None:
+        """Drop modules only on a definitive answer.
+
+        404/410, or a known module coming back empty several polls in a
+        row. Server errors and auth failures keep the module, so a flaky
+        probe does not hide it until the next one.
+        """
+        # an empty poll most likely means the router was not answering
+        if not answered:
+            return
+        known = self._capabilities or set()
+        for module in polled:
+            if module in answered:
+                self._misses.pop(module, None)
+            elif module in transient:
+                continue
+            elif module in gone or module not in known:
+                self._misses[module] = CAPABILITY_MISSES_BEFORE_DROP
+            else:
+                self._misses[module] = self._misses.get(module, 0) + 1
+        dropped = {
+            module for module in polled
+            if self._misses.get(module, 0) >= CAPABILITY_MISSES_BEFORE_DROP
+        }
+        if probing:
+            self._capabilities = set(polled) - dropped
+            self._capabilities_probed_at = time.time()
+        elif dropped:
+            self._capabilities = known - dropped
 
     @staticmethod
     def luci(path: str) -> str:
@@ -19,20 +175,139 @@ class CudyApi:
             path = "/" + path
         return "/cgi-bin/luci" + path
 
-    async def get_data(self) -> dict[str, Any]:
+    async def _fetch_module(
+        self, module: str, semaphore: asyncio.Semaphore
+    ) -> tuple[Any, PageValidators | None, RequestTiming]:
+        url = CAPABILITY_URLS[module][0]
+        get_page = getattr(self._client, "get_page", None)
+        timing = RequestTiming()
+        queued = time.perf_counter()
+        with span(f"fetch {module}", "fetch", track=module):
+            async with semaphore:
+                timing.queue += time.perf_counter() - queued
+                record("wait for request slot", "queue", queued, time.perf_counter())
+                try:
+                    if not callable(get_page):
+                        return await self._client.get(self.luci(url)), None, timing
+                    cached = self._pages.get(module)
+                    validators = PageValidators(
+                        etag=cached.validators.etag if cached else None,
+                        last_modified=cached.validators.last_modified if cached else None,
+                    )
+                    html = await get_page(self.luci(url), validators, timing=timing)
+                    return html, validators, timing
+                except ClientResponseError as err:
+                    return None, PageValidators(status=err.status), timing
+
+    async def _parse_pages(self, pages: dict[str, str]) -> dict[str, Any]:
+        """Parse all pages of a poll in a single executor job."""
+        if not pages:
+            return {}
+
+        submitted = time.perf_counter()
+        if self._executor is not None:
+            parsed, spans, started, finished = await self._executor(_parse_batch, pages)
+        else:
+            loop = asyncio.get_running_loop()
+            parsed, spans, started, finished = await loop.run_in_executor(
+                None, _parse_batch, pages
+            )
+        record("wait for executor", "queue", submitted, started, track="parse")
+        for module, (begin, end) in spans.items():
+            self.metrics.record_parse(module, end - begin)
+            record(f"parse {module}", "parse", begin, end, track="parse", chars=len(pages[module]))
+
+        stats = self.parse_stats
+        stats.jobs += 1
+        stats.pages += len(pages)
+        stats.last_queue_seconds = max(0.0, started - submitted)
+        stats.last_parse_seconds = finished - started
+        stats.queue_seconds += stats.last_queue_seconds
+        stats.parse_seconds += stats.last_parse_seconds
+        _LOGGER.debug(
+            "Parsed %d pages in %.3fs (waited %.3fs for the executor)",
+            len(pages), stats.last_parse_seconds, stats.last_queue_seconds,
+        )
+        return parsed
+
+    async def get_data(self, modules: Iterable[str] | None = None) -> dict[str, Any]:
+        """Fetch and parse modules.
+
+        ``modules`` limits the poll to a subset of CAPABILITY_URLS. While a
+        capability probe is due every module is fetched regardless.
+        """
         out: dict[str, Any] = {}
+        poll_started = time.perf_counter()
+
+        wanted = set(CAPABILITY_URLS.keys()) if modules is None else set(modules)
+        probing = self._probe_due()
+        if probing:
+            modules = list(CAPABILITY_URLS.keys())
+        else:
+            modules = [
+                m for m in CAPABILITY_URLS.keys()
+                if m in wanted and m in self._capabilities
+            ]
+
+        semaphore = asyncio.Semaphore(self._max_concurrent_requests)
+        results = await asyncio.gather(
+            *(self._fetch_module(module, semaphore) for module in modules),
+            return_exceptions=True,
+        )
+
+        pages: dict[str, str] = {}
+        digests: dict[str, tuple[bytes, PageValidators]] = {}
+        parsed: dict[str, Any] = {}
+        transient: set[str] = set()
+        gone: set[str] = set()
+        stats = self.parse_stats
+        nbytes = 0
+        for module, result in zip(modules, results):
+            if isinstance(result, BaseException):
+                raise result
+            html, validators, timing = result
+            self.metrics.record_request(module, timing)
+            nbytes += timing.bytes
+            cached = self._pages.get(module)
+            if cached is not None and validators is not None and validators.not_modified:
+                stats.not_modified_pages += 1
+                parsed[module] = cached.parsed
+                continue
+            if not (isinstance(html, str) and html):
+                self._pages.pop(module, None)
+                status = validators.status if validators is not None else None
+                if status in _GONE_STATUSES:
+                    gone.add(module)
+                elif status is not None and (status >= 500 or status in _RETRY_STATUSES):
+                    transient.add(module)
+                continue
+            digest = page_digest(html, self._strip_volatile)
+            if cached is not None and cached.digest == digest:
+                stats.unchanged_pages += 1
+                parsed[module] = cached.parsed
+                continue
+            pages[module] = html
+            digests[module] = (digest, validators or PageValidators())
+
+        fresh = await self._parse_pages(pages)
+        for module, data in fresh.items():
+            digest, validators = digests[module]
+            self._pages[module] = _CachedPage(digest, data, validators)
+        parsed.update(fresh)
+        self.metrics.record_poll(time.perf_counter() - poll_started, nbytes)
+
+        for module in modules:
+            data = parsed.get(module)
+            if data is not None and len(data) > 0:
+                out[module] = data
+
+        self._update_capabilities(modules, set(out), transient, gone, probing)
 
-        for module in CAPABILITY_URLS.keys():
-            url = CAPABILITY_URLS[module][0]
-            try:
-                html = await self._client.get(self.luci(url))
-                if html is not None:
-                    data = parse_html(module, html)
-                    if len(data) > 0:
-                        out[module] = data
-            except ClientResponseError as err:
-                """No module detected"""
+        # consumers read the client table as devices -> device_list
+        rows = out.pop(MODULE_DEVICE_LIST, None)
+        if isinstance(rows, list):
+            out[MODULE_DEVICES] = attach_device_list(out.get(MODULE_DEVICES), rows)
         return out
 
     async def reboot(self) -> None:
-        await self._client.post(self.luci("/admin/system/reboot"), data={"reboot": "1"})
\ No newline at end of file
+        await self._client.post(self.luci("/admin/system/reboot"), data={"reboot": "1"})
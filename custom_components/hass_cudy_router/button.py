@@ -4,6 +4,7 @@ import logging
 
 from homeassistant.components.button import ButtonEntity, ButtonEntityDescription
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import EntityCategory
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.device_registry import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
@@ -19,27 +20,40 @@ REBOOT_BUTTON = ButtonEntityDescription(
     icon="mdi:restart",
 )
 
+REPROBE_BUTTON = ButtonEntityDescription(
+    key="reprobe",
+    translation_key="reprobe",
+    name="Rescan capabilities",
+    icon="mdi:magnify-scan",
+    entity_category=EntityCategory.DIAGNOSTIC,
+)
+
 
 async def async_setup_entry(
     hass: HomeAssistant,
     entry: ConfigEntry,
     async_add_entities: AddEntitiesCallback,
 ) -> None:
-    async_add_entities([CudyRebootButton(hass, entry)])
+    async_add_entities([CudyRebootButton(hass, entry), CudyReprobeButton(hass, entry)])
 
 
-class CudyRebootButton(ButtonEntity):
+class CudyButton(ButtonEntity):
     _attr_has_entity_name = True
 
-    def __init__(self, hass: HomeAssistant, entry: ConfigEntry) -> None:
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: ConfigEntry,
+        description: ButtonEntityDescription,
+    ) -> None:
         self.hass = hass
         self._entry = entry
 
         entry_data = getattr(entry, "data", {})
         self._host = entry_data.get("host", "") if isinstance(entry_data, dict) else ""
 
-        self.entity_description = REBOOT_BUTTON
-        self._attr_unique_id = f"{entry.entry_id}_button_reboot"
+        self.entity_description = description
+        self._attr_unique_id = f"{entry.entry_id}_button_{description.key}"
 
     @property
     def device_info(self) -> DeviceInfo:
@@ -70,6 +84,12 @@ class CudyRebootButton(ButtonEntity):
             sw_version=sw_version,
         )
 
+
+class CudyRebootButton(CudyButton):
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry) -> None:
+        super().__init__(hass, entry, REBOOT_BUTTON)
+
     async def async_press(self) -> None:
         data = self.hass.data[DOMAIN][self._entry.entry_id]
         integration = data.get("integration")
@@ -104,4 +124,21 @@ class CudyRebootButton(ButtonEntity):
         _LOGGER.error(
             "Reboot requested but no reboot method found. "
             "Implement integration.async_reboot() or coordinator.async_reboot()."
-        )
\ No newline at end of file
+        )
+
+
+class CudyReprobeButton(CudyButton):
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry) -> None:
+        super().__init__(hass, entry, REPROBE_BUTTON)
+
+    async def async_press(self) -> None:
+        data = self.hass.data[DOMAIN][self._entry.entry_id]
+        integration = data.get("integration")
+
+        fn = getattr(integration, "async_reprobe_capabilities", None)
+        if callable(fn):
+            await fn()
+            return
+
+        _LOGGER.error("Capability rescan requested but the integration does not support it.")
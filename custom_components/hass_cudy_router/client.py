@@ -1,20 +1,61 @@
 from __future__ import annotations
 
+import asyncio
 import hashlib
 import logging
 import time
+from dataclasses import dataclass
 from http.cookies import SimpleCookie
-from typing import Any, Optional
+from typing import Any, Callable, Optional
 from urllib.parse import quote_plus
 
 import aiohttp
-from aiohttp import ClientResponseError, ClientSession, TCPConnector
-from bs4 import BeautifulSoup
+from aiohttp import ClientResponseError, ClientSession
+
+from .connection import DEFAULT_KEEPALIVE_TIMEOUT, ConnectionStats, create_router_session
+from .const import CONF_MAX_CONCURRENT_REQUESTS, DEFAULT_MAX_CONCURRENT_REQUESTS
+from .metrics import RequestTiming
+from .tracing import record
+from .parser import make_soup
 
 _LOGGER = logging.getLogger(__name__)
 
 DEFAULT_TIMEOUT = 10
 
+# after this many failed logins in a row, wait before trying again
+LOGIN_FAILURES_BEFORE_BACKOFF = 3
+LOGIN_BACKOFF_BASE = 30
+LOGIN_BACKOFF_MAX = 15 * 60
+
+# called with (sysauth, scheme) whenever the login session changes
+SessionListener = Callable[[Optional[str], Optional[str]], None]
+
+
+@dataclass
+class ClientStats:
+    """Login bookkeeping, exposed for diagnostics."""
+
+    logins: int = 0
+    # the router turned the credentials down
+    login_failures: int = 0
+    # the router could not be reached; these do not count toward the backoff
+    login_errors: int = 0
+    scheme_fallbacks: int = 0
+    reauths: int = 0
+    coalesced_logins: int = 0
+    blocked_logins: int = 0
+
+
+@dataclass
+class PageValidators:
+    """ETag / Last-Modified of one page; request() updates them in place."""
+
+    etag: str | None = None
+    last_modified: str | None = None
+    not_modified: bool = False
+    # HTTP status of the last answer, also set when it was an error
+    status: int | None = None
+
 
 class CudyClient:
 
@@ -28,6 +69,8 @@ class CudyClient:
         verify_ssl: bool = True,
         request_timeout: int = DEFAULT_TIMEOUT,
         session: ClientSession | None = None,
+        connection_limit: int = DEFAULT_MAX_CONCURRENT_REQUESTS,
+        keepalive_timeout: float = DEFAULT_KEEPALIVE_TIMEOUT,
     ) -> None:
         self._host = host.rstrip("/")
         self._username = username
@@ -38,16 +81,30 @@ class CudyClient:
         self._external_session = session is not None
         self._session: Optional[ClientSession] = session
         self._timeout = aiohttp.ClientTimeout(total=request_timeout)
+        self._connection_limit = max(1, int(connection_limit))
+        self._keepalive_timeout = keepalive_timeout
+        # only filled in for the session this client creates itself
+        self.connection_stats = ConnectionStats()
 
         self._sysauth: str | None = None
+        # scheme that last produced a sysauth cookie; starts as configured
+        self._scheme = "https" if use_https else "http"
+        self.stats = ClientStats()
+
+        # one login at a time; concurrent callers share its result
+        self._auth_task: asyncio.Task[bool] | None = None
+        self._login_failures = 0
+        self._login_blocked_until = 0.0
+        # False while using a restored sysauth the router has not accepted yet
+        self._session_verified = True
+        self._session_listener: SessionListener | None = None
 
     # ------------------------------------------------------------------
     # Properties
     # ------------------------------------------------------------------
     @property
     def base_url(self) -> str:
-        scheme = "https" if self._use_https else "http"
-        return f"{scheme}://{self._host}"
+        return f"{self._scheme}://{self._host}"
 
     @property
     def is_authenticated(self) -> bool:
@@ -57,16 +114,49 @@ class CudyClient:
     def sysauth(self) -> str | None:
         return self._sysauth
 
+    @property
+    def auth_scheme(self) -> str:
+        """Scheme ("http"/"https") that logins and requests currently use."""
+        return self._scheme
+
+    # ------------------------------------------------------------------
+    # Session persistence
+    # ------------------------------------------------------------------
+    def restore_session(self, sysauth: str | None, scheme: str | None = None) -> None:
+        """Reuse a sysauth token (and the working scheme) from a previous run."""
+        if scheme in ("http", "https"):
+            self._scheme = scheme
+        if not sysauth:
+            return
+        self._sysauth = sysauth
+        self._session_verified = False
+
+    def set_session_listener(self, listener: SessionListener | None) -> None:
+        self._session_listener = listener
+
+    def _set_session(self, sysauth: str | None, scheme: str) -> None:
+        changed = (sysauth, scheme) != (self._sysauth, self._scheme)
+        self._sysauth = sysauth
+        self._scheme = scheme
+        self._session_verified = True
+        if changed and self._session_listener is not None:
+            try:
+                self._session_listener(self._sysauth, self._scheme)
+            except Exception:
+                _LOGGER.debug("Session listener failed", exc_info=True)
+
     # ------------------------------------------------------------------
     # Session handling
     # ------------------------------------------------------------------
     async def _ensure_session(self) -> ClientSession:
         if self._session is None or self._session.closed:
-            connector = None
-            # allow self-signed certs when verify_ssl=False
-            if self._use_https and not self._verify_ssl:
-                connector = TCPConnector(ssl=False)
-            self._session = aiohttp.ClientSession(timeout=self._timeout, connector=connector)
+            self._session = create_router_session(
+                stats=self.connection_stats,
+                timeout=self._timeout,
+                limit=self._connection_limit,
+                keepalive_timeout=self._keepalive_timeout,
+                verify_ssl=self._verify_ssl or not self._use_https,
+            )
         return self._session
 
     async def async_close(self) -> None:
@@ -83,14 +173,64 @@ class CudyClient:
     # Authentication (LuCI)
     # ------------------------------------------------------------------
     async def authenticate(self) -> bool:
-        """Authenticate using the LuCI login form and set sysauth cookie."""
+        """Authenticate using the LuCI login form and set sysauth cookie.
+
+        Concurrent callers share a single in-flight login. After repeated
+        rejected logins further logins are refused until the backoff has
+        passed. Connection errors are raised and do not count as rejections.
+        """
+        if self._auth_task is not None and not self._auth_task.done():
+            self.stats.coalesced_logins += 1
+            return await asyncio.shield(self._auth_task)
+
+        remaining = self._login_blocked_until - time.monotonic()
+        if remaining > 0:
+            self.stats.blocked_logins += 1
+            _LOGGER.debug("Skipping login, backing off for another %.0fs", remaining)
+            return False
 
+        started = time.perf_counter()
+        self._auth_task = asyncio.get_running_loop().create_task(
+            self._async_login(), name="cudy login"
+        )
+        ok = False
+        try:
+            ok = await asyncio.shield(self._auth_task)
+        finally:
+            record("login", "auth", started, time.perf_counter(), ok=ok)
+
+        if ok:
+            self._login_failures = 0
+            self._login_blocked_until = 0.0
+        else:
+            self._login_failures += 1
+            if self._login_failures >= LOGIN_FAILURES_BEFORE_BACKOFF:
+                backoff = min(
+                    LOGIN_BACKOFF_MAX,
+                    LOGIN_BACKOFF_BASE * 2 ** (self._login_failures - LOGIN_FAILURES_BEFORE_BACKOFF),
+                )
+                self._login_blocked_until = time.monotonic() + backoff
+                _LOGGER.warning(
+                    "Login to %s failed %d times in a row, retrying in %ds",
+                    self._host, self._login_failures, backoff,
+                )
+        return ok
+
+    async def _async_login(self) -> bool:
         session = await self._ensure_session()
 
-        # try preferred scheme first, then fallback
-        schemes = ["https", "http"] if self._use_https else ["http", "https"]
+        # the scheme that worked last time first, the other one only if it fails
+        schemes = [self._scheme, "http" if self._scheme == "https" else "https"]
+        self.stats.logins += 1
+        # set once a login form was answered without a session
+        rejected = False
+        error: Exception | None = None
+
+        for attempt, scheme in enumerate(schemes):
+            if attempt:
+                self.stats.scheme_fallbacks += 1
+                _LOGGER.debug("Login over %s failed, trying %s", schemes[0], scheme)
 
-        for scheme in schemes:
             base = f"{scheme}://{self._host}"
             login_url = f"{base}/cgi-bin/luci"
 
@@ -108,17 +248,21 @@ class CudyClient:
 
             # 1) GET login page
             try:
-                async with session.get(login_url, headers=headers_get, allow_redirects=True) as resp:
+                async with session.get(
+                    login_url, headers=headers_get, allow_redirects=True, timeout=self._timeout
+                ) as resp:
                     html = await resp.text()
             except Exception as e:
-                _LOGGER.error("GET login page failed (%s): %s", scheme, e)
+                _LOGGER.debug("GET login page failed (%s): %s", scheme, e)
+                error = e
                 continue
 
             if not html:
-                _LOGGER.error("GET login page failed (%s): empty response", scheme)
+                _LOGGER.debug("GET login page failed (%s): empty response", scheme)
+                error = aiohttp.ClientPayloadError(f"empty login page from {base}")
                 continue
 
-            soup = BeautifulSoup(html, "html.parser")
+            soup = make_soup(html)
 
             def extract(name: str) -> str:
                 tag = soup.find("input", {"name": name})
@@ -157,6 +301,9 @@ class CudyClient:
             body = {k: v for k, v in body.items() if v}
 
             encoded = "&".join(f"{quote_plus(k)}={quote_plus(str(v))}" for k, v in body.items())
+            if not self._external_session:
+                # only a cookie set by this login may count as success
+                session.cookie_jar.clear(lambda c: c.key.lower().startswith("sysauth"))
 
             try:
                 async with session.post(
@@ -164,25 +311,38 @@ class CudyClient:
                     headers=headers_post,
                     data=encoded,
                     allow_redirects=False,
+                    timeout=self._timeout,
                 ) as resp:
                     # try Set-Cookie header first
                     set_cookie = resp.headers.getall("Set-Cookie", [])
                     sysauth = self._parse_sysauth_from_headers(set_cookie)
                     if sysauth:
-                        self._sysauth = sysauth
+                        self._set_session(sysauth, scheme)
                         return True
 
-                    # fallback to cookie jar
-                    jar = session.cookie_jar.filter_cookies(base)
-                    for key, cookie in jar.items():
-                        if key.lower().startswith("sysauth") and cookie.value:
-                            self._sysauth = cookie.value
-                            return True
+                    # fallback to cookie jar, only our own: a shared jar may
+                    # hold another client's (or an old) sysauth
+                    if not self._external_session:
+                        jar = session.cookie_jar.filter_cookies(base)
+                        for key, cookie in jar.items():
+                            if key.lower().startswith("sysauth") and cookie.value:
+                                self._set_session(cookie.value, scheme)
+                                return True
+                    rejected = True
             except Exception as e:
-                _LOGGER.error("POST login failed (%s): %s", scheme, e)
+                _LOGGER.debug("POST login failed (%s): %s", scheme, e)
+                error = e
                 continue
 
+        if not rejected and error is not None:
+            # a rebooting router or a network hiccup, not bad credentials
+            self.stats.login_errors += 1
+            raise error
+
         _LOGGER.debug("Authentication failed: no sysauth cookie obtained")
+        # whatever token we had is no longer usable
+        self.stats.login_failures += 1
+        self._set_session(None, self._scheme)
         return False
 
     @staticmethod
@@ -214,17 +374,28 @@ class CudyClient:
         json: Any = None,
         data: Any = None,
         require_auth: bool = True,
+        validators: PageValidators | None = None,
+        timing: RequestTiming | None = None,
     ) -> Any:
-        """Low-level request helper used by get/post and APIs."""
+        """Low-level request helper used by get/post and APIs.
+
+        With ``validators`` the request is conditional; on 304 the result is
+        "" and ``validators.not_modified`` is set. ``timing`` collects where
+        the time went (login, connect, TTFB, body) and the bytes read.
+        """
 
         if not path.startswith("/"):
             path = "/" + path
 
         if require_auth:
+            started = time.perf_counter()
             await self.ensure_authenticated()
+            if timing is not None:
+                timing.login += time.perf_counter() - started
 
         session = await self._ensure_session()
         url = f"{self.base_url}{path}"
+        sent_sysauth = self.sysauth
 
         headers: dict[str, str] = {
             "User-Agent": "hass-cudy-router",
@@ -232,6 +403,12 @@ class CudyClient:
         }
         if self.sysauth:
             headers["Cookie"] = f"sysauth={self.sysauth}"
+        if validators is not None:
+            validators.not_modified = False
+            if validators.etag:
+                headers["If-None-Match"] = validators.etag
+            if validators.last_modified:
+                headers["If-Modified-Since"] = validators.last_modified
 
         async with session.request(
             method,
@@ -240,9 +417,23 @@ class CudyClient:
             json=json,
             data=data,
             headers=headers,
+            timeout=self._timeout,
+            trace_request_ctx=timing,
         ) as resp:
-            if resp.status == 403 and require_auth:
-                await self.authenticate()
+            if require_auth and (
+                resp.status == 403 or await self._is_rejected_restored_session(resp)
+            ):
+                # another request may already have logged in again meanwhile
+                if self.sysauth == sent_sysauth:
+                    self.stats.reauths += 1
+                    # concurrent requests share one login; count it once
+                    joined = self._auth_task is not None and not self._auth_task.done()
+                    started = time.perf_counter()
+                    await self.authenticate()
+                    if timing is not None:
+                        timing.login += time.perf_counter() - started
+                        timing.relogins += 0 if joined else 1
+                url = f"{self.base_url}{path}"
                 headers["Cookie"] = f"sysauth={self.sysauth}" if self.sysauth else ""
                 async with session.request(
                     method,
@@ -251,26 +442,67 @@ class CudyClient:
                     json=json,
                     data=data,
                     headers=headers,
+                    timeout=self._timeout,
+                    trace_request_ctx=timing,
                 ) as resp2:
                     resp2.raise_for_status()
-                    ctype = resp2.headers.get("Content-Type", "")
-                    if "application/json" in ctype:
-                        return await resp2.json(content_type=None)
-                    return await resp2.text()
+                    return await self._read_body(resp2, validators, timing)
 
             try:
                 resp.raise_for_status()
             except ClientResponseError as err:
+                if validators is not None:
+                    validators.status = err.status
+                return ""
+
+            if require_auth:
+                self._session_verified = True
+
+            return await self._read_body(resp, validators, timing)
+
+    @staticmethod
+    async def _read_body(
+        resp: aiohttp.ClientResponse,
+        validators: PageValidators | None,
+        timing: RequestTiming | None = None,
+    ) -> Any:
+        if validators is not None:
+            validators.status = resp.status
+            if resp.status == 304:
+                validators.not_modified = True
                 return ""
+            validators.etag = resp.headers.get("ETag")
+            validators.last_modified = resp.headers.get("Last-Modified")
 
+        started = time.perf_counter()
+        try:
             ctype = resp.headers.get("Content-Type", "")
             if "application/json" in ctype:
                 return await resp.json(content_type=None)
             return await resp.text()
+        finally:
+            finished = time.perf_counter()
+            if timing is not None:
+                timing.body += finished - started
+            record("read body", "http", started, finished)
+
+    async def _is_rejected_restored_session(self, resp: aiohttp.ClientResponse) -> bool:
+        """Some firmwares answer an expired session with the login form, not 403."""
+        if self._session_verified or resp.status >= 400:
+            return False
+        if "html" not in resp.headers.get("Content-Type", ""):
+            return False
+        return 'name="luci_password"' in await resp.text()
 
     async def get(self, path: str, **kwargs: Any) -> Any:
         return await self.request("GET", path, **kwargs)
 
+    async def get_page(
+        self, path: str, validators: PageValidators, timing: RequestTiming | None = None
+    ) -> Any:
+        """Conditional GET; see request()."""
+        return await self.request("GET", path, validators=validators, timing=timing)
+
     async def post(self, path: str, **kwargs: Any) -> Any:
         return await self.request("POST", path, **kwargs)
 
@@ -306,13 +538,18 @@ class CudyClient:
     # Helper for tests / convenience
     # ------------------------------------------------------------------
     @classmethod
-    def from_entry(cls, entry) -> "CudyClient":
+    def from_entry(cls, entry, session: ClientSession | None = None) -> "CudyClient":
         data = entry.data
         protocol = (data.get("protocol") or "http").lower()
         use_https = protocol == "https"
+        options = getattr(entry, "options", None) or {}
         return cls(
             host=data.get("host"),
             username=data.get("username"),
             password=data.get("password"),
             use_https=use_https,
+            session=session,
+            connection_limit=options.get(
+                CONF_MAX_CONCURRENT_REQUESTS, DEFAULT_MAX_CONCURRENT_REQUESTS
+            ),
         )
\ No newline at end of file
@@ -4,6 +4,7 @@ import logging
 from typing import Any
 
 import voluptuous as vol
+from aiohttp import DummyCookieJar
 
 from homeassistant import config_entries
 from homeassistant.const import (
@@ -15,9 +16,19 @@ from homeassistant.const import (
 )
 from homeassistant.core import HomeAssistant
 from homeassistant.data_entry_flow import FlowResult
+from homeassistant.helpers.aiohttp_client import async_create_clientsession
 
 from .client import CudyClient
-from .const import DOMAIN, MODULE_DEVICE_LIST
+from .const import (
+    CONF_MAX_CONCURRENT_REQUESTS,
+    CONF_SCAN_INTERVAL_SLOW,
+    CONF_SCAN_INTERVAL_STATIC,
+    DEFAULT_MAX_CONCURRENT_REQUESTS,
+    DEFAULT_SCAN_INTERVAL_SLOW,
+    DEFAULT_SCAN_INTERVAL_STATIC,
+    DOMAIN,
+    MODULE_DEVICE_LIST,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -47,14 +58,21 @@ async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str,
     username = data[CONF_USERNAME]
     password = data[CONF_PASSWORD]
 
+    # a one-off login needs no pool of its own, but must not share Home
+    # Assistant's cookie jar: a sysauth left there would pass for a login
+    session = async_create_clientsession(
+        hass, auto_cleanup=False, cookie_jar=DummyCookieJar()
+    )
     try:
         client = CudyClient(
             host=host,
             username=username,
             password=password,
             use_https=use_https,
+            session=session,
         )
     except Exception as err:  # very defensive
+        session.detach()
         _LOGGER.debug("Error constructing CudyClient for %s: %s", host, err)
         raise CannotConnect from err
 
@@ -69,6 +87,8 @@ async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str,
             await client.close()
         except Exception:
             pass
+        # leaves Home Assistant's shared connector open
+        session.detach()
 
     if not ok:
         raise InvalidAuth
@@ -134,10 +154,28 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
                         CONF_SCAN_INTERVAL,
                         default=self._config_entry.options.get(CONF_SCAN_INTERVAL, 30),
                     ): int,
+                    vol.Optional(
+                        CONF_SCAN_INTERVAL_SLOW,
+                        default=self._config_entry.options.get(
+                            CONF_SCAN_INTERVAL_SLOW, DEFAULT_SCAN_INTERVAL_SLOW
+                        ),
+                    ): int,
+                    vol.Optional(
+                        CONF_SCAN_INTERVAL_STATIC,
+                        default=self._config_entry.options.get(
+                            CONF_SCAN_INTERVAL_STATIC, DEFAULT_SCAN_INTERVAL_STATIC
+                        ),
+                    ): int,
                     vol.Optional(
                         MODULE_DEVICE_LIST,
                         default=self._config_entry.options.get(MODULE_DEVICE_LIST, ""),
                     ): str,
+                    vol.Optional(
+                        CONF_MAX_CONCURRENT_REQUESTS,
+                        default=self._config_entry.options.get(
+                            CONF_MAX_CONCURRENT_REQUESTS, DEFAULT_MAX_CONCURRENT_REQUESTS
+                        ),
+                    ): vol.All(int, vol.Range(min=1, max=16)),
                 }
             ),
         )
\ No newline at end of file
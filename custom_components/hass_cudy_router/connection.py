@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from types import SimpleNamespace
+from typing import Any
+
+import aiohttp
+from aiohttp import ClientSession, TCPConnector, TraceConfig
+
+from .metrics import RequestTiming
+from .tracing import record
+
+# uhttpd drops idle connections after ~20 s; close ours a bit earlier so a
+# poll never picks up a socket the router has already given up on
+DEFAULT_KEEPALIVE_TIMEOUT = 15
+DNS_CACHE_TTL = 300
+
+
+@dataclass
+class ConnectionStats:
+    """How many requests needed a fresh TCP (and TLS) connection."""
+
+    requests: int = 0
+    connections_opened: int = 0
+    connections_reused: int = 0
+    dns_lookups: int = 0
+    dns_cache_hits: int = 0
+
+
+def _timing(ctx: SimpleNamespace) -> RequestTiming | None:
+    """The RequestTiming passed as ``trace_request_ctx``, if any."""
+    timing = getattr(ctx, "trace_request_ctx", None)
+    return timing if isinstance(timing, RequestTiming) else None
+
+
+def _trace_config(stats: ConnectionStats) -> TraceConfig:
+    trace = TraceConfig()
+
+    async def on_request_start(session: ClientSession, ctx: SimpleNamespace, params: Any) -> None:
+        stats.requests += 1
+        ctx.started = time.perf_counter()
+        ctx.waited = 0.0  # pool wait and connect, not part of the TTFB
+
+    async def on_connection_queued_start(session: ClientSession, ctx: SimpleNamespace, params: Any) -> None:
+        ctx.queued = time.perf_counter()
+
+    async def on_connection_queued_end(session: ClientSession, ctx: SimpleNamespace, params: Any) -> None:
+        now = time.perf_counter()
+        elapsed = now - ctx.queued
+        ctx.waited += elapsed
+        record("wait for connection", "queue", ctx.queued, now)
+        timing = _timing(ctx)
+        if timing is not None:
+            timing.queue += elapsed
+
+    async def on_connection_create_start(session: ClientSession, ctx: SimpleNamespace, params: Any) -> None:
+        ctx.connecting = time.perf_counter()
+
+    async def on_connection_create_end(session: ClientSession, ctx: SimpleNamespace, params: Any) -> None:
+        stats.connections_opened += 1
+        now = time.perf_counter()
+        elapsed = now - ctx.connecting
+        ctx.waited += elapsed
+        record("connect", "connect", ctx.connecting, now)
+        timing = _timing(ctx)
+        if timing is not None:
+            timing.connect += elapsed
+
+    async def on_request_end(session: ClientSession, ctx: SimpleNamespace, params: Any) -> None:
+        # fires once the response headers are in, before the body is read
+        now = time.perf_counter()
+        timing = _timing(ctx)
+        if timing is not None:
+            timing.ttfb += now - ctx.started - ctx.waited
+        record(
+            f"{params.method} {params.url.path}", "http", ctx.started, now,
+            status=params.response.status,
+        )
+
+    async def on_response_chunk_received(session: ClientSession, ctx: SimpleNamespace, params: Any) -> None:
+        timing = _timing(ctx)
+        if timing is not None:
+            timing.bytes += len(params.chunk)
+
+    async def on_connection_reuseconn(session: ClientSession, ctx: SimpleNamespace, params: Any) -> None:
+        stats.connections_reused += 1
+
+    async def on_dns_resolvehost_end(session: ClientSession, ctx: SimpleNamespace, params: Any) -> None:
+        stats.dns_lookups += 1
+
+    async def on_dns_cache_hit(session: ClientSession, ctx: SimpleNamespace, params: Any) -> None:
+        stats.dns_cache_hits += 1
+
+    trace.on_request_start.append(on_request_start)
+    trace.on_connection_queued_start.append(on_connection_queued_start)
+    trace.on_connection_queued_end.append(on_connection_queued_end)
+    trace.on_connection_create_start.append(on_connection_create_start)
+    trace.on_connection_create_end.append(on_connection_create_end)
+    trace.on_request_end.append(on_request_end)
+    trace.on_response_chunk_received.append(on_response_chunk_received)
+    trace.on_connection_reuseconn.append(on_connection_reuseconn)
+    trace.on_dns_resolvehost_end.append(on_dns_resolvehost_end)
+    trace.on_dns_cache_hit.append(on_dns_cache_hit)
+    return trace
+
+
+def create_router_session(
+    *,
+    stats: ConnectionStats,
+    timeout: aiohttp.ClientTimeout,
+    limit: int,
+    keepalive_timeout: float = DEFAULT_KEEPALIVE_TIMEOUT,
+    verify_ssl: bool = True,
+) -> ClientSession:
+    """Session with a connector dedicated to one router.
+
+    All requests of a poll go to the same host, so the pool is capped at
+    the poll's concurrency and kept alive between them.
+    """
+    connector = TCPConnector(
+        limit=limit,
+        limit_per_host=limit,
+        keepalive_timeout=keepalive_timeout,
+        ttl_dns_cache=DNS_CACHE_TTL,
+        # allow self-signed certs when verify_ssl=False
+        ssl=None if verify_ssl else False,
+    )
+    return aiohttp.ClientSession(
+        timeout=timeout,
+        connector=connector,
+        trace_configs=[_trace_config(stats)],
+    )
@@ -1,5 +1,5 @@
-from homeassistant.components.sensor import SensorStateClass
-from homeassistant.const import EntityCategory
+from homeassistant.components.sensor import SensorDeviceClass, SensorStateClass
+from homeassistant.const import EntityCategory, UnitOfDataRate, UnitOfInformation, UnitOfTime
 
 DOMAIN = "hass_cudy_router"
 
@@ -7,6 +7,40 @@ PLATFORMS = {"sensor", "button", "device_tracker"}
 
 DEFAULT_SCAN_INTERVAL = 30
 
+POLL_TIER_FAST = "fast"
+POLL_TIER_SLOW = "slow"
+POLL_TIER_STATIC = "static"
+
+CONF_SCAN_INTERVAL_SLOW = "scan_interval_slow"
+CONF_SCAN_INTERVAL_STATIC = "scan_interval_static"
+DEFAULT_SCAN_INTERVAL_SLOW = 300
+DEFAULT_SCAN_INTERVAL_STATIC = 3600
+
+CONF_MAX_CONCURRENT_REQUESTS = "max_concurrent_requests"
+DEFAULT_MAX_CONCURRENT_REQUESTS = 4
+
+# routers polled at the same time across all config entries
+MAX_CONCURRENT_ROUTER_POLLS = 2
+
+# polls the request timing percentiles are taken over
+METRICS_WINDOW = 50
+
+# trace_polls service: record spans of the next N polls into a trace file
+SERVICE_TRACE_POLLS = "trace_polls"
+ATTR_POLLS = "polls"
+ATTR_ENTRY_ID = "entry_id"
+DEFAULT_TRACE_POLLS = 5
+MAX_TRACE_POLLS = 100
+
+# re-check modules the router did not answer for once a day
+CAPABILITY_REPROBE_INTERVAL = 24 * 60 * 60
+# a known module is dropped after this many empty answers in a row
+# (404/410 drop it at once; 5xx, timeouts and auth errors never do)
+CAPABILITY_MISSES_BEFORE_DROP = 2
+
+STORAGE_VERSION = 1
+STORAGE_KEY = DOMAIN
+
 MODULE_SYSTEM = "system"
 MODULE_LAN = "lan"
 MODULE_DEVICES = "devices"
@@ -68,6 +102,16 @@ SENSOR_DEVICE_WIRED_COUNT = "device_wired_device_count"
 SENSOR_DEVICE_MESH_COUNT = "device_mesh_device_count"
 SENSOR_DEVICE_ONLINE = "device_online"
 SENSOR_DEVICE_BLOCKED = "device_blocked"
+SENSOR_DEVICE_UPLOAD_TOTAL = "device_upload_total"
+SENSOR_DEVICE_DOWNLOAD_TOTAL = "device_download_total"
+SENSOR_DEVICE_WIFI_24_THROUGHPUT = "device_wifi_24_throughput"
+SENSOR_DEVICE_WIFI_5_THROUGHPUT = "device_wifi_5_throughput"
+SENSOR_DEVICE_WIFI_6_THROUGHPUT = "device_wifi_6_throughput"
+SENSOR_DEVICE_WIRED_THROUGHPUT = "device_wired_throughput"
+SENSOR_DEVICE_MESH_THROUGHPUT = "device_mesh_throughput"
+# attribute payload, not an entity of its own
+SENSOR_DEVICE_TOP_CLIENTS = "device_top_clients"
+DEVICE_TOP_CLIENTS_COUNT = 5
 ## DHCP
 SENSOR_DHCP_IP_START = "dhcp_ip_start"
 SENSOR_DHCP_IP_END = "dhcp_ip_end"
@@ -97,6 +141,12 @@ SENSORS_KEY_DESCRIPTION = "description"
 SENSORS_KEY_ICON = "icon"
 SENSORS_KEY_CATEGORY = "entity_category"
 SENSORS_KEY_CLASS = "state_class"
+# optional spec keys
+SENSORS_KEY_UNIT = "unit"
+SENSORS_KEY_DEVICE_CLASS = "device_class"
+# data key (same module) whose dict becomes the entity's attributes
+SENSORS_KEY_ATTRIBUTES = "attributes"
+SENSORS_KEY_ENABLED_DEFAULT = "enabled_default"
 
 BUTTON_REBOOT = "button_reboot"
 
@@ -108,6 +158,11 @@ DEVICE_DOWNLOAD_SPEED = "download_speed"
 DEVICE_SIGNAL = "signal"
 DEVICE_ONLINE_TIME = "online_time"
 DEVICE_CONNECTION_TYPE = "connection_type"
+# numeric twins of the strings above
+DEVICE_UPLOAD_BPS = "upload_bps"
+DEVICE_DOWNLOAD_BPS = "download_bps"
+DEVICE_SIGNAL_DB = "signal_db"
+DEVICE_ONLINE_SECONDS = "online_seconds"
 
 ICON_INFO_WORK_MODE = "mdi:router-wireless"
 ICON_INFO_INTERFACE = "mdi:router-network"
@@ -606,6 +661,91 @@ SENSORS = {
 
 
 MODULE_DEVICE_LIST = "device_list"
+# not a router page: the integration's own request timings
+MODULE_DIAGNOSTICS = "diagnostics"
+
+SENSOR_POLL_DURATION_P50 = "poll_duration_p50"
+SENSOR_POLL_DURATION_P95 = "poll_duration_p95"
+SENSOR_REQUEST_TTFB_P95 = "request_ttfb_p95"
+SENSOR_PARSE_TIME_P95 = "parse_time_p95"
+SENSOR_POLL_BYTES_P50 = "poll_bytes_p50"
+SENSOR_RELOGINS = "relogins"
+SENSOR_POLL_PHASES = "poll_phases"
+
+def _throughput_sensor(key: str, icon: str, attributes: str | None = None) -> dict:
+    return {
+        SENSORS_KEY_KEY: key,
+        SENSORS_KEY_ICON: icon,
+        SENSORS_KEY_CATEGORY: None,
+        SENSORS_KEY_CLASS: SensorStateClass.MEASUREMENT,
+        SENSORS_KEY_UNIT: UnitOfDataRate.KILOBITS_PER_SECOND,
+        SENSORS_KEY_DEVICE_CLASS: SensorDeviceClass.DATA_RATE,
+        SENSORS_KEY_ATTRIBUTES: attributes,
+    }
+
+
+def _diagnostic_sensor(
+    key: str,
+    icon: str,
+    unit: str | None,
+    device_class: SensorDeviceClass | None,
+    state_class: SensorStateClass = SensorStateClass.MEASUREMENT,
+    attributes: str | None = None,
+) -> dict:
+    return {
+        SENSORS_KEY_KEY: key,
+        SENSORS_KEY_ICON: icon,
+        SENSORS_KEY_CATEGORY: EntityCategory.DIAGNOSTIC,
+        SENSORS_KEY_CLASS: state_class,
+        SENSORS_KEY_UNIT: unit,
+        SENSORS_KEY_DEVICE_CLASS: device_class,
+        SENSORS_KEY_ATTRIBUTES: attributes,
+        SENSORS_KEY_ENABLED_DEFAULT: False,
+    }
+
+
+# sensors computed from other data rather than read off a page label
+DERIVED_SENSORS = {
+    MODULE_DEVICES: [
+        _throughput_sensor(SENSOR_DEVICE_UPLOAD_TOTAL, "mdi:upload-network"),
+        _throughput_sensor(
+            SENSOR_DEVICE_DOWNLOAD_TOTAL, "mdi:download-network", SENSOR_DEVICE_TOP_CLIENTS
+        ),
+        _throughput_sensor(SENSOR_DEVICE_WIFI_24_THROUGHPUT, "mdi:wifi"),
+        _throughput_sensor(SENSOR_DEVICE_WIFI_5_THROUGHPUT, "mdi:wifi-star"),
+        _throughput_sensor(SENSOR_DEVICE_WIFI_6_THROUGHPUT, "mdi:wifi-star"),
+        _throughput_sensor(SENSOR_DEVICE_WIRED_THROUGHPUT, "mdi:connection"),
+        _throughput_sensor(SENSOR_DEVICE_MESH_THROUGHPUT, "mdi:table-network"),
+    ],
+    MODULE_DIAGNOSTICS: [
+        _diagnostic_sensor(
+            SENSOR_POLL_DURATION_P50, "mdi:timer-outline",
+            UnitOfTime.MILLISECONDS, SensorDeviceClass.DURATION,
+        ),
+        _diagnostic_sensor(
+            SENSOR_POLL_DURATION_P95, "mdi:timer-alert-outline",
+            UnitOfTime.MILLISECONDS, SensorDeviceClass.DURATION,
+            attributes=SENSOR_POLL_PHASES,
+        ),
+        _diagnostic_sensor(
+            SENSOR_REQUEST_TTFB_P95, "mdi:timer-sand",
+            UnitOfTime.MILLISECONDS, SensorDeviceClass.DURATION,
+        ),
+        _diagnostic_sensor(
+            SENSOR_PARSE_TIME_P95, "mdi:code-tags",
+            UnitOfTime.MILLISECONDS, SensorDeviceClass.DURATION,
+        ),
+        _diagnostic_sensor(
+            SENSOR_POLL_BYTES_P50, "mdi:download",
+            UnitOfInformation.BYTES, SensorDeviceClass.DATA_SIZE,
+        ),
+        _diagnostic_sensor(
+            SENSOR_RELOGINS, "mdi:login",
+            None, None, SensorStateClass.TOTAL_INCREASING,
+        ),
+    ],
+}
+
 
 CUDY_DEVICES = [
     "AP11000",
@@ -735,3 +875,25 @@ CAPABILITY_URLS = {
         "/admin/network/devices/devlist?detail=1",
     ],
 }
+
+# How often each module is fetched. The fast tier follows the scan interval,
+# the system page stays fast because uptime/local time live on it.
+MODULE_POLL_TIERS = {
+    MODULE_SYSTEM: POLL_TIER_FAST,
+    MODULE_DEVICES: POLL_TIER_FAST,
+    MODULE_DEVICE_LIST: POLL_TIER_FAST,
+    MODULE_GSM: POLL_TIER_FAST,
+    MODULE_GSM_STATISTICS: POLL_TIER_FAST,
+    MODULE_WAN: POLL_TIER_SLOW,
+    MODULE_WAN_SECONDARY: POLL_TIER_SLOW,
+    MODULE_MULTI_WAN: POLL_TIER_SLOW,
+    MODULE_MESH: POLL_TIER_SLOW,
+    MODULE_SMS: POLL_TIER_SLOW,
+    MODULE_VPN: POLL_TIER_SLOW,
+    MODULE_USB: POLL_TIER_SLOW,
+    MODULE_LAN: POLL_TIER_STATIC,
+    MODULE_DHCP: POLL_TIER_STATIC,
+    MODULE_WIRELESS_24G: POLL_TIER_STATIC,
+    MODULE_WIRELESS_5G: POLL_TIER_STATIC,
+    MODULE_WIRELESS_6G: POLL_TIER_STATIC,
+}
@@ -1,18 +1,36 @@
 from __future__ import annotations
 
 import logging
+import time
+from contextlib import nullcontext
+from dataclasses import dataclass
 from datetime import timedelta
-from typing import Any
+from typing import Any, Iterable
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_SCAN_INTERVAL
-from homeassistant.core import HomeAssistant
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 
-from .const import DEFAULT_SCAN_INTERVAL
+from .const import DEFAULT_SCAN_INTERVAL, MODULE_DEVICE_LIST, MODULE_DEVICES, MODULE_DIAGNOSTICS
+from .devices import Device, ThroughputTracker, build_device_index, tracked_macs
+from .metrics import PollMetrics
+from .scheduler import ModuleScheduler, RouterPollScheduler, tier_intervals
+from .storage import CudyStorage
+from .tracing import CURRENT_TRACER, PollTracer, callback_name
 
 _LOGGER = logging.getLogger(__name__)
 
+_MISSING = object()
+
+
+@dataclass
+class UpdateStats:
+    """Keyed listener notifications sent vs. skipped because nothing changed."""
+
+    writes: int = 0
+    suppressed_writes: int = 0
+
 
 def _discover_available_sensor_keys(parsed: dict) -> tuple[set[str], set[str]]:
     available_sensors: set[str] = set()
@@ -35,6 +53,43 @@ def _discover_available_sensor_keys(parsed: dict) -> tuple[set[str], set[str]]:
     return available_sensors, available_modules
 
 
+def _answered_modules(fetched: dict[str, Any]) -> set[str]:
+    """Modules that came back with data; the devlist rides under devices."""
+    answered = set(fetched)
+    devices = fetched.get(MODULE_DEVICES)
+    if isinstance(devices, dict) and MODULE_DEVICE_LIST in devices:
+        answered.add(MODULE_DEVICE_LIST)
+        if devices.keys() == {MODULE_DEVICE_LIST}:
+            answered.discard(MODULE_DEVICES)
+    return answered
+
+
+def _merge_devices(
+    previous: Any, fetched: dict[str, Any], answered: set[str], gone: set[str]
+) -> dict[str, Any]:
+    """Devices payload with the devlist rows of this poll.
+
+    Each part is kept from the last poll when only that part failed.
+    """
+    previous = previous if isinstance(previous, dict) else {}
+    current = fetched.get(MODULE_DEVICES)
+    current = current if isinstance(current, dict) else {}
+
+    if MODULE_DEVICES in answered:
+        source = current
+    elif MODULE_DEVICES in gone:
+        source = {}
+    else:
+        source = previous
+    merged = {k: v for k, v in source.items() if k != MODULE_DEVICE_LIST}
+
+    if MODULE_DEVICE_LIST in answered:
+        merged[MODULE_DEVICE_LIST] = current[MODULE_DEVICE_LIST]
+    elif MODULE_DEVICE_LIST not in gone and MODULE_DEVICE_LIST in previous:
+        merged[MODULE_DEVICE_LIST] = previous[MODULE_DEVICE_LIST]
+    return merged
+
+
 class CudyCoordinator(DataUpdateCoordinator[dict[str, Any]]):
 
     def __init__(
@@ -43,6 +98,8 @@ class CudyCoordinator(DataUpdateCoordinator[dict[str, Any]]):
         entry: ConfigEntry,
         api: Any,
         host: str | None = None,
+        store: CudyStorage | None = None,
+        poll_scheduler: RouterPollScheduler | None = None,
     ) -> None:
         options = getattr(entry, "options", None) or {}
         scan_seconds = int(options.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL))
@@ -56,23 +113,237 @@ class CudyCoordinator(DataUpdateCoordinator[dict[str, Any]]):
         )
 
         self.api = api
+        self.store = store
+        self.scheduler = ModuleScheduler(tier_intervals(options, scan_seconds))
         self.data: dict[str, Any] = {}
 
+        # shared with the other entries: staggers polls, caps concurrency
+        self.poll_scheduler = poll_scheduler
+        self._entry_id = entry.entry_id
+        if poll_scheduler is not None:
+            entry.async_on_unload(poll_scheduler.register(entry.entry_id, scan_seconds))
+
+        # (module, key) -> callbacks; only called when that value changes
+        self._key_listeners: dict[tuple[str, str], list[CALLBACK_TYPE]] = {}
+        self._published: dict[tuple[str, str], Any] = {}
+        self._published_success: bool | None = None
+        self._remove_key_dispatch: CALLBACK_TYPE | None = None
+        self.update_stats = UpdateStats()
+
+        # built once per update and shared by every device tracker; only
+        # the tracked MACs when the options name any
+        self._tracked_macs = tracked_macs(options.get(MODULE_DEVICE_LIST))
+        self.device_index: dict[str, Device] = {}
+        self._indexed_devices: Any = None
+        self.throughput = ThroughputTracker()
+
+        # set by the trace_polls service for the next few polls
+        self.tracer: PollTracer | None = None
+
     async def _async_update_data(self) -> dict[str, Any]:
         if not self.api:
             raise UpdateFailed("No API client set on coordinator")
 
+        tracer = self.tracer
+        token = CURRENT_TRACER.set(tracer)
+        started = time.perf_counter()
         try:
-            result = await self.api.get_data()
-            if result is None:
-                result = {}
-            if not isinstance(result, dict):
+            due = self.scheduler.due_modules()
+            poll_slot = (
+                self.poll_scheduler.poll(self._entry_id)
+                if self.poll_scheduler is not None
+                else nullcontext()
+            )
+            async with poll_slot:
+                if tracer is not None:
+                    tracer.record("wait for poll slot", "queue", started, time.perf_counter(), "poll")
+                fetched = await self.api.get_data(modules=due)
+            if fetched is None:
+                fetched = {}
+            if not isinstance(fetched, dict):
                 raise UpdateFailed("API.get_data returned non-dict result")
 
+            self._persist_capabilities()
+            answered = _answered_modules(fetched)
+            gone = self._gone_modules(due, answered)
+            # failed modules stay due and are retried on the next cycle
+            self.scheduler.mark_polled(answered | gone)
+
+            # keep modules that were not due or failed this cycle, drop the
+            # ones the router no longer serves
+            previous = self.data or {}
+            result = {
+                module: payload
+                for module, payload in previous.items()
+                if module not in gone
+            }
+            result.update(fetched)
+            devices = _merge_devices(previous.get(MODULE_DEVICES), fetched, answered, gone)
+            if devices:
+                result[MODULE_DEVICES] = devices
+            else:
+                result.pop(MODULE_DEVICES, None)
+
+            self._update_device_index(result)
+            totals = self.throughput.summary()
+            if totals and isinstance(result.get(MODULE_DEVICES), dict):
+                result[MODULE_DEVICES] = {**result[MODULE_DEVICES], **totals}
+            metrics = getattr(self.api, "metrics", None)
+            if isinstance(metrics, PollMetrics):
+                result[MODULE_DIAGNOSTICS] = metrics.sensor_values()
             self.data = result
             return result
         except UpdateFailed:
             raise
         except Exception as err:
             _LOGGER.debug("Error updating Cudy data: %s", err, exc_info=True)
-            raise UpdateFailed(err) from err
\ No newline at end of file
+            raise UpdateFailed(err) from err
+        finally:
+            self._align_to_slot()
+            CURRENT_TRACER.reset(token)
+            if tracer is not None:
+                tracer.record("poll", "poll", started, time.perf_counter(), "poll", modules=due)
+                # count the poll once the entities have been written
+                self.hass.loop.call_soon(self._async_trace_poll_done, tracer)
+
+    def _gone_modules(self, due: list[str], answered: set[str]) -> set[str]:
+        """Due modules that came back empty and the api no longer polls."""
+        capabilities = getattr(self.api, "capabilities", None)
+        if not isinstance(capabilities, set):
+            return set()
+        return {m for m in due if m not in answered and m not in capabilities}
+
+    def _align_to_slot(self) -> None:
+        """Schedule the next refresh at this entry's slot."""
+        if self.poll_scheduler is None:
+            return
+        delay = self.poll_scheduler.delay_to_next_slot(self._entry_id)
+        if delay is not None:
+            self.update_interval = timedelta(seconds=delay)
+
+    def _update_device_index(self, data: dict[str, Any]) -> None:
+        devices = (data.get(MODULE_DEVICES) or {}).get(MODULE_DEVICE_LIST)
+        # unchanged pages hand back the same list object; keep its index
+        if devices is self._indexed_devices and devices is not None:
+            return
+        self._indexed_devices = devices
+        index = build_device_index(data)
+        # the totals cover every client, tracked or not
+        self.throughput.update(index)
+        if self._tracked_macs:
+            index = {key: dev for key, dev in index.items() if key in self._tracked_macs}
+        self.device_index = index
+
+    @callback
+    def async_update_listeners(self) -> None:
+        tracer = self.tracer
+        if tracer is None:
+            super().async_update_listeners()
+            return
+        with tracer.span("update entities", "entity", track="poll"):
+            for update_callback, _ in list(self._listeners.values()):
+                with tracer.span(callback_name(update_callback), "entity"):
+                    update_callback()
+
+    @callback
+    def async_start_trace(self, polls: int, path: str) -> PollTracer:
+        """Record spans of the next ``polls`` polls and write them to ``path``."""
+        self.tracer = PollTracer(polls, path, process=self.name)
+        return self.tracer
+
+    @callback
+    def _async_trace_poll_done(self, tracer: PollTracer) -> None:
+        if not tracer.poll_done():
+            return
+        if self.tracer is tracer:
+            self.tracer = None
+        self.hass.async_create_task(self._async_write_trace(tracer))
+
+    async def _async_write_trace(self, tracer: PollTracer) -> None:
+        try:
+            path = await self.hass.async_add_executor_job(tracer.write)
+        except OSError as err:
+            _LOGGER.warning("Could not write poll trace to %s: %s", tracer.path, err)
+            return
+        _LOGGER.info("Poll trace of %s written to %s", self.name, path)
+
+    @callback
+    def async_add_key_listener(
+        self, module: str, keys: str | Iterable[str], update_callback: CALLBACK_TYPE
+    ) -> CALLBACK_TYPE:
+        """Call ``update_callback`` only when one of ``data[module][key]`` changes.
+
+        It is called at most once per refresh, however many of its keys
+        changed. Availability changes (a failed or recovered refresh) are
+        always passed on. Returns a function that removes the listener.
+        """
+        slots = [(module, key) for key in ([keys] if isinstance(keys, str) else keys)]
+        payload = (self.data or {}).get(module)
+        for slot in slots:
+            if slot not in self._key_listeners:
+                # the entity writes its state when added; only later changes count
+                value = payload.get(slot[1]) if isinstance(payload, dict) else None
+                self._published[slot] = value
+            self._key_listeners.setdefault(slot, []).append(update_callback)
+        if self._published_success is None:
+            self._published_success = self.last_update_success
+        # a plain listener keeps the coordinator polling and feeds the diff
+        if self._remove_key_dispatch is None:
+            self._remove_key_dispatch = self.async_add_listener(self._async_dispatch_keys)
+
+        @callback
+        def remove_listener() -> None:
+            for slot in slots:
+                callbacks = self._key_listeners.get(slot)
+                if callbacks and update_callback in callbacks:
+                    callbacks.remove(update_callback)
+                    if not callbacks:
+                        del self._key_listeners[slot]
+                        self._published.pop(slot, None)
+            if not self._key_listeners and self._remove_key_dispatch is not None:
+                self._remove_key_dispatch()
+                self._remove_key_dispatch = None
+
+        return remove_listener
+
+    @callback
+    def _async_dispatch_keys(self) -> None:
+        data = self.data or {}
+        tracer = self.tracer
+        success = self.last_update_success
+        availability_changed = success != self._published_success
+        self._published_success = success
+
+        # callback -> None, so each is called once and in registration order
+        listening: dict[CALLBACK_TYPE, None] = {}
+        changed: dict[CALLBACK_TYPE, None] = {}
+        for slot, callbacks in self._key_listeners.items():
+            module, key = slot
+            listening.update(dict.fromkeys(callbacks))
+            payload = data.get(module)
+            value = payload.get(key) if isinstance(payload, dict) else None
+            if not availability_changed and self._published.get(slot, _MISSING) == value:
+                continue
+            self._published[slot] = value
+            changed.update(dict.fromkeys(callbacks))
+
+        self.update_stats.suppressed_writes += len(listening) - len(changed)
+        for update_callback in changed:
+            self.update_stats.writes += 1
+            traced = (
+                tracer.span(callback_name(update_callback), "entity")
+                if tracer is not None
+                else nullcontext()
+            )
+            with traced:
+                update_callback()
+
+    def _persist_capabilities(self) -> None:
+        if self.store is None:
+            return
+        capabilities = getattr(self.api, "capabilities", None)
+        if capabilities is None or capabilities == self.store.capabilities:
+            return
+        self.store.set_capabilities(
+            capabilities, getattr(self.api, "capabilities_probed_at", None)
+        )
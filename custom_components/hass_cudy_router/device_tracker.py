@@ -1,15 +1,25 @@
 from __future__ import annotations
 
+from collections.abc import Mapping
 from typing import Any
 
 from homeassistant.components.device_tracker.config_entry import TrackerEntity
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import *
 from .coordinator import CudyCoordinator
+from .devices import (
+    Device,
+    build_device_index,
+    device_attributes,
+    device_list,
+    normalize_mac,
+    tracked_macs,
+)
 
 
 def _device_unique_id(entry_id: str, mac: str) -> str:
@@ -27,23 +37,53 @@ async def async_setup_entry(
     spec = data.get("spec")
     if spec and "device_tracker" not in getattr(spec, "platforms", set()):
         return
-    devices = _get_devices(coordinator.data)
-    entities = [
-        CudyDeviceTracker(coordinator, entry, dev)
-        for dev in devices
-    ]
-    async_add_entities(entities)
 
-
-def _get_devices(coordinator_data: dict[str, Any] | None) -> list[dict[str, Any]]:
-    if not coordinator_data:
-        return []
-    mod = coordinator_data.get(MODULE_DEVICES, {}) or {}
-    devs = mod.get(MODULE_DEVICE_LIST, []) or []
-    return [
-        d for d in devs
-        if isinstance(d, dict) and d.get(DEVICE_MAC)
-    ]
+    options = entry.options if isinstance(entry.options, Mapping) else {}
+    selected = tracked_macs(options.get(MODULE_DEVICE_LIST))
+    if selected:
+        _async_remove_unselected(hass, entry, selected)
+
+    tracked: set[str] = set()
+
+    @callback
+    def _async_update_devices() -> None:
+        index = getattr(coordinator, "device_index", None)
+        if not isinstance(index, dict):
+            index = build_device_index(coordinator.data)
+        new = index.keys() - tracked
+        if selected:
+            new &= selected
+        if not new:
+            return
+        tracked.update(new)
+        # keep the router's order so entities are added predictably
+        async_add_entities(
+            [
+                CudyDeviceTracker(coordinator, entry, dev)
+                for key, dev in index.items()
+                if key in new
+            ]
+        )
+
+    _async_update_devices()
+    # clients that connect later get an entity on the next update
+    entry.async_on_unload(coordinator.async_add_listener(_async_update_devices))
+
+
+@callback
+def _async_remove_unselected(hass: HomeAssistant, entry: ConfigEntry, selected: set[str]) -> None:
+    """Drop trackers of MACs that were taken off the tracked devices option."""
+    registry = er.async_get(hass)
+    prefix = _device_unique_id(entry.entry_id, "")
+    for reg_entry in er.async_entries_for_config_entry(registry, entry.entry_id):
+        if reg_entry.domain != "device_tracker" or not reg_entry.unique_id.startswith(prefix):
+            continue
+        if normalize_mac(reg_entry.unique_id[len(prefix):]) not in selected:
+            registry.async_remove(reg_entry.entity_id)
+
+
+def _get_devices(coordinator_data: dict[str, Any] | None) -> list[Device]:
+    return device_list(coordinator_data)
 
 
 class CudyDeviceTracker(CoordinatorEntity, TrackerEntity):
@@ -53,12 +93,13 @@ class CudyDeviceTracker(CoordinatorEntity, TrackerEntity):
         self,
         coordinator: CudyCoordinator,
         entry: ConfigEntry,
-        device: dict[str, Any],
+        device: Device,
     ) -> None:
         super().__init__(coordinator)
         self._entry = entry
         self._initial = device  # IMPORTANT fallback for attributes
         self._mac = str(device.get(DEVICE_MAC) or "").strip()
+        self._mac_key = normalize_mac(self._mac)
         hostname = (device.get(DEVICE_HOSTNAME) or "").strip()
         self._attr_name = hostname or self._mac
         self._attr_unique_id = _device_unique_id(entry.entry_id, self._mac)
@@ -89,11 +130,10 @@ class CudyDeviceTracker(CoordinatorEntity, TrackerEntity):
         dev = self._find_self()
         if dev is None:
             dev = self._initial
-        return dev if isinstance(dev, dict) else None
-
-    def _find_self(self) -> dict[str, Any] | None:
-        devices = _get_devices(getattr(self.coordinator, "data", None))
-        for d in devices:
-            if str(d.get(DEVICE_MAC) or "").strip().lower() == self._mac.lower():
-                return d
-        return None
\ No newline at end of file
+        return device_attributes(dev)
+
+    def _find_self(self) -> Device | None:
+        index = getattr(self.coordinator, "device_index", None)
+        if not isinstance(index, dict):
+            index = build_device_index(getattr(self.coordinator, "data", None))
+        return index.get(self._mac_key)
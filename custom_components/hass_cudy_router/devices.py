@@ -0,0 +1,213 @@
+from __future__ import annotations
+
+import heapq
+import re
+from dataclasses import dataclass, fields
+from typing import Any, Mapping
+
+from .const import (
+    DEVICE_CONNECTION_TYPE,
+    DEVICE_DOWNLOAD_BPS,
+    DEVICE_HOSTNAME,
+    DEVICE_IP,
+    DEVICE_MAC,
+    DEVICE_TOP_CLIENTS_COUNT,
+    DEVICE_UPLOAD_BPS,
+    MODULE_DEVICE_LIST,
+    MODULE_DEVICES,
+    SENSOR_DEVICE_DOWNLOAD_TOTAL,
+    SENSOR_DEVICE_MESH_THROUGHPUT,
+    SENSOR_DEVICE_TOP_CLIENTS,
+    SENSOR_DEVICE_UPLOAD_TOTAL,
+    SENSOR_DEVICE_WIFI_24_THROUGHPUT,
+    SENSOR_DEVICE_WIFI_5_THROUGHPUT,
+    SENSOR_DEVICE_WIFI_6_THROUGHPUT,
+    SENSOR_DEVICE_WIRED_THROUGHPUT,
+)
+
+
+@dataclass(frozen=True, slots=True)
+class DeviceRow:
+    """One devlist client; field names match the DEVICE_* constants.
+
+    A large client table is kept as slotted rows instead of one dict with
+    eight repeated keys per client. ``get`` keeps dict-style lookups working.
+    """
+
+    hostname: str | None = None
+    ip: str | None = None
+    mac: str | None = None
+    upload_speed: str | None = None
+    download_speed: str | None = None
+    signal: str | None = None
+    online_time: str | None = None
+    connection_type: str | None = None
+    # normalized numbers: bits/s, the signal number as printed (dBm on
+    # most firmwares, dB on some), seconds online
+    upload_bps: float | None = None
+    download_bps: float | None = None
+    signal_db: float | None = None
+    online_seconds: int | None = None
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key in _ROW_FIELDS:
+            return getattr(self, key)
+        return default
+
+    def as_dict(self) -> dict[str, Any]:
+        return {name: getattr(self, name) for name in _ROW_FIELDS}
+
+
+_ROW_FIELDS = tuple(f.name for f in fields(DeviceRow))
+
+# a parsed device: DeviceRow from the parser, plain dicts still accepted
+Device = Any
+
+
+def device_attributes(dev: Device) -> dict[str, Any] | None:
+    if isinstance(dev, DeviceRow):
+        return dev.as_dict()
+    return dev if isinstance(dev, dict) else None
+
+
+def normalize_mac(mac: Any) -> str:
+    """'AA:BB-cc.dd' -> 'aabbccdd', so any separator style matches."""
+    return "".join(ch for ch in str(mac or "").lower() if ch not in ":-. ")
+
+
+_MAC_SEPARATORS_RE = re.compile(r"[\s,;]+")
+
+
+def tracked_macs(value: Any) -> set[str]:
+    """normalize_mac() keys of the tracked devices option; empty tracks all."""
+    if isinstance(value, str):
+        value = _MAC_SEPARATORS_RE.split(value)
+    elif not isinstance(value, (list, tuple, set)):
+        return set()
+    return {mac for mac in map(normalize_mac, value) if mac}
+
+
+def device_list(data: dict[str, Any] | None) -> list[Device]:
+    """Connected clients that have a MAC address."""
+    if not data:
+        return []
+    mod = data.get(MODULE_DEVICES, {}) or {}
+    devs = mod.get(MODULE_DEVICE_LIST, []) or []
+    if not isinstance(devs, list):
+        return []
+    return [d for d in devs if isinstance(d, (DeviceRow, dict)) and d.get(DEVICE_MAC)]
+
+
+def build_device_index(data: dict[str, Any] | None) -> dict[str, Device]:
+    """normalize_mac(mac) -> device, first entry wins."""
+    index: dict[str, Device] = {}
+    for dev in device_list(data):
+        index.setdefault(normalize_mac(dev.get(DEVICE_MAC)), dev)
+    return index
+
+
+# devlist connection type label -> per-type throughput sensor
+_KIND_SENSORS = {
+    "2.4g wifi": SENSOR_DEVICE_WIFI_24_THROUGHPUT,
+    "5g wifi": SENSOR_DEVICE_WIFI_5_THROUGHPUT,
+    "6g wifi": SENSOR_DEVICE_WIFI_6_THROUGHPUT,
+    "wired": SENSOR_DEVICE_WIRED_THROUGHPUT,
+    "mesh": SENSOR_DEVICE_MESH_THROUGHPUT,
+}
+
+
+def _kbps(bps: float) -> float:
+    # running sums can drift a hair below zero
+    return round(max(bps, 0.0) / 1000, 2)
+
+
+class ThroughputTracker:
+    """Client throughput totals, kept up to date from the device index.
+
+    Only rows that were added, dropped or changed since the last update
+    are applied, and the top clients come from a bounded heap instead of
+    sorting the whole table.
+    """
+
+    def __init__(self, top_n: int = DEVICE_TOP_CLIENTS_COUNT) -> None:
+        self._top_n = top_n
+        self._rows: dict[str, Device] = {}
+        self._rated = 0
+        self._upload = 0.0
+        self._download = 0.0
+        self._by_kind: dict[str, float] = dict.fromkeys(_KIND_SENSORS.values(), 0.0)
+
+    def update(self, index: Mapping[str, Device]) -> None:
+        for key in self._rows.keys() - index.keys():
+            self._apply(self._rows.pop(key), -1)
+        for key, dev in index.items():
+            old = self._rows.get(key)
+            # each parse builds new rows; an equal row changes nothing
+            if old is dev or old == dev:
+                continue
+            if old is not None:
+                self._apply(old, -1)
+            self._apply(dev, 1)
+            self._rows[key] = dev
+
+    def _apply(self, dev: Device, sign: int) -> None:
+        up = dev.get(DEVICE_UPLOAD_BPS)
+        down = dev.get(DEVICE_DOWNLOAD_BPS)
+        if up is None and down is None:
+            return
+        self._rated += sign
+        if not self._rated:
+            # nothing left to sum; drop accumulated rounding error
+            self._upload = self._download = 0.0
+            self._by_kind = dict.fromkeys(self._by_kind, 0.0)
+            return
+        total = (up or 0.0) + (down or 0.0)
+        self._upload += sign * (up or 0.0)
+        self._download += sign * (down or 0.0)
+        kind = _KIND_SENSORS.get(str(dev.get(DEVICE_CONNECTION_TYPE) or "").strip().lower())
+        if kind is not None:
+            self._by_kind[kind] += sign * total
+
+    def top_clients(self) -> list[dict[str, Any]]:
+        rated = (
+            dev for dev in self._rows.values()
+            if dev.get(DEVICE_UPLOAD_BPS) is not None or dev.get(DEVICE_DOWNLOAD_BPS) is not None
+        )
+        top = heapq.nlargest(
+            self._top_n,
+            rated,
+            key=lambda d: (d.get(DEVICE_UPLOAD_BPS) or 0.0) + (d.get(DEVICE_DOWNLOAD_BPS) or 0.0),
+        )
+        return [
+            {
+                DEVICE_HOSTNAME: dev.get(DEVICE_HOSTNAME),
+                DEVICE_MAC: dev.get(DEVICE_MAC),
+                DEVICE_IP: dev.get(DEVICE_IP),
+                "upload_kbps": _kbps(dev.get(DEVICE_UPLOAD_BPS) or 0.0),
+                "download_kbps": _kbps(dev.get(DEVICE_DOWNLOAD_BPS) or 0.0),
+            }
+            for dev in top
+        ]
+
+    def summary(self) -> dict[str, Any]:
+        """Sensor values in kbit/s; empty while no client reports rates."""
+        if not self._rated:
+            return {}
+        out: dict[str, Any] = {
+            SENSOR_DEVICE_UPLOAD_TOTAL: _kbps(self._upload),
+            SENSOR_DEVICE_DOWNLOAD_TOTAL: _kbps(self._download),
+            SENSOR_DEVICE_TOP_CLIENTS: {"clients": self.top_clients()},
+        }
+        for key, bps in self._by_kind.items():
+            out[key] = _kbps(bps)
+        return out
+
+
+def attach_device_list(devices: Any, rows: list[Device]) -> dict[str, Any]:
+    """``devices`` module dict with the devlist rows under MODULE_DEVICE_LIST.
+
+    Returns a new dict so a cached parse result is never mutated.
+    """
+    out = dict(devices) if isinstance(devices, dict) else {}
+    out[MODULE_DEVICE_LIST] = rows
+    return out
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+from dataclasses import asdict, is_dataclass
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+
+TO_REDACT = {"host", "username", "password", "sysauth"}
+
+
+def _stats(obj: Any, attr: str) -> dict[str, Any] | None:
+    value = getattr(obj, attr, None)
+    return asdict(value) if is_dataclass(value) else None
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Request timings and counters of one router, for the diagnostics download."""
+    data = hass.data.get(DOMAIN, {}).get(entry.entry_id) or {}
+    client = data.get("client")
+    integration = data.get("integration")
+    coordinator = data.get("coordinator")
+    api = getattr(integration, "api", None)
+
+    metrics = getattr(api, "metrics", None)
+    capabilities = getattr(api, "capabilities", None)
+    poll_scheduler = getattr(coordinator, "poll_scheduler", None)
+    lag = getattr(poll_scheduler, "lag", {}).get(entry.entry_id)
+
+    return {
+        "entry": {
+            "data": async_redact_data(dict(entry.data), TO_REDACT),
+            "options": dict(entry.options),
+        },
+        "model": getattr(integration, "model", None),
+        "capabilities": sorted(capabilities) if capabilities is not None else None,
+        "last_update_success": getattr(coordinator, "last_update_success", None),
+        "metrics": metrics.as_dict() if metrics is not None else None,
+        "parse_stats": _stats(api, "parse_stats"),
+        "client_stats": _stats(client, "stats"),
+        "connection_stats": _stats(client, "connection_stats"),
+        "update_stats": _stats(coordinator, "update_stats"),
+        "poll_lag": asdict(lag) if is_dataclass(lag) else None,
+    }
@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import math
+from collections import deque
+from dataclasses import dataclass
+from typing import Any
+
+from .const import *
+
+# where the time of a page request goes, in the order it happens
+REQUEST_PHASES = ("queue", "login", "connect", "ttfb", "body")
+PHASES = REQUEST_PHASES + ("parse",)
+
+
+@dataclass
+class RequestTiming:
+    """Seconds one page spent in each phase; filled in by the api and client."""
+
+    queue: float = 0.0      # waiting for a poll slot or a pooled connection
+    login: float = 0.0      # logging in (again) before the page could be sent
+    connect: float = 0.0    # DNS, TCP and TLS for a new connection
+    ttfb: float = 0.0       # request sent until the response headers arrived
+    body: float = 0.0       # reading the response body
+    bytes: int = 0
+    relogins: int = 0
+
+
+class RollingStat:
+    """The last ``window`` samples of one measurement."""
+
+    __slots__ = ("_samples",)
+
+    def __init__(self, window: int = METRICS_WINDOW) -> None:
+        self._samples: deque[float] = deque(maxlen=window)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def add(self, value: float) -> None:
+        self._samples.append(value)
+
+    def percentile(self, q: float) -> float | None:
+        """Nearest-rank percentile, None without samples."""
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[max(1, math.ceil(q / 100 * len(ordered))) - 1]
+
+    @property
+    def p50(self) -> float | None:
+        return self.percentile(50)
+
+    @property
+    def p95(self) -> float | None:
+        return self.percentile(95)
+
+    def as_dict(self, scale: float = 1.0) -> dict[str, Any]:
+        return {
+            "count": len(self),
+            "p50": _scaled(self.p50, scale),
+            "p95": _scaled(self.p95, scale),
+        }
+
+
+def _scaled(value: float | None, scale: float) -> float | None:
+    return None if value is None else round(value * scale, 1)
+
+
+class _ModuleMetrics:
+    __slots__ = ("phases", "bytes", "requests", "relogins")
+
+    def __init__(self, window: int) -> None:
+        self.phases = {phase: RollingStat(window) for phase in PHASES}
+        self.bytes = RollingStat(window)
+        self.requests = 0
+        self.relogins = 0
+
+
+class PollMetrics:
+    """Rolling per-module request timings of the last ``window`` polls."""
+
+    def __init__(self, window: int = METRICS_WINDOW) -> None:
+        self._window = window
+        self.modules: dict[str, _ModuleMetrics] = {}
+        self.phases = {phase: RollingStat(window) for phase in PHASES}
+        self.poll_seconds = RollingStat(window)
+        self.poll_bytes = RollingStat(window)
+        self.polls = 0
+        self.relogins = 0
+
+    def _module(self, module: str) -> _ModuleMetrics:
+        metrics = self.modules.get(module)
+        if metrics is None:
+            metrics = self.modules[module] = _ModuleMetrics(self._window)
+        return metrics
+
+    def record_request(self, module: str, timing: RequestTiming) -> None:
+        metrics = self._module(module)
+        metrics.requests += 1
+        metrics.relogins += timing.relogins
+        metrics.bytes.add(timing.bytes)
+        self.relogins += timing.relogins
+        for phase in REQUEST_PHASES:
+            value = getattr(timing, phase)
+            metrics.phases[phase].add(value)
+            self.phases[phase].add(value)
+
+    def record_parse(self, module: str, seconds: float) -> None:
+        self._module(module).phases["parse"].add(seconds)
+        self.phases["parse"].add(seconds)
+
+    def record_poll(self, seconds: float, nbytes: int) -> None:
+        self.polls += 1
+        self.poll_seconds.add(seconds)
+        self.poll_bytes.add(nbytes)
+
+    def sensor_values(self) -> dict[str, Any]:
+        """Values of the diagnostic sensors, times in ms."""
+        return {
+            SENSOR_POLL_DURATION_P50: _scaled(self.poll_seconds.p50, 1000),
+            SENSOR_POLL_DURATION_P95: _scaled(self.poll_seconds.p95, 1000),
+            SENSOR_REQUEST_TTFB_P95: _scaled(self.phases["ttfb"].p95, 1000),
+            SENSOR_PARSE_TIME_P95: _scaled(self.phases["parse"].p95, 1000),
+            SENSOR_POLL_BYTES_P50: self.poll_bytes.p50,
+            SENSOR_RELOGINS: self.relogins,
+            SENSOR_POLL_PHASES: {
+                phase: stat.as_dict(1000) for phase, stat in self.phases.items()
+            },
+        }
+
+    def as_dict(self) -> dict[str, Any]:
+        """Everything, per module, for the diagnostics download (ms / bytes)."""
+        return {
+            "window": self._window,
+            "polls": self.polls,
+            "relogins": self.relogins,
+            "poll_ms": self.poll_seconds.as_dict(1000),
+            "poll_bytes": self.poll_bytes.as_dict(),
+            "phases_ms": {phase: stat.as_dict(1000) for phase, stat in self.phases.items()},
+            "modules": {
+                module: {
+                    "requests": metrics.requests,
+                    "relogins": metrics.relogins,
+                    "bytes": metrics.bytes.as_dict(),
+                    "phases_ms": {
+                        phase: stat.as_dict(1000) for phase, stat in metrics.phases.items()
+                    },
+                }
+                for module, metrics in sorted(self.modules.items())
+            },
+        }
@@ -14,7 +14,11 @@ SPECIAL_CASES = {
 }
 
 
-async def detect_model(client: Any) -> str:
+async def detect_model(client: Any, system: Dict | None = None) -> str:
+    """Detect the model, reusing an already parsed system payload if given."""
+    if system and system.get(SENSOR_SYSTEM_MODEL):
+        return fit_model(system)
+
     path = f"/cgi-bin/luci{CAPABILITY_URLS[MODULE_SYSTEM][0]}"
     try:
         html = await client.get(path)
@@ -1,7 +1,10 @@
 # custom_components/hass_cudy_router/parsers.py
 from __future__ import annotations
 
-from typing import Any, Optional
+from html.parser import HTMLParser
+from typing import Any, Iterator, NamedTuple, Optional, Union
+import importlib.util
+import logging
 import re
 
 from bs4 import BeautifulSoup
@@ -15,9 +18,37 @@ from custom_components.hass_cudy_router.const import (
     MODULE_DEVICES,
     MODULE_DEVICE_LIST,
 )
+from custom_components.hass_cudy_router.devices import DeviceRow
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _select_parser_backend() -> str:
+    """Pick the fastest BeautifulSoup tree builder that is installed."""
+    if importlib.util.find_spec("lxml") is not None:
+        return "lxml"
+    return "html.parser"
+
+
+PARSER_BACKEND = _select_parser_backend()
+_LOGGER.debug("Using %s HTML parser backend", PARSER_BACKEND)
+
+# A page is either raw HTML or a document already parsed by make_soup();
+# parse_html parses once and hands the same tree to every extractor.
+Document = Union[str, BeautifulSoup, None]
 
 # ---- Helpers ---------------------------------------------------------------
 
+def make_soup(html: str) -> BeautifulSoup:
+    return BeautifulSoup(html, PARSER_BACKEND)
+
+def _as_soup(doc: Document) -> BeautifulSoup | None:
+    if isinstance(doc, BeautifulSoup):
+        return doc
+    if not doc:
+        return None
+    return make_soup(doc)
+
 def _clean(s: str | None) -> str:
     return " ".join((s or "").split()).strip()
 
@@ -34,17 +65,16 @@ def _to_int_if_possible(value: str | None) -> Optional[int]:
         return int(m.group(1)) if m else None
 
 
-def extract_kv_pairs(html: str) -> dict[str, str]:
+def extract_kv_pairs(doc: Document) -> dict[str, str]:
     """
     Best-effort extraction of "Label" -> "Value" from a LuCI status page.
     Supports table (tr/td or tr/th) and dl/dt/dd.
     """
     out: dict[str, str] = {}
-    if not html:
+    soup = _as_soup(doc)
+    if soup is None:
         return out
 
-    soup = BeautifulSoup(html, "html.parser")
-
     # Tables
     for table in soup.find_all("table"):
         for tr in table.find_all("tr"):
@@ -78,29 +108,27 @@ def extract_kv_pairs(html: str) -> dict[str, str]:
     return out
 
 
-def extract_xhr_endpoints(html: str) -> dict[str, dict[str, str]]:
+# Matches: cbi_xhr_load(..., '/cgi-bin/luci/admin/...', 'argstring');
+_XHR_LOAD_RE = re.compile(
+    r"cbi_xhr_load\([^\)]*'([^']+)'(?:\s*,\s*'([^']*)')?\)",
+    re.MULTILINE,
+)
+
+def extract_xhr_endpoints(doc: Document) -> dict[str, dict[str, str]]:
     """
     Extract endpoints from pages that use cbi_xhr_load.
     Returns: { "/cgi-bin/luci/...": {"args": "nomodal=&iface=4g"} , ... }
     """
     endpoints: dict[str, dict[str, str]] = {}
-    if not html:
+    soup = _as_soup(doc)
+    if soup is None:
         return endpoints
 
-    soup = BeautifulSoup(html, "html.parser")
-    scripts = soup.find_all("script")
-
-    # Matches: cbi_xhr_load(..., '/cgi-bin/luci/admin/...', 'argstring');
-    re_load = re.compile(
-        r"cbi_xhr_load\([^\)]*'([^']+)'(?:\s*,\s*'([^']*)')?\)",
-        re.MULTILINE,
-    )
-
-    for script in scripts:
+    for script in soup.find_all("script"):
         text = script.string or script.get_text()
         if not text:
             continue
-        for m in re_load.finditer(text):
+        for m in _XHR_LOAD_RE.finditer(text):
             url = m.group(1)
             args = m.group(2) or ""
             endpoints[url] = {"args": args}
@@ -108,30 +136,60 @@ def extract_xhr_endpoints(html: str) -> dict[str, dict[str, str]]:
     return endpoints
 
 
-def parse_module_by_sensors(module: str, html: str) -> dict[str, Any]:
-    sensors = SENSORS.get(module, [])
-    kv = extract_kv_pairs(html)
+class _LabelMatch(NamedTuple):
+    sensor_key: str
+    rank: int      # position of the label in SENSORS_KEY_DESCRIPTION
+    label: str     # cleaned label, for the case-sensitive preference
+
+
+def _compile_label_index(
+    sensors: dict[str, list[dict[str, Any]]],
+) -> dict[str, dict[str, list[_LabelMatch]]]:
+    """module -> lowercased label -> sensors that use the label."""
+    index: dict[str, dict[str, list[_LabelMatch]]] = {}
+    for module, specs in sensors.items():
+        labels: dict[str, list[_LabelMatch]] = {}
+        for spec in specs:
+            for rank, label in enumerate(spec.get(SENSORS_KEY_DESCRIPTION, []) or []):
+                label = _clean(label)
+                if label:
+                    labels.setdefault(label.lower(), []).append(
+                        _LabelMatch(spec[SENSORS_KEY_KEY], rank, label)
+                    )
+        index[module] = labels
+    return index
 
-    # case-insensitive lookup
-    kv_lower = {k.lower(): v for k, v in kv.items()}
+
+_LABEL_INDEX = _compile_label_index(SENSORS)
+
+
+def parse_module_by_sensors(module: str, doc: Document) -> dict[str, Any]:
+    sensors = SENSORS.get(module, [])
+    labels = _LABEL_INDEX.get(module, {})
+    kv = extract_kv_pairs(doc)
+
+    # sensor key -> (rank, exact case, value). The earliest label in the
+    # description wins; for the same label an exact-case row beats a
+    # case-insensitive one, and among those the last row wins.
+    best: dict[str, tuple[int, bool, str]] = {}
+    for k, v in kv.items():
+        matches = labels.get(k.lower())
+        if not matches:
+            continue
+        for match in matches:
+            exact = k == match.label
+            current = best.get(match.sensor_key)
+            if (
+                current is None
+                or match.rank < current[0]
+                or (match.rank == current[0] and not current[1])
+            ):
+                best[match.sensor_key] = (match.rank, exact, v)
 
     result: dict[str, Any] = {}
     for spec in sensors:
         sensor_key = spec[SENSORS_KEY_KEY]
-        labels: list[str] = spec.get(SENSORS_KEY_DESCRIPTION, []) or []
-
-        found: str | None = None
-        for label in labels:
-            label = _clean(label)
-            if not label:
-                continue
-            if label in kv:
-                found = kv[label]
-                break
-            low = label.lower()
-            if low in kv_lower:
-                found = kv_lower[low]
-                break
+        found = best[sensor_key][2] if sensor_key in best else None
 
         state_class = spec.get(SENSORS_KEY_CLASS)
         if state_class == SensorStateClass.MEASUREMENT:
@@ -144,7 +202,7 @@ def parse_module_by_sensors(module: str, html: str) -> dict[str, Any]:
 
 # ---- Special: Devices summary (combines both variants) ---------------------
 
-def parse_devices(html: str) -> dict[str, Any]:
+def parse_devices(doc: Document) -> dict[str, Any]:
     """
     Combines:
     - label/value rows (Online/Blocked, etc.)
@@ -152,6 +210,17 @@ def parse_devices(html: str) -> dict[str, Any]:
     - per-type rows like 2.4G / 5G / Wired / Mesh
     Still uses parse_module_by_sensors for initial fill.
     """
+    soup = _as_soup(doc)
+    result = parse_module_by_sensors(MODULE_DEVICES, soup)
+
+    if soup is None:
+        return result
+
+    return _fill_devices_table(soup, result)
+
+
+def _fill_devices_table(soup: BeautifulSoup, result: dict[str, Any]) -> dict[str, Any]:
+    """Overlay the totals of the devices table on the label/value result."""
     from custom_components.hass_cudy_router.const import (
         SENSOR_DEVICE_COUNT,
         SENSOR_DEVICE_ONLINE,
@@ -162,12 +231,6 @@ def parse_devices(html: str) -> dict[str, Any]:
         SENSOR_DEVICE_MESH_COUNT,
     )
 
-    result = parse_module_by_sensors(MODULE_DEVICES, html)
-
-    if not html:
-        return result
-
-    soup = BeautifulSoup(html, "html.parser")
     table = soup.select_one("table.table")
     if not table:
         return result
@@ -217,29 +280,134 @@ def parse_devices(html: str) -> dict[str, Any]:
 
 _UP_RE = re.compile(r"↑\s*([\d.]+)\s*([A-Za-z/]+)")
 _DOWN_RE = re.compile(r"↓\s*([\d.]+)\s*([A-Za-z/]+)")
+# most firmwares draw the arrows as icons, leaving "0.50 Kbps 0.58 Kbps"
+_RATE_RE = re.compile(r"([\d.]+)\s*([KMGkmg]?)(?:bps|bit/s)")
+_RATE_SCALE = {"": 1, "k": 1e3, "m": 1e6, "g": 1e9}
+_SIGNAL_RE = re.compile(r"(-?\d+(?:\.\d+)?)\s*dB")
+_ONLINE_RE = re.compile(r"(?:(\d+)\s*Days?\s*)?(\d+):(\d{2}):(\d{2})", re.IGNORECASE)
+_TABLE_CLASS_RE = re.compile(r"\btable\b")
+_HIDDEN_XS_RE = re.compile(r"\bhidden-xs\b")
+
+# devlist columns we read; each maps to the strings of its first p.hidden-xs
+_COL_HOST = 1
+_COL_IPMAC = 4
+_COL_SPEED = 5
+_COL_SIGNAL = 6
+_COL_ONLINE = 7
+_DEVLIST_COLUMNS = (_COL_HOST, _COL_IPMAC, _COL_SPEED, _COL_SIGNAL, _COL_ONLINE)
+
+# parse_html uses the tokenizer below instead of building a DOM for devlist
+DEVLIST_STREAMING = True
+
+
+def parse_rate(text: str | None) -> float | None:
+    """'0.50Kbps' -> 500.0 (bits/s)."""
+    m = _RATE_RE.search(text or "")
+    if not m:
+        return None
+    try:
+        return float(m.group(1)) * _RATE_SCALE[m.group(2).lower()]
+    except ValueError:
+        return None
+
+
+def parse_signal(text: str | None) -> float | None:
+    """'-67 dBm' -> -67.0; '---' -> None."""
+    m = _SIGNAL_RE.search(text or "")
+    return float(m.group(1)) if m else None
+
+
+def parse_online_time(text: str | None) -> int | None:
+    """'3 Day 17:14:44' -> 321284 (seconds)."""
+    m = _ONLINE_RE.search(text or "")
+    if not m:
+        return None
+    days, hours, minutes, seconds = (int(g or 0) for g in m.groups())
+    return ((days * 24 + hours) * 60 + minutes) * 60 + seconds
+
+
+def _device_from_columns(cells: dict[int, list[str]]) -> DeviceRow:
+    """Build a device row from the text strings of the devlist cells."""
+    hostname = None
+    conn_type = None
+    ip = None
+    mac = None
+    upload = None
+    download = None
+    signal = None
+    online = None
+
+    # hostname + conn type
+    strings = cells.get(_COL_HOST)
+    if strings is not None:
+        parts = [t.strip() for t in strings if t.strip()]
+        if parts:
+            hostname = parts[0]
+        if len(parts) > 1:
+            conn_type = parts[1]
+
+    # ip + mac
+    strings = cells.get(_COL_IPMAC)
+    if strings is not None:
+        parts = [t.strip() for t in strings if t.strip()]
+        if parts:
+            ip = parts[0]
+        if len(parts) > 1:
+            mac = parts[1]
+
+    # speeds
+    strings = cells.get(_COL_SPEED)
+    if strings is not None:
+        txt = " ".join(strings)
+        up_m = _UP_RE.search(txt)
+        down_m = _DOWN_RE.search(txt)
+        if up_m:
+            upload = f"{up_m.group(1)}{up_m.group(2)}"
+        if down_m:
+            download = f"{down_m.group(1)}{down_m.group(2)}"
+        if not (up_m or down_m):
+            # icon arrows: upload comes first, download second
+            rates = ["".join(m.group(0).split()) for m in _RATE_RE.finditer(txt)]
+            if rates:
+                upload = rates[0]
+            if len(rates) > 1:
+                download = rates[1]
+
+    # signal + online time
+    strings = cells.get(_COL_SIGNAL)
+    if strings is not None:
+        signal = _clean("".join(strings))
+    strings = cells.get(_COL_ONLINE)
+    if strings is not None:
+        online = _clean("".join(strings))
+
+    return DeviceRow(
+        hostname=hostname,
+        ip=ip,
+        mac=mac,
+        upload_speed=upload,
+        download_speed=download,
+        signal=signal,
+        online_time=online,
+        connection_type=conn_type,
+        upload_bps=parse_rate(upload),
+        download_bps=parse_rate(download),
+        signal_db=parse_signal(signal),
+        online_seconds=parse_online_time(online),
+    )
+
 
-def parse_device_list(html: str) -> list[dict[str, Any]]:
+def parse_device_list(doc: Document) -> list[DeviceRow]:
     """
     Parses /admin/network/devices/devlist
-    Returns list of dicts keyed by DEVICE_* constants.
+    Returns list of DeviceRow (fields named like the DEVICE_* constants).
     """
-    from custom_components.hass_cudy_router.const import (
-        DEVICE_HOSTNAME,
-        DEVICE_IP,
-        DEVICE_MAC,
-        DEVICE_UPLOAD_SPEED,
-        DEVICE_DOWNLOAD_SPEED,
-        DEVICE_SIGNAL,
-        DEVICE_ONLINE_TIME,
-        DEVICE_CONNECTION_TYPE,
-    )
-
-    out: list[dict[str, Any]] = []
-    if not html:
+    out: list[DeviceRow] = []
+    soup = _as_soup(doc)
+    if soup is None:
         return out
 
-    soup = BeautifulSoup(html, "html.parser")
-    table = soup.find("table", class_=re.compile(r"\btable\b"))
+    table = soup.find("table", class_=_TABLE_CLASS_RE)
     if not table:
         return out
 
@@ -248,73 +416,130 @@ def parse_device_list(html: str) -> list[dict[str, Any]]:
         if len(cols) < 6:
             continue
 
-        hostname = None
-        conn_type = None
-        ip = None
-        mac = None
-        upload = None
-        download = None
-        signal = None
-        online = None
-
-        # hostname + conn type
-        if len(cols) > 1:
-            host_p = cols[1].find("p", class_=re.compile(r"\bhidden-xs\b"))
-            if host_p:
-                parts = [t.strip() for t in host_p.stripped_strings]
-                if parts:
-                    hostname = parts[0]
-                if len(parts) > 1:
-                    conn_type = parts[1]
-
-        # ip + mac
-        if len(cols) > 4:
-            ipmac_p = cols[4].find("p", class_=re.compile(r"\bhidden-xs\b"))
-            if ipmac_p:
-                parts = [t.strip() for t in ipmac_p.stripped_strings]
-                if parts:
-                    ip = parts[0]
-                if len(parts) > 1:
-                    mac = parts[1]
-
-        # speeds
-        if len(cols) > 5:
-            speed_p = cols[5].find("p", class_=re.compile(r"\bhidden-xs\b"))
-            if speed_p:
-                txt = speed_p.get_text(" ")
-                up_m = _UP_RE.search(txt)
-                down_m = _DOWN_RE.search(txt)
-                if up_m:
-                    upload = f"{up_m.group(1)}{up_m.group(2)}"
-                if down_m:
-                    download = f"{down_m.group(1)}{down_m.group(2)}"
-
-        # signal + online time
-        if len(cols) > 6:
-            sig_p = cols[6].find("p", class_=re.compile(r"\bhidden-xs\b"))
-            if sig_p:
-                signal = _clean(sig_p.get_text())
-        if len(cols) > 7:
-            on_p = cols[7].find("p", class_=re.compile(r"\bhidden-xs\b"))
-            if on_p:
-                online = _clean(on_p.get_text())
-
-        out.append(
-            {
-                DEVICE_HOSTNAME: hostname,
-                DEVICE_IP: ip,
-                DEVICE_MAC: mac,
-                DEVICE_UPLOAD_SPEED: upload,
-                DEVICE_DOWNLOAD_SPEED: download,
-                DEVICE_SIGNAL: signal,
-                DEVICE_ONLINE_TIME: online,
-                DEVICE_CONNECTION_TYPE: conn_type,
-            }
-        )
+        cells: dict[int, list[str]] = {}
+        for idx in _DEVLIST_COLUMNS:
+            if len(cols) > idx:
+                p = cols[idx].find("p", class_=_HIDDEN_XS_RE)
+                if p:
+                    cells[idx] = list(p.strings)
+
+        out.append(_device_from_columns(cells))
 
     return out
 
 
+class _DevlistTokenizer(HTMLParser):
+    """Collects devlist cells without building a tree.
+
+    Mirrors parse_device_list: first table.table, rows matching
+    ``tbody tr[id^='cbi-table-']``, and the strings of the first
+    ``p.hidden-xs`` inside the interesting columns.
+    """
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.rows: list[DeviceRow] = []
+        self._table_depth = 0      # >0 while inside the devlist table
+        self._table_done = False   # only the first matching table counts
+        self._tbody_depth = 0
+        self._row_depth = 0        # >0 while inside a cbi-table row
+        self._col = -1
+        self._cells: dict[int, list[str]] = {}
+        self._p_depth = 0          # >0 while capturing a p.hidden-xs
+        self._text: list[str] = []  # pending text, merged like bs4 does
+
+    @staticmethod
+    def _has_class(attrs: list[tuple[str, str | None]], pattern: re.Pattern) -> bool:
+        for name, value in attrs:
+            if name == "class" and value:
+                if pattern.search(value) or any(pattern.search(c) for c in value.split()):
+                    return True
+        return False
+
+    def _flush_text(self) -> None:
+        if self._text:
+            if self._p_depth:
+                self._cells[self._col].append("".join(self._text))
+            self._text = []
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        self._flush_text()
+
+        if not self._table_depth:
+            if tag == "table" and not self._table_done and self._has_class(attrs, _TABLE_CLASS_RE):
+                self._table_depth = 1
+            return
+
+        if tag == "table":
+            self._table_depth += 1
+        elif tag == "tbody":
+            self._tbody_depth += 1
+        elif tag == "tr":
+            if self._row_depth:
+                self._row_depth += 1
+            elif self._tbody_depth and (dict(attrs).get("id") or "").startswith("cbi-table-"):
+                self._row_depth = 1
+                self._col = -1
+                self._cells = {}
+        elif not self._row_depth:
+            return
+        elif tag == "td":
+            self._col += 1
+        elif tag == "p":
+            if self._p_depth:
+                self._p_depth += 1
+            elif (
+                self._col in _DEVLIST_COLUMNS
+                and self._col not in self._cells
+                and self._has_class(attrs, _HIDDEN_XS_RE)
+            ):
+                self._p_depth = 1
+                self._cells[self._col] = []
+
+    def handle_endtag(self, tag: str) -> None:
+        self._flush_text()
+
+        if not self._table_depth:
+            return
+
+        if tag == "table":
+            self._table_depth -= 1
+            if not self._table_depth:
+                self._table_done = True
+        elif tag == "tbody":
+            self._tbody_depth = max(0, self._tbody_depth - 1)
+        elif tag == "tr" and self._row_depth:
+            self._row_depth -= 1
+            if not self._row_depth:
+                self._p_depth = 0
+                if self._col + 1 >= 6:
+                    self.rows.append(_device_from_columns(self._cells))
+        elif tag == "p" and self._p_depth:
+            self._p_depth -= 1
+
+    def handle_data(self, data: str) -> None:
+        if self._p_depth:
+            self._text.append(data)
+
+
+def iter_device_list(html: str, chunk_size: int = 8192) -> Iterator[DeviceRow]:
+    """Streaming devlist parser: yields device rows as they complete."""
+    if not html:
+        return
+    tokenizer = _DevlistTokenizer()
+    for start in range(0, len(html), chunk_size):
+        tokenizer.feed(html[start:start + chunk_size])
+        if tokenizer.rows:
+            yield from tokenizer.rows
+            tokenizer.rows.clear()
+    tokenizer.close()
+    yield from tokenizer.rows
+
+
+def parse_device_list_streaming(html: str) -> list[DeviceRow]:
+    return list(iter_device_list(html))
+
+
 # ---- Dispatcher ------------------------------------------------------------
 
 def parse_html(module: str, html: str) -> Any:
@@ -327,17 +552,24 @@ def parse_html(module: str, html: str) -> Any:
     if not html:
         return [] if module == MODULE_DEVICE_LIST else {}
 
+    # devlist is the largest page; skip the DOM unless it is an XHR shell
+    if module == MODULE_DEVICE_LIST and DEVLIST_STREAMING and "cbi_xhr_load" not in html:
+        return parse_device_list_streaming(html)
+
+    # parse once, every step below works on the same tree
+    soup = make_soup(html)
+
     # XHR shell detection (important for gsm/sms sometimes)
-    xhr = extract_xhr_endpoints(html)
+    xhr = extract_xhr_endpoints(soup)
     if xhr:
         # let API fetch each xhr endpoint and parse those fragments separately
         return {"xhr_endpoints": xhr}
 
     if module == MODULE_DEVICES:
-        return parse_devices(html)
+        return parse_devices(soup)
 
     if module == MODULE_DEVICE_LIST:
-        return parse_device_list(html)
+        return parse_device_list(soup)
 
     # default driven purely by SENSORS descriptors
-    return parse_module_by_sensors(module, html)
\ No newline at end of file
+    return parse_module_by_sensors(module, soup)
\ No newline at end of file
@@ -8,7 +8,9 @@ from homeassistant.config_entries import ConfigEntry
 from .client import CudyClient
 from .coordinator import CudyCoordinator
 from .api import CudyApi
-from .const import CUDY_DEVICES
+from .const import CUDY_DEVICES, CONF_MAX_CONCURRENT_REQUESTS, DEFAULT_MAX_CONCURRENT_REQUESTS
+from .scheduler import async_get_poll_scheduler
+from .storage import CudyStorage
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -25,41 +27,71 @@ class CudyIntegration:
         hass: HomeAssistant,
         entry: ConfigEntry,
         client: CudyClient,
-        model: str,
+        model: str | None,
     ) -> None:
         self.hass = hass
         self.entry = entry
         self.client = client
         self.model = model
 
-        self.api = CudyApi(client)
+        options = getattr(entry, "options", None) or {}
+        self.api = CudyApi(
+            client,
+            max_concurrent_requests=options.get(
+                CONF_MAX_CONCURRENT_REQUESTS, DEFAULT_MAX_CONCURRENT_REQUESTS
+            ),
+            executor=hass.async_add_executor_job,
+        )
+
+        self.store = CudyStorage(hass, entry.entry_id)
 
         self.coordinator = CudyCoordinator(
             hass=hass,
             entry=entry,
             api=self.api,
             host=entry.data.get("host"),
+            store=self.store,
+            poll_scheduler=async_get_poll_scheduler(hass),
         )
 
     async def async_setup(self) -> None:
+        await self.store.async_load()
+        self.api.restore_capabilities(
+            self.store.capabilities, self.store.capabilities_probed_at
+        )
+
+        # skip the LuCI login when the router still accepts the last session
+        restore = getattr(self.client, "restore_session", None)
+        if callable(restore):
+            restore(self.store.sysauth, self.store.auth_scheme)
+        set_listener = getattr(self.client, "set_session_listener", None)
+        if callable(set_listener):
+            set_listener(self.store.set_session)
         await self.coordinator.async_config_entry_first_refresh()
 
+    async def async_reprobe_capabilities(self) -> None:
+        """Probe every module again on the next refresh."""
+        self.api.invalidate_capabilities()
+        self.coordinator.scheduler.reset()
+        await self.coordinator.async_request_refresh()
 
-async def create_model_integration(
-    model: str,
+
+def create_integration(
     hass: HomeAssistant,
     entry: ConfigEntry,
     client: CudyClient,
 ) -> CudyIntegration:
-    if model not in CUDY_DEVICES:
-        _LOGGER.error("Unsupported or unknown Cudy model detected: %s", model)
-        raise ValueError(f"Unsupported Cudy model: {model}")
-
-    integration = CudyIntegration(
+    """Build the runtime objects; nothing is fetched until async_setup()."""
+    return CudyIntegration(
         hass=hass,
         entry=entry,
         client=client,
-        model=model,
+        model=None,
     )
-    await integration.async_setup()
-    return integration
\ No newline at end of file
+
+
+def assign_model(integration: CudyIntegration, model: str) -> None:
+    if model not in CUDY_DEVICES:
+        _LOGGER.error("Unsupported or unknown Cudy model detected: %s", model)
+        raise ValueError(f"Unsupported Cudy model: {model}")
+    integration.model = model
@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import math
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator, Callable, Iterable, Mapping
+
+from homeassistant.core import HomeAssistant
+
+from .const import (
+    CAPABILITY_URLS,
+    CONF_SCAN_INTERVAL_SLOW,
+    CONF_SCAN_INTERVAL_STATIC,
+    DEFAULT_SCAN_INTERVAL,
+    DOMAIN,
+    MAX_CONCURRENT_ROUTER_POLLS,
+    DEFAULT_SCAN_INTERVAL_SLOW,
+    DEFAULT_SCAN_INTERVAL_STATIC,
+    MODULE_POLL_TIERS,
+    POLL_TIER_FAST,
+    POLL_TIER_SLOW,
+    POLL_TIER_STATIC,
+)
+
+
+def tier_intervals(options: Mapping, scan_seconds: int) -> dict[str, int]:
+    """Resolve tier -> seconds from the config entry options."""
+    return {
+        POLL_TIER_FAST: scan_seconds,
+        POLL_TIER_SLOW: max(
+            scan_seconds,
+            int(options.get(CONF_SCAN_INTERVAL_SLOW, DEFAULT_SCAN_INTERVAL_SLOW)),
+        ),
+        POLL_TIER_STATIC: max(
+            scan_seconds,
+            int(options.get(CONF_SCAN_INTERVAL_STATIC, DEFAULT_SCAN_INTERVAL_STATIC)),
+        ),
+    }
+
+
+class ModuleScheduler:
+    """Tracks when each module in CAPABILITY_URLS is next due.
+
+    The coordinator ticks at the fast interval and asks which modules are
+    due; slower tiers are simply skipped until their interval has passed.
+    """
+
+    def __init__(self, intervals: Mapping[str, int] | None = None) -> None:
+        self._intervals: dict[str, int] = dict(intervals or {
+            POLL_TIER_FAST: DEFAULT_SCAN_INTERVAL,
+            POLL_TIER_SLOW: DEFAULT_SCAN_INTERVAL_SLOW,
+            POLL_TIER_STATIC: DEFAULT_SCAN_INTERVAL_STATIC,
+        })
+        self._last_polled: dict[str, float] = {}
+
+    def interval_for(self, module: str) -> int:
+        tier = MODULE_POLL_TIERS.get(module, POLL_TIER_FAST)
+        return self._intervals.get(tier, self._intervals[POLL_TIER_FAST])
+
+    def due_modules(self, now: float | None = None) -> list[str]:
+        if now is None:
+            now = time.monotonic()
+        fast = self._intervals[POLL_TIER_FAST]
+        due: list[str] = []
+        for module in CAPABILITY_URLS.keys():
+            last = self._last_polled.get(module)
+            # half a fast tick of slack so timer drift does not skip a cycle
+            if last is None or now - last >= self.interval_for(module) - fast / 2:
+                due.append(module)
+        return due
+
+    def mark_polled(self, modules: Iterable[str], now: float | None = None) -> None:
+        if now is None:
+            now = time.monotonic()
+        for module in modules:
+            self._last_polled[module] = now
+
+    def reset(self) -> None:
+        """Make every module due on the next refresh."""
+        self._last_polled.clear()
+
+
+@dataclass
+class PollLag:
+    """How late an entry's polls started compared to its slot."""
+
+    polls: int = 0
+    last_seconds: float = 0.0
+    max_seconds: float = 0.0
+    total_seconds: float = 0.0
+
+
+def _entry_rank_key(entry_id: str) -> str:
+    # stable across restarts, unlike hash()
+    return hashlib.sha1(entry_id.encode()).hexdigest()
+
+
+class RouterPollScheduler:
+    """Spreads the polls of every Cudy config entry over the interval.
+
+    Entries are ordered by a hash of their id and entry i of n polls at
+    ``i / n`` of its interval. At most ``max_concurrent`` routers are
+    polled at once; time spent waiting for a free slot shows up as lag.
+    """
+
+    def __init__(self, max_concurrent: int = MAX_CONCURRENT_ROUTER_POLLS) -> None:
+        self._semaphore = asyncio.Semaphore(max(1, max_concurrent))
+        self._intervals: dict[str, float] = {}
+        self._offsets: dict[str, float] = {}
+        self._planned: dict[str, float] = {}
+        self.lag: dict[str, PollLag] = {}
+
+    def register(self, entry_id: str, interval: float) -> Callable[[], None]:
+        self._intervals[entry_id] = float(interval)
+        self.lag.setdefault(entry_id, PollLag())
+        self._spread()
+
+        def unregister() -> None:
+            self._intervals.pop(entry_id, None)
+            self._planned.pop(entry_id, None)
+            self.lag.pop(entry_id, None)
+            self._spread()
+
+        return unregister
+
+    def _spread(self) -> None:
+        ordered = sorted(self._intervals, key=_entry_rank_key)
+        count = len(ordered)
+        self._offsets = {
+            entry_id: self._intervals[entry_id] * rank / count
+            for rank, entry_id in enumerate(ordered)
+        }
+
+    def offset(self, entry_id: str) -> float:
+        return self._offsets.get(entry_id, 0.0)
+
+    def delay_to_next_slot(self, entry_id: str, now: float | None = None) -> float | None:
+        """Seconds until the entry's next slot; None if it is not registered."""
+        interval = self._intervals.get(entry_id)
+        if not interval:
+            return None
+        if now is None:
+            now = time.monotonic()
+        offset = self._offsets.get(entry_id, 0.0)
+        slot = offset + interval * math.ceil((now - offset) / interval)
+        # a poll that ran a little long must not trigger an immediate one
+        if slot - now < interval / 2:
+            slot += interval
+        self._planned[entry_id] = slot
+        return slot - now
+
+    @asynccontextmanager
+    async def poll(self, entry_id: str) -> AsyncIterator[None]:
+        """Hold one of the global poll slots and record the start lag."""
+        async with self._semaphore:
+            planned = self._planned.pop(entry_id, None)
+            lag = self.lag.get(entry_id)
+            if planned is not None and lag is not None:
+                late = max(0.0, time.monotonic() - planned)
+                lag.polls += 1
+                lag.last_seconds = late
+                lag.max_seconds = max(lag.max_seconds, late)
+                lag.total_seconds += late
+            yield
+
+
+POLL_SCHEDULER = "poll_scheduler"
+
+
+def async_get_poll_scheduler(hass: HomeAssistant) -> RouterPollScheduler:
+    """The one RouterPollScheduler shared by every entry of this integration."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    scheduler = domain_data.get(POLL_SCHEDULER)
+    if scheduler is None:
+        scheduler = domain_data[POLL_SCHEDULER] = RouterPollScheduler()
+    return scheduler
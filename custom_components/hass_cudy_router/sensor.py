@@ -21,6 +21,10 @@ class _SensorDef:
     entity_category: Any | None
     state_class: Any | None
     translation_key: str
+    unit: str | None = None
+    device_class: Any | None = None
+    attributes_key: str | None = None
+    enabled_default: bool = True
 
 
 async def async_setup_entry(
@@ -38,7 +42,7 @@ async def async_setup_entry(
         if module_name == MODULE_DEVICE_LIST:
             continue
 
-        sensor_defs = SENSORS.get(module_name, [])
+        sensor_defs = SENSORS.get(module_name, []) + DERIVED_SENSORS.get(module_name, [])
         if not isinstance(module_data, dict) or not sensor_defs:
             continue
 
@@ -62,6 +66,10 @@ async def async_setup_entry(
                         entity_category=sd.get(SENSORS_KEY_CATEGORY),
                         state_class=sd.get(SENSORS_KEY_CLASS),
                         translation_key=sensor_key,  # 🔑 THIS fixes translations
+                        unit=sd.get(SENSORS_KEY_UNIT),
+                        device_class=sd.get(SENSORS_KEY_DEVICE_CLASS),
+                        attributes_key=sd.get(SENSORS_KEY_ATTRIBUTES),
+                        enabled_default=sd.get(SENSORS_KEY_ENABLED_DEFAULT, True),
                     ),
                 )
             )
@@ -71,6 +79,8 @@ async def async_setup_entry(
 
 class CudySensor(SensorEntity):
     _attr_has_entity_name = True
+    # state is pushed by the coordinator's key listeners
+    _attr_should_poll = False
 
     def __init__(
         self,
@@ -103,10 +113,15 @@ class CudySensor(SensorEntity):
         self._attr_entity_category = sensor_def.entity_category
         self._attr_state_class = sensor_def.state_class
         self._attr_translation_key = sensor_def.translation_key
+        self._attr_native_unit_of_measurement = sensor_def.unit
+        self._attr_device_class = sensor_def.device_class
+        self._attr_entity_registry_enabled_default = sensor_def.enabled_default
 
     @property
     def available(self) -> bool:
-        return getattr(self.coordinator, "last_update_success", True)
+        if not getattr(self.coordinator, "last_update_success", True):
+            return False
+        return self._def.module in (self.coordinator.data or {})
 
     @property
     def native_value(self) -> Any:
@@ -116,8 +131,23 @@ class CudySensor(SensorEntity):
             return None
         return module.get(self._def.key)
 
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        if not self._def.attributes_key:
+            return None
+        module = (self.coordinator.data or {}).get(self._def.module, {})
+        attrs = module.get(self._def.attributes_key) if isinstance(module, dict) else None
+        return attrs if isinstance(attrs, dict) else None
+
     async def async_added_to_hass(self) -> None:
-        self.coordinator.async_add_listener(self.async_write_ha_state)
+        # only write state when this sensor's value (or availability) changed
+        self.async_on_remove(
+            self.coordinator.async_add_key_listener(
+                self._def.module,
+                [key for key in (self._def.key, self._def.attributes_key) if key],
+                self.async_write_ha_state,
+            )
+        )
 
     @property
     def device_info(self) -> DeviceInfo:
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import logging
+
+import voluptuous as vol
+from homeassistant.core import HomeAssistant, ServiceCall, callback
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.util import dt as dt_util
+
+from .const import *
+
+_LOGGER = logging.getLogger(__name__)
+
+TRACE_POLLS_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_POLLS, default=DEFAULT_TRACE_POLLS): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=MAX_TRACE_POLLS)
+        ),
+        vol.Optional(ATTR_ENTRY_ID): cv.string,
+    }
+)
+
+
+def trace_path(hass: HomeAssistant, entry_id: str) -> str:
+    stamp = dt_util.now().strftime("%Y%m%d-%H%M%S")
+    return hass.config.path(f"{DOMAIN}_trace_{entry_id}_{stamp}.json")
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the integration's services once, for all routers."""
+    if hass.services.has_service(DOMAIN, SERVICE_TRACE_POLLS):
+        return
+
+    async def async_trace_polls(call: ServiceCall) -> None:
+        routers = {
+            entry_id: data["coordinator"]
+            for entry_id, data in hass.data.get(DOMAIN, {}).items()
+            if isinstance(data, dict) and data.get("coordinator") is not None
+        }
+        entry_id = call.data.get(ATTR_ENTRY_ID)
+        if entry_id is not None:
+            if entry_id not in routers:
+                raise ServiceValidationError(f"No loaded Cudy router with entry id {entry_id}")
+            routers = {entry_id: routers[entry_id]}
+
+        polls = call.data[ATTR_POLLS]
+        for entry_id, coordinator in routers.items():
+            tracer = coordinator.async_start_trace(polls, trace_path(hass, entry_id))
+            _LOGGER.info("Tracing the next %d polls of %s into %s", polls, coordinator.name, tracer.path)
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_TRACE_POLLS, async_trace_polls, schema=TRACE_POLLS_SCHEMA
+    )
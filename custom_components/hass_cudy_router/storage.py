@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import logging
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .const import STORAGE_KEY, STORAGE_VERSION
+
+_LOGGER = logging.getLogger(__name__)
+
+SAVE_DELAY = 1
+
+KEY_CAPABILITIES = "capabilities"
+KEY_CAPABILITIES_PROBED_AT = "capabilities_probed_at"
+KEY_SYSAUTH = "sysauth"
+KEY_AUTH_SCHEME = "auth_scheme"
+
+
+class CudyStorage:
+    """Per config entry state kept in .storage between restarts."""
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, f"{STORAGE_KEY}.{entry_id}"
+        )
+        self._data: dict[str, Any] = {}
+
+    async def async_load(self) -> None:
+        try:
+            data = await self._store.async_load()
+        except Exception:
+            _LOGGER.debug("Could not load stored Cudy state", exc_info=True)
+            data = None
+        self._data = data if isinstance(data, dict) else {}
+
+    async def async_remove(self) -> None:
+        self._data = {}
+        await self._store.async_remove()
+
+    def _save(self) -> None:
+        self._store.async_delay_save(lambda: self._data, SAVE_DELAY)
+
+    # ------------------------------------------------------------------
+    # Capabilities
+    # ------------------------------------------------------------------
+    @property
+    def capabilities(self) -> set[str] | None:
+        modules = self._data.get(KEY_CAPABILITIES)
+        if not isinstance(modules, list):
+            return None
+        return {m for m in modules if isinstance(m, str)}
+
+    @property
+    def capabilities_probed_at(self) -> float | None:
+        value = self._data.get(KEY_CAPABILITIES_PROBED_AT)
+        return float(value) if isinstance(value, (int, float)) else None
+
+    def set_capabilities(self, modules: set[str] | None, probed_at: float | None) -> None:
+        if modules is None:
+            self._data.pop(KEY_CAPABILITIES, None)
+            self._data.pop(KEY_CAPABILITIES_PROBED_AT, None)
+        else:
+            self._data[KEY_CAPABILITIES] = sorted(modules)
+            self._data[KEY_CAPABILITIES_PROBED_AT] = probed_at
+        self._save()
+
+    # ------------------------------------------------------------------
+    # LuCI session
+    # ------------------------------------------------------------------
+    @property
+    def sysauth(self) -> str | None:
+        value = self._data.get(KEY_SYSAUTH)
+        return value if isinstance(value, str) and value else None
+
+    @property
+    def auth_scheme(self) -> str | None:
+        value = self._data.get(KEY_AUTH_SCHEME)
+        return value if value in ("http", "https") else None
+
+    def set_session(self, sysauth: str | None, scheme: str | None) -> None:
+        if sysauth:
+            self._data[KEY_SYSAUTH] = sysauth
+        else:
+            self._data.pop(KEY_SYSAUTH, None)
+        # the working scheme stays useful even when the session is gone
+        if scheme:
+            self._data[KEY_AUTH_SCHEME] = scheme
+        self._save()
@@ -0,0 +1,152 @@
+"""Opt-in span recording for a few polls, written as Chrome trace events.
+
+The coordinator installs a PollTracer in CURRENT_TRACER for the duration
+of a traced poll; the api and client call span()/record() which do
+nothing when no tracer is set. Open the JSON file in chrome://tracing or
+https://ui.perfetto.dev.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from typing import Any, Callable, ContextManager, Iterator
+
+CURRENT_TRACER: ContextVar[PollTracer | None] = ContextVar("cudy_poll_tracer", default=None)
+
+_NOOP = nullcontext()
+
+
+class PollTracer:
+    """Spans of the next ``polls`` polls of one router.
+
+    Spans go on one track per asyncio task (or named track), so requests
+    that ran in parallel show up side by side.
+    """
+
+    def __init__(self, polls: int, path: str, process: str = "Cudy Router") -> None:
+        self.path = path
+        self.remaining = max(1, int(polls))
+        self._origin = time.perf_counter()
+        self._tracks: dict[str, int] = {}
+        # task or thread -> track its unnamed spans go on
+        self._bound: dict[Any, int] = {}
+        self._events: list[dict[str, Any]] = [
+            {"name": "process_name", "ph": "M", "pid": 1, "tid": 0, "args": {"name": process}}
+        ]
+
+    def _us(self, seconds: float) -> float:
+        return round((seconds - self._origin) * 1_000_000, 1)
+
+    def _complete(
+        self, name: str, cat: str, begin: float, end: float, tid: int, args: dict[str, Any]
+    ) -> None:
+        self._events.append(
+            {
+                "name": name,
+                "cat": cat,
+                "ph": "X",
+                "ts": self._us(begin),
+                "dur": round((end - begin) * 1_000_000, 1),
+                "pid": 1,
+                "tid": tid,
+                "args": args,
+            }
+        )
+
+    def _tid(self, label: str) -> int:
+        tid = self._tracks.get(label)
+        if tid is None:
+            tid = self._tracks[label] = len(self._tracks) + 1
+            self._events.append(
+                {"name": "thread_name", "ph": "M", "pid": 1, "tid": tid, "args": {"name": label}}
+            )
+        return tid
+
+    def _current_track(self, label: str | None) -> int:
+        """Track of the running task (or thread), named ``label`` if given."""
+        try:
+            owner: Any = asyncio.current_task()
+        except RuntimeError:
+            owner = None
+        if owner is None:
+            owner = threading.current_thread()
+        if label:
+            tid = self._bound[owner] = self._tid(label)
+            return tid
+        tid = self._bound.get(owner)
+        if tid is None:
+            name = owner.get_name() if isinstance(owner, asyncio.Task) else owner.name
+            tid = self._bound[owner] = self._tid(name)
+        return tid
+
+    def record(
+        self,
+        name: str,
+        cat: str,
+        begin: float,
+        end: float,
+        track: str | None = None,
+        **args: Any,
+    ) -> None:
+        """Add a finished span; ``begin``/``end`` are perf_counter() values.
+
+        With ``track`` the span goes on that named track instead of the
+        current task's, e.g. for work timed in another thread.
+        """
+        tid = self._tid(track) if track else self._current_track(None)
+        self._complete(name, cat, begin, end, tid, args)
+
+    @contextmanager
+    def span(self, name: str, cat: str, track: str | None = None, **args: Any) -> Iterator[None]:
+        """Time the block on the current task's track.
+
+        ``track`` moves the task, and its later spans, to that named track.
+        """
+        tid = self._current_track(track)
+        begin = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._complete(name, cat, begin, time.perf_counter(), tid, args)
+
+    def poll_done(self) -> bool:
+        """Count a finished poll; True once the last one is in."""
+        self.remaining -= 1
+        return self.remaining <= 0
+
+    def as_dict(self) -> dict[str, Any]:
+        return {"traceEvents": list(self._events), "displayTimeUnit": "ms"}
+
+    def write(self) -> str:
+        """Write the trace file (blocking) and return its path."""
+        with open(self.path, "w", encoding="utf-8") as fh:
+            json.dump(self.as_dict(), fh)
+        return self.path
+
+
+def span(name: str, cat: str, track: str | None = None, **args: Any) -> ContextManager[None]:
+    """tracer.span() of the poll being traced, a no-op otherwise."""
+    tracer = CURRENT_TRACER.get()
+    if tracer is None:
+        return _NOOP
+    return tracer.span(name, cat, track, **args)
+
+
+def record(name: str, cat: str, begin: float, end: float, track: str | None = None, **args: Any) -> None:
+    tracer = CURRENT_TRACER.get()
+    if tracer is not None:
+        tracer.record(name, cat, begin, end, track, **args)
+
+
+def callback_name(update_callback: Callable[..., Any]) -> str:
+    """Entity id of a bound entity callback, else the function's name."""
+    owner = getattr(update_callback, "__self__", None)
+    entity_id = getattr(owner, "entity_id", None)
+    if entity_id:
+        return str(entity_id)
+    return getattr(update_callback, "__qualname__", None) or repr(update_callback)
@@ -0,0 +1,390 @@
+"""Benchmark the full poll path and compare runs against a stored baseline.
+
+Sections:
+  parse    parse_html() per model and module (best of --repeat, ms)
+  parse-before
+           the same pages through the pipeline parse_html() replaced: a
+           fresh html.parser tree for every step and the sensor labels
+           scanned on every call. With both sections a before/after table
+           per module is printed
+  poll     CudyApi.get_data() over HTTP against the LuCI emulator, per
+           simulated router latency: cold (login + every page parsed) and
+           warm (session and page cache in place) wall time, ms
+  memory   tracemalloc peak of one cold poll per model, KiB
+  fanout   coordinator -> entity work for 50/200/500 devlist rows: device
+           index, throughput totals and the state every tracker writes, ms
+
+Run:
+  python -m tests.cudy_router.benchmark --save            # write the baseline
+  python -m tests.cudy_router.benchmark --compare         # exit 1 on regressions
+  python -m tests.cudy_router.benchmark --models AP1300 WR3000 --latencies 0 0.05
+  python -m tests.cudy_router.benchmark --sections parse parse-before
+
+Timings depend on the machine, so the baseline is not checked in; record
+one on the machine that will run --compare.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gc
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+
+from aiohttp.test_utils import TestServer
+from bs4 import BeautifulSoup
+from homeassistant.components.sensor import SensorStateClass
+
+from custom_components.hass_cudy_router.api import CudyApi
+from custom_components.hass_cudy_router.client import CudyClient
+from custom_components.hass_cudy_router.const import (
+    MODULE_DEVICE_LIST,
+    MODULE_DEVICES,
+    SENSORS,
+    SENSORS_KEY_CLASS,
+    SENSORS_KEY_DESCRIPTION,
+    SENSORS_KEY_KEY,
+)
+from custom_components.hass_cudy_router.device_tracker import CudyDeviceTracker
+from custom_components.hass_cudy_router.devices import ThroughputTracker, build_device_index
+from custom_components.hass_cudy_router.parser import (
+    _clean,
+    _fill_devices_table,
+    _to_int_if_possible,
+    extract_kv_pairs,
+    extract_xhr_endpoints,
+    parse_device_list,
+    parse_html,
+)
+from tests.cudy_router.emulator import (
+    PASSWORD,
+    USERNAME,
+    EmulatorConfig,
+    LuciEmulator,
+    available_models,
+)
+from tests.cudy_router.fixtures import BASE, synthetic_device_list
+
+BASELINE = Path(__file__).resolve().parent / "benchmark_baseline.json"
+
+DEFAULT_LATENCIES = (0.0, 0.02, 0.1)
+DEFAULT_FANOUT_ROWS = (50, 200, 500)
+
+# a result only counts as a regression if it is this much slower ...
+DEFAULT_TOLERANCE = 0.25
+# ... and the difference is above the timer/allocator noise floor
+MIN_DELTA = {"parse": 0.5, "parse-before": 0.5, "poll": 5.0, "memory": 64.0, "fanout": 0.5}
+SECTIONS = ["parse", "parse-before", "poll", "memory", "fanout"]
+
+
+def _best(fn, repeat: int) -> float:
+    """Best of ``repeat`` runs in ms, after a warm-up and with gc off (like timeit)."""
+    fn()
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            best = min(best, time.perf_counter() - start)
+    finally:
+        if enabled:
+            gc.enable()
+    return best * 1000
+
+
+# ----------------------------------------------------------------------
+# The parse pipeline before parse_html() shared one tree
+# ----------------------------------------------------------------------
+def _old_soup(html: str) -> BeautifulSoup:
+    return BeautifulSoup(html, "html.parser")
+
+
+def _old_module_by_sensors(module: str, html: str) -> dict[str, Any]:
+    """parse_module_by_sensors() as it was: own tree, labels scanned per call."""
+    kv = extract_kv_pairs(_old_soup(html))
+    kv_lower = {k.lower(): v for k, v in kv.items()}
+
+    result: dict[str, Any] = {}
+    for spec in SENSORS.get(module, []):
+        found: str | None = None
+        for label in spec.get(SENSORS_KEY_DESCRIPTION, []) or []:
+            label = _clean(label)
+            if not label:
+                continue
+            if label in kv:
+                found = kv[label]
+                break
+            if label.lower() in kv_lower:
+                found = kv_lower[label.lower()]
+                break
+
+        if spec.get(SENSORS_KEY_CLASS) == SensorStateClass.MEASUREMENT:
+            result[spec[SENSORS_KEY_KEY]] = _to_int_if_possible(found)
+        else:
+            result[spec[SENSORS_KEY_KEY]] = _clean(found) if found else None
+    return result
+
+
+def parse_html_before(module: str, html: str) -> Any:
+    """Same dispatch as parse_html(), but every step parses the raw HTML again."""
+    if not html:
+        return [] if module == MODULE_DEVICE_LIST else {}
+    xhr = extract_xhr_endpoints(_old_soup(html))
+    if xhr:
+        return {"xhr_endpoints": xhr}
+    if module == MODULE_DEVICES:
+        result = _old_module_by_sensors(MODULE_DEVICES, html)
+        return _fill_devices_table(_old_soup(html), result)
+    if module == MODULE_DEVICE_LIST:
+        return parse_device_list(_old_soup(html))
+    return _old_module_by_sensors(module, html)
+
+
+# ----------------------------------------------------------------------
+# Sections
+# ----------------------------------------------------------------------
+def bench_parse(models: list[str], repeat: int, parse=parse_html) -> dict[str, float]:
+    results: dict[str, float] = {}
+    for model in models:
+        for page in sorted((BASE / model).glob("*.html")):
+            module = page.stem
+            html = page.read_text(encoding="utf-8", errors="ignore")
+            if parse is not parse_html:
+                # the comparison is only fair if both paths agree
+                assert parse(module, html) == parse_html(module, html), page
+            results[f"{model}/{module}"] = _best(lambda: parse(module, html), repeat)
+    return results
+
+
+async def _poll(server: TestServer, polls: int) -> tuple[float, float]:
+    """Cold and median warm get_data() time in ms with a fresh client."""
+    client = CudyClient(f"127.0.0.1:{server.port}", USERNAME, PASSWORD)
+    api = CudyApi(client)
+    try:
+        start = time.perf_counter()
+        await api.get_data()
+        cold = (time.perf_counter() - start) * 1000
+        warm = []
+        for _ in range(polls):
+            start = time.perf_counter()
+            await api.get_data()
+            warm.append((time.perf_counter() - start) * 1000)
+        return cold, statistics.median(warm)
+    finally:
+        await client.async_close()
+
+
+async def bench_poll(
+    models: list[str], latencies: list[float], polls: int
+) -> dict[str, float]:
+    results: dict[str, float] = {}
+    for model in models:
+        for latency in latencies:
+            emulator = LuciEmulator(model, EmulatorConfig(latency=latency))
+            server = TestServer(emulator.app(), host="127.0.0.1")
+            await server.start_server()
+            try:
+                cold, warm = await _poll(server, polls)
+            finally:
+                await server.close()
+            results[f"{model}/{latency:g}s/cold"] = cold
+            results[f"{model}/{latency:g}s/warm"] = warm
+    return results
+
+
+async def bench_memory(models: list[str]) -> dict[str, float]:
+    results: dict[str, float] = {}
+    for model in models:
+        server = TestServer(LuciEmulator(model).app(), host="127.0.0.1")
+        await server.start_server()
+        client = CudyClient(f"127.0.0.1:{server.port}", USERNAME, PASSWORD)
+        try:
+            # log in first so the peak is the poll itself
+            await client.authenticate()
+            tracemalloc.start()
+            try:
+                await CudyApi(client).get_data()
+                _current, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+        finally:
+            await client.async_close()
+            await server.close()
+        results[model] = peak / 1024
+    return results
+
+
+def bench_fanout(rows: list[int], repeat: int) -> dict[str, float]:
+    """Work done between a devlist poll and the trackers' state writes.
+
+    Runs the coordinator's index/throughput step and reads the properties
+    Home Assistant collects for every tracker on a write, without a hass
+    instance around it.
+    """
+    results: dict[str, float] = {}
+    entry = SimpleNamespace(entry_id="benchmark")
+    for count in rows:
+        html = synthetic_device_list(count)
+        # two parses so every update sees new row objects, like a real poll
+        polls = [
+            {MODULE_DEVICES: {MODULE_DEVICE_LIST: parse_html(MODULE_DEVICE_LIST, html)}}
+            for _ in range(2)
+        ]
+        coordinator = SimpleNamespace(data=polls[0], device_index={}, last_update_success=True)
+        throughput = ThroughputTracker()
+        trackers = [
+            CudyDeviceTracker(coordinator, entry, dev)
+            for dev in polls[0][MODULE_DEVICES][MODULE_DEVICE_LIST]
+        ]
+        turn = iter(range(sys.maxsize))
+
+        def update() -> None:
+            data = polls[next(turn) % 2]
+            coordinator.data = data
+            coordinator.device_index = build_device_index(data)
+            throughput.update(coordinator.device_index)
+            throughput.summary()
+            for tracker in trackers:
+                tracker.is_connected
+                tracker.ip_address
+                tracker.extra_state_attributes
+
+        results[f"{count} rows"] = _best(update, repeat)
+    return results
+
+
+async def run(args: argparse.Namespace) -> dict[str, dict[str, float]]:
+    models = args.models or available_models()
+    results: dict[str, dict[str, float]] = {}
+    if "parse" in args.sections:
+        results["parse"] = bench_parse(models, args.repeat)
+    if "parse-before" in args.sections:
+        results["parse-before"] = bench_parse(models, args.repeat, parse_html_before)
+    if "poll" in args.sections:
+        results["poll"] = await bench_poll(models, args.latencies, args.polls)
+    if "memory" in args.sections:
+        results["memory"] = await bench_memory(models)
+    if "fanout" in args.sections:
+        results["fanout"] = bench_fanout(args.rows, args.repeat)
+    return results
+
+
+# ----------------------------------------------------------------------
+# Baseline
+# ----------------------------------------------------------------------
+def save_baseline(path: Path, results: dict[str, dict[str, float]]) -> None:
+    rounded = {
+        section: {name: round(value, 3) for name, value in sorted(values.items())}
+        for section, values in results.items()
+    }
+    path.write_text(json.dumps(rounded, indent=1) + "\n", encoding="utf-8")
+
+
+def load_baseline(path: Path) -> dict[str, dict[str, float]]:
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def compare(
+    baseline: dict[str, dict[str, Any]],
+    results: dict[str, dict[str, float]],
+    tolerance: float = DEFAULT_TOLERANCE,
+) -> list[tuple[str, str, float, float]]:
+    """(section, name, baseline, current) for every result that got slower."""
+    regressions = []
+    for section, values in results.items():
+        before = baseline.get(section) or {}
+        floor = MIN_DELTA.get(section, 0.0)
+        for name, current in values.items():
+            base = before.get(name)
+            if not isinstance(base, (int, float)):
+                continue
+            if current > base * (1 + tolerance) and current - base > floor:
+                regressions.append((section, name, float(base), current))
+    return regressions
+
+
+def parse_speedup(
+    before: dict[str, float], after: dict[str, float]
+) -> dict[str, tuple[float, float, int]]:
+    """module -> (before ms, after ms, pages), summed over the models."""
+    totals: dict[str, list[float]] = defaultdict(lambda: [0.0, 0.0, 0])
+    for name, value in after.items():
+        if name not in before:
+            continue
+        total = totals[name.split("/", 1)[1]]
+        total[0] += before[name]
+        total[1] += value
+        total[2] += 1
+    return {module: (b, a, int(n)) for module, (b, a, n) in sorted(totals.items())}
+
+
+def _print_speedup(before: dict[str, float], after: dict[str, float]) -> None:
+    print(f"{'module':<14}{'pages':>6}{'before ms/page':>16}{'after ms/page':>15}{'speedup':>9}")
+    total_before = total_after = 0.0
+    for module, (b, a, n) in parse_speedup(before, after).items():
+        total_before += b
+        total_after += a
+        print(f"{module:<14}{n:>6}{b / n:>16.2f}{a / n:>15.2f}{b / a:>8.2f}x")
+    print(f"{'total':<14}{'':>6}{total_before:>16.1f}{total_after:>15.1f}"
+          f"{total_before / total_after:>8.2f}x")
+
+
+def _summary(results: dict[str, dict[str, float]]) -> None:
+    units = {"parse": "ms", "parse-before": "ms", "poll": "ms", "memory": "KiB", "fanout": "ms"}
+    for section, values in results.items():
+        if not values:
+            continue
+        unit = units.get(section, "")
+        if section in ("parse", "parse-before", "memory"):
+            print(f"{section:<8}{len(values):>5} results, total {sum(values.values()):>10.1f} {unit}"
+                  f", max {max(values.values()):.1f} {unit} ({max(values, key=values.get)})")
+            continue
+        for name, value in values.items():
+            print(f"{section:<8}{name:<32}{value:>10.1f} {unit}")
+    if results.get("parse") and results.get("parse-before"):
+        _print_speedup(results["parse-before"], results["parse"])
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--models", nargs="*", default=None)
+    ap.add_argument("--sections", nargs="*", default=["parse", "poll", "memory", "fanout"],
+                    choices=SECTIONS)
+    ap.add_argument("--latencies", nargs="*", type=float, default=list(DEFAULT_LATENCIES))
+    ap.add_argument("--rows", nargs="*", type=int, default=list(DEFAULT_FANOUT_ROWS))
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--polls", type=int, default=3, help="warm polls per latency")
+    ap.add_argument("--baseline", type=Path, default=BASELINE)
+    ap.add_argument("--save", action="store_true", help="write the results as the new baseline")
+    ap.add_argument("--compare", action="store_true", help="fail if slower than the baseline")
+    ap.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    args = ap.parse_args()
+
+    results = asyncio.run(run(args))
+    _summary(results)
+
+    if args.compare:
+        regressions = compare(load_baseline(args.baseline), results, args.tolerance)
+        for section, name, base, current in regressions:
+            print(f"REGRESSION {section}/{name}: {base:.2f} -> {current:.2f} "
+                  f"({current / base - 1:+.0%})")
+        if regressions:
+            sys.exit(1)
+        print(f"no regressions over {args.tolerance:.0%} against {args.baseline}")
+    if args.save:
+        save_baseline(args.baseline, results)
+        print(f"baseline written to {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+"""Local LuCI emulator serving the captured pages under tests/cudy_router/html.
+
+Speaks enough of the Cudy web UI for CudyClient: the login form with
+token/salt, the salted password hash, the sysauth cookie and 403 for
+unknown or expired sessions. Latency, jitter, error rate, session expiry
+and a cap on concurrently handled requests can be injected, and the
+emulator counts what it saw so tests and benchmarks can assert on it.
+
+In tests:
+  emulator = LuciEmulator("WR3000", EmulatorConfig(latency=0.05))
+  server = await aiohttp_server(emulator.app())
+
+Standalone (point a dev Home Assistant at it):
+  python -m tests.cudy_router.emulator --model WR3000 --port 8080 --latency 0.05
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import random
+import secrets
+import time
+from dataclasses import dataclass, field
+
+from aiohttp import web
+
+from custom_components.hass_cudy_router.api import CudyApi
+from custom_components.hass_cudy_router.const import CAPABILITY_URLS
+from tests.cudy_router.fixtures import BASE
+
+USERNAME = "admin"
+PASSWORD = "admin"
+
+LOGIN_PAGE = """<!DOCTYPE html>
+<html><body>
+<form method="post" action="/cgi-bin/luci">
+  <input type="hidden" name="_csrf" value="{csrf}" />
+  <input type="hidden" name="token" value="{token}" />
+  <input type="hidden" name="salt" value="{salt}" />
+  <input type="text" name="luci_username" value="" />
+  <input type="password" name="luci_password" />
+</form>
+</body></html>
+"""
+
+
+@dataclass
+class EmulatorConfig:
+    latency: float = 0.0          # seconds added to every response
+    jitter: float = 0.0           # +/- uniform seconds on top of latency
+    error_rate: float = 0.0       # share of page requests answered with 500
+    session_ttl: float | None = None  # seconds before a sysauth expires
+    expired_answer: int = 403     # 403, or 200 with the login form
+    max_concurrent: int | None = None  # requests handled at once (uhttpd -n)
+    seed: int = 0
+
+
+@dataclass
+class EmulatorStats:
+    requests: int = 0
+    logins: int = 0
+    failed_logins: int = 0
+    rejected: int = 0
+    errors: int = 0
+    in_flight: int = 0
+    peak_in_flight: int = 0
+    connections: set = field(default_factory=set)
+
+    @property
+    def connections_seen(self) -> int:
+        return len(self.connections)
+
+
+def model_pages(model: str) -> dict[str, str]:
+    """LuCI path -> captured page for every module the model has."""
+    pages: dict[str, str] = {}
+    folder = BASE / model
+    for module, (url, *_rest) in CAPABILITY_URLS.items():
+        page = folder / f"{module}.html"
+        if page.is_file():
+            pages[CudyApi.luci(url)] = page.read_text(encoding="utf-8", errors="ignore")
+    return pages
+
+
+def available_models() -> list[str]:
+    return sorted(p.name for p in BASE.iterdir() if p.is_dir())
+
+
+class LuciEmulator:
+    def __init__(
+        self,
+        model: str,
+        config: EmulatorConfig | None = None,
+        *,
+        username: str = USERNAME,
+        password: str = PASSWORD,
+    ) -> None:
+        self.model = model
+        self.config = config or EmulatorConfig()
+        self.stats = EmulatorStats()
+        self._username = username
+        self._password = password
+        self._pages = model_pages(model)
+        self._random = random.Random(self.config.seed)
+        self._salt = secrets.token_hex(8)
+        self._tokens: set[str] = set()
+        self._sessions: dict[str, float] = {}  # sysauth -> issued at
+        self._gate = (
+            asyncio.Semaphore(self.config.max_concurrent)
+            if self.config.max_concurrent
+            else None
+        )
+
+    # ------------------------------------------------------------------
+    # Test hooks
+    # ------------------------------------------------------------------
+    @property
+    def paths(self) -> list[str]:
+        return list(self._pages)
+
+    def expire_sessions(self) -> None:
+        self._sessions.clear()
+
+    def set_page(self, path: str, html: str) -> None:
+        self._pages[path] = html
+
+    # ------------------------------------------------------------------
+    # aiohttp app
+    # ------------------------------------------------------------------
+    def app(self) -> web.Application:
+        app = web.Application(middlewares=[self._middleware])
+        app.router.add_get("/cgi-bin/luci", self._login_page)
+        app.router.add_post("/cgi-bin/luci", self._login)
+        app.router.add_route("*", "/cgi-bin/luci/{tail:.*}", self._page)
+        return app
+
+    @web.middleware
+    async def _middleware(self, request: web.Request, handler) -> web.StreamResponse:
+        stats = self.stats
+        stats.requests += 1
+        stats.connections.add(request.transport)
+        if self._gate is not None:
+            await self._gate.acquire()
+        stats.in_flight += 1
+        stats.peak_in_flight = max(stats.peak_in_flight, stats.in_flight)
+        try:
+            delay = self.config.latency
+            if self.config.jitter:
+                delay += self._random.uniform(-self.config.jitter, self.config.jitter)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            return await handler(request)
+        finally:
+            stats.in_flight -= 1
+            if self._gate is not None:
+                self._gate.release()
+
+    async def _login_page(self, request: web.Request) -> web.Response:
+        token = secrets.token_hex(16)
+        self._tokens.add(token)
+        html = LOGIN_PAGE.format(csrf=secrets.token_hex(8), token=token, salt=self._salt)
+        return web.Response(text=html, content_type="text/html")
+
+    def _expected_password(self, token: str) -> str:
+        hashed = hashlib.sha256((self._password + self._salt).encode()).hexdigest()
+        return hashlib.sha256((hashed + token).encode()).hexdigest()
+
+    async def _login(self, request: web.Request) -> web.Response:
+        form = await request.post()
+        token = str(form.get("token", ""))
+        ok = (
+            token in self._tokens
+            and form.get("luci_username") == self._username
+            and form.get("luci_password") == self._expected_password(token)
+        )
+        self._tokens.discard(token)
+        if not ok:
+            self.stats.failed_logins += 1
+            return await self._login_page(request)
+
+        self.stats.logins += 1
+        sysauth = secrets.token_hex(16)
+        self._sessions[sysauth] = time.monotonic()
+        resp = web.Response(status=302, headers={"Location": "/cgi-bin/luci/admin/panel"})
+        resp.set_cookie("sysauth", sysauth, path="/cgi-bin/luci", httponly=True)
+        return resp
+
+    def _session_valid(self, sysauth: str | None) -> bool:
+        issued = self._sessions.get(sysauth or "")
+        if issued is None:
+            return False
+        ttl = self.config.session_ttl
+        if ttl is not None and time.monotonic() - issued > ttl:
+            del self._sessions[sysauth]
+            return False
+        return True
+
+    async def _page(self, request: web.Request) -> web.Response:
+        if not self._session_valid(request.cookies.get("sysauth")):
+            self.stats.rejected += 1
+            html = LOGIN_PAGE.format(csrf="", token="", salt=self._salt)
+            status = 403 if self.config.expired_answer == 403 else 200
+            return web.Response(status=status, text=html, content_type="text/html")
+
+        if self.config.error_rate and self._random.random() < self.config.error_rate:
+            self.stats.errors += 1
+            return web.Response(status=500, text="Internal Server Error")
+
+        html = self._pages.get(request.path_qs) or self._pages.get(request.path)
+        if html is None:
+            return web.Response(status=404, text="Not Found")
+        return web.Response(text=html, content_type="text/html")
+
+
+async def _serve(args: argparse.Namespace) -> None:
+    config = EmulatorConfig(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        session_ttl=args.session_ttl,
+        max_concurrent=args.max_concurrent,
+    )
+    models = available_models() if args.model == "all" else [args.model]
+    runners = []
+    for port, model in enumerate(models, start=args.port):
+        runner = web.AppRunner(LuciEmulator(model, config).app())
+        await runner.setup()
+        await web.TCPSite(runner, args.host, port).start()
+        runners.append(runner)
+        print(f"{model}: http://{args.host}:{port}/cgi-bin/luci ({USERNAME}/{PASSWORD})")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        for runner in runners:
+            await runner.cleanup()
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--model", default="WR3000", help="model folder, or 'all' (one port each)")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8080)
+    ap.add_argument("--latency", type=float, default=0.0)
+    ap.add_argument("--jitter", type=float, default=0.0)
+    ap.add_argument("--error-rate", type=float, default=0.0)
+    ap.add_argument("--session-ttl", type=float, default=None)
+    ap.add_argument("--max-concurrent", type=int, default=None)
+    args = ap.parse_args()
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
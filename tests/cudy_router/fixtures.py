@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import re
 from pathlib import Path
 
 from custom_components.hass_cudy_router.api import CudyApi
@@ -27,4 +28,20 @@ class FakeClient:
     async def get(self, path: str):
         if path in self._mapping.keys():
             return self._mapping[path]
-        return ""
\ No newline at end of file
+        return ""
+
+_DEVLIST_ROW_RE = re.compile(r"<tr id=\"cbi-table-1\".*?</tr>", re.DOTALL)
+
+
+def synthetic_device_list(rows: int, model: str = "AP1300") -> str:
+    """The model's devlist page with its first client repeated to ``rows`` rows."""
+    html = read_html(model, "device_list.html")
+    row = _DEVLIST_ROW_RE.search(html).group(0)
+    mac = re.search(r"(?:[0-9A-F]{2}:){5}[0-9A-F]{2}", row).group(0)
+    extra = "".join(
+        row.replace("cbi-table-1", f"cbi-table-{i}").replace(
+            mac, f"{mac[:11]}:{i // 256:02X}:{i % 256:02X}"
+        )
+        for i in range(2, rows + 1)
+    )
+    return html.replace(row, row + extra, 1)
@@ -1,8 +1,12 @@
+import asyncio
+
 import pytest
+from aiohttp import ClientResponseError
 
 from custom_components.hass_cudy_router.api import CudyApi
 from custom_components.hass_cudy_router.const import *
-from tests.cudy_router.fixtures import FakeClient
+from custom_components.hass_cudy_router.devices import build_device_index
+from tests.cudy_router.fixtures import FakeClient, read_html
 
 
 @pytest.mark.asyncio
@@ -14,4 +18,205 @@ async def test_api_get_data(model: str) -> None:
     data = await api.get_data()
 
     assert MODULE_SYSTEM in data
-    assert MODULE_DEVICES in data
\ No newline at end of file
+    assert MODULE_DEVICES in data
+
+class _SlowClient(FakeClient):
+    def __init__(self, model: str) -> None:
+        super().__init__(model)
+        self.in_flight = 0
+        self.peak = 0
+
+    async def get(self, path: str):
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(0.01)
+            return await super().get(path)
+        finally:
+            self.in_flight -= 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("limit", [1, 3])
+async def test_api_get_data_respects_concurrency_limit(limit: int) -> None:
+    client = _SlowClient("AP1300")
+    api = CudyApi(client, max_concurrent_requests=limit)
+
+    data = await api.get_data()
+
+    assert client.peak == limit
+    assert list(data.keys()) == [m for m in CAPABILITY_URLS if m in data]
+    assert MODULE_SYSTEM in data
+
+
+class _CountingClient(FakeClient):
+    def __init__(self, model: str) -> None:
+        super().__init__(model)
+        self.paths: list[str] = []
+
+    async def get(self, path: str):
+        self.paths.append(path)
+        return await super().get(path)
+
+
+@pytest.mark.asyncio
+async def test_api_get_data_polls_only_discovered_modules() -> None:
+    client = _CountingClient("AP1300")
+    api = CudyApi(client)
+
+    first = await api.get_data()
+    assert len(client.paths) == len(CAPABILITY_URLS)
+    assert api.capabilities == set(first.keys())
+
+    client.paths.clear()
+    second = await api.get_data()
+    assert len(client.paths) == len(first)
+    assert second == first
+
+    api.invalidate_capabilities()
+    client.paths.clear()
+    await api.get_data()
+    assert len(client.paths) == len(CAPABILITY_URLS)
+
+
+class _FlakyClient(FakeClient):
+    """Answers chosen modules with an HTTP error, or with an empty page."""
+
+    def __init__(self, model: str) -> None:
+        super().__init__(model)
+        self.errors: dict[str, int] = {}
+        self.empty: set[str] = set()
+
+    async def get_page(self, path: str, validators, timing=None):
+        module = next(m for m, urls in CAPABILITY_URLS.items() if CudyApi.luci(urls[0]) == path)
+        if module in self.errors:
+            raise ClientResponseError(None, (), status=self.errors[module])
+        if module in self.empty:
+            return ""
+        return await self.get(path)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("status", [500, 503, 403])
+async def test_api_probe_keeps_modules_that_failed_transiently(status: int) -> None:
+    client = _FlakyClient("AP1300")
+    client.errors[MODULE_SYSTEM] = status
+    api = CudyApi(client)
+
+    data = await api.get_data()
+
+    assert MODULE_SYSTEM not in data
+    assert MODULE_SYSTEM in api.capabilities
+
+    client.errors.clear()
+    assert MODULE_SYSTEM in await api.get_data()
+
+
+@pytest.mark.asyncio
+async def test_api_drops_modules_only_on_a_definitive_answer() -> None:
+    client = _FlakyClient("AP1300")
+    api = CudyApi(client)
+    await api.get_data()
+    assert {MODULE_SYSTEM, MODULE_LAN} <= api.capabilities
+
+    client.errors[MODULE_LAN] = 404
+    client.empty.add(MODULE_SYSTEM)
+    await api.get_data()
+    assert MODULE_LAN not in api.capabilities
+    # one empty page is not enough to give up on a known module
+    assert MODULE_SYSTEM in api.capabilities
+
+    await api.get_data()
+    assert MODULE_SYSTEM not in api.capabilities
+
+
+@pytest.mark.asyncio
+async def test_api_get_data_parses_in_one_executor_job() -> None:
+    jobs = []
+
+    async def executor(fn, *args):
+        jobs.append(args)
+        return fn(*args)
+
+    api = CudyApi(FakeClient("AP1300"), executor=executor)
+
+    data = await api.get_data()
+
+    assert len(jobs) == 1
+    assert set(jobs[0][0].keys()) >= set(data.keys())
+    assert api.parse_stats.jobs == 1
+    assert api.parse_stats.pages == len(jobs[0][0])
+    assert api.parse_stats.parse_seconds > 0
+
+
+@pytest.mark.asyncio
+async def test_api_get_data_skips_parsing_unchanged_pages() -> None:
+    jobs = []
+
+    async def executor(fn, *args):
+        jobs.append(args)
+        return fn(*args)
+
+    api = CudyApi(FakeClient("AP1300"), executor=executor)
+
+    first = await api.get_data()
+    second = await api.get_data()
+
+    assert len(jobs) == 1
+    assert second == first
+    assert all(second[m] is first[m] for m in first)
+    assert api.parse_stats.unchanged_pages == len(first)
+
+
+class _ConditionalClient(FakeClient):
+    """Answers 304 once the caller already holds the page's ETag."""
+
+    def __init__(self, model: str) -> None:
+        super().__init__(model)
+        self.conditional_hits = 0
+
+    async def get_page(self, path: str, validators, timing=None):
+        if validators.etag == path:
+            self.conditional_hits += 1
+            validators.not_modified = True
+            return ""
+        validators.etag = path
+        return await self.get(path)
+
+
+@pytest.mark.asyncio
+async def test_api_get_data_honors_not_modified() -> None:
+    client = _ConditionalClient("AP1300")
+    api = CudyApi(client)
+
+    first = await api.get_data()
+    second = await api.get_data()
+
+    assert second == first
+    assert client.conditional_hits == len(first)
+    assert api.parse_stats.not_modified_pages == len(first)
+    assert api.parse_stats.unchanged_pages == 0
+
+
+class _DevlistClient(FakeClient):
+    def __init__(self, model: str) -> None:
+        super().__init__(model)
+        url = CAPABILITY_URLS[MODULE_DEVICE_LIST][0]
+        self._mapping[CudyApi.luci(url)] = read_html(model, "device_list.html")
+
+
+@pytest.mark.asyncio
+async def test_api_get_data_nests_device_list_under_devices() -> None:
+    api = CudyApi(_DevlistClient("AP1300"))
+
+    data = await api.get_data()
+
+    assert MODULE_DEVICE_LIST not in data
+    assert MODULE_DEVICE_LIST in api.capabilities
+    rows = data[MODULE_DEVICES][MODULE_DEVICE_LIST]
+    assert rows and rows[0].mac == "80:AF:CA:27:FC:FE"
+    assert SENSOR_DEVICE_COUNT in data[MODULE_DEVICES]
+    assert build_device_index(data)["80afca27fcfe"] is rows[0]
+
+    again = await api.get_data()
+    assert again[MODULE_DEVICES][MODULE_DEVICE_LIST] is rows
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+from tests.cudy_router.benchmark import (
+    bench_fanout,
+    bench_parse,
+    compare,
+    load_baseline,
+    parse_html_before,
+    parse_speedup,
+    save_baseline,
+)
+
+
+def test_compare_flags_only_real_slowdowns():
+    baseline = {"parse": {"AP1300/system": 2.0, "AP1300/lan": 0.1}, "poll": {"AP1300/0s/cold": 80.0}}
+    results = {
+        "parse": {"AP1300/system": 4.0, "AP1300/lan": 0.3, "AP1300/new": 9.0},
+        "poll": {"AP1300/0s/cold": 90.0},
+    }
+
+    # lan tripled but stays under the noise floor, new has no baseline
+    assert compare(baseline, results) == [("parse", "AP1300/system", 2.0, 4.0)]
+
+
+def test_baseline_round_trip(tmp_path):
+    path = tmp_path / "baseline.json"
+    save_baseline(path, {"fanout": {"50 rows": 1.23456}})
+
+    assert load_baseline(path) == {"fanout": {"50 rows": 1.235}}
+
+
+def test_fanout_runs_per_row_count():
+    results = bench_fanout([5, 20], repeat=1)
+
+    assert set(results) == {"5 rows", "20 rows"}
+    assert all(value > 0 for value in results.values())
+
+
+def test_parse_before_replays_the_old_pipeline(monkeypatch):
+    import tests.cudy_router.benchmark as benchmark
+
+    built = []
+    real = benchmark._old_soup
+    monkeypatch.setattr(benchmark, "_old_soup", lambda html: built.append(html) or real(html))
+
+    results = bench_parse(["AP1300"], repeat=1, parse=parse_html_before)
+
+    # bench_parse has already checked it against parse_html() page by page
+    assert "AP1300/devices" in results
+    built.clear()
+    parse_html_before("devices", "<table class='table'></table>")
+    # xhr check, label/value rows and the devices table each build a tree
+    assert len(built) == 3
+
+
+def test_parse_speedup_sums_pages_per_module():
+    before = {"AP1300/system": 9.0, "WR3000/system": 7.0, "WR3000/lan": 4.0}
+    after = {"AP1300/system": 3.0, "WR3000/system": 5.0, "WR3000/lan": 2.0}
+
+    assert parse_speedup(before, after) == {"lan": (4.0, 2.0, 1), "system": (16.0, 8.0, 2)}
@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from aiohttp import ClientError, ClientSession, CookieJar, web
+from yarl import URL
+
+from custom_components.hass_cudy_router.client import (
+    LOGIN_FAILURES_BEFORE_BACKOFF,
+    CudyClient,
+    PageValidators,
+)
+
+LOGIN_PAGE = """
+<form method="post">
+  <input type="hidden" name="token" value="tok" />
+  <input type="hidden" name="salt" value="salt" />
+  <input type="password" name="luci_password" />
+</form>
+"""
+
+
+class _Router:
+    """Minimal LuCI: login form, sysauth cookie, 403 for unknown sessions."""
+
+    def __init__(self) -> None:
+        self.logins = 0
+        self.sessions: set[str] = set()
+        self.expired_answer = 403
+        self.accept_logins = True
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/cgi-bin/luci", self.login_page)
+        app.router.add_post("/cgi-bin/luci", self.login)
+        app.router.add_get("/cgi-bin/luci/admin/status", self.status)
+        return app
+
+    async def login_page(self, request: web.Request) -> web.Response:
+        return web.Response(text=LOGIN_PAGE, content_type="text/html")
+
+    async def login(self, request: web.Request) -> web.Response:
+        self.logins += 1
+        if not self.accept_logins:
+            return web.Response(text=LOGIN_PAGE, content_type="text/html")
+        sysauth = f"session{self.logins}"
+        self.sessions.add(sysauth)
+        resp = web.Response(status=302)
+        resp.set_cookie("sysauth", sysauth)
+        return resp
+
+    async def status(self, request: web.Request) -> web.Response:
+        if request.cookies.get("sysauth") not in self.sessions:
+            if self.expired_answer == 403:
+                return web.Response(status=403, text=LOGIN_PAGE, content_type="text/html")
+            return web.Response(text=LOGIN_PAGE, content_type="text/html")
+        return web.Response(text="<p>ok</p>", content_type="text/html")
+
+
+@pytest.fixture
+async def router(socket_enabled, aiohttp_server):
+    r = _Router()
+    r.server = await aiohttp_server(r.app())
+    return r
+
+
+def _client(router: _Router) -> CudyClient:
+    return CudyClient(f"127.0.0.1:{router.server.port}", "admin", "pw")
+
+
+async def test_login_reports_session_to_listener(router):
+    client = _client(router)
+    seen = []
+    client.set_session_listener(lambda sysauth, scheme: seen.append((sysauth, scheme)))
+
+    assert await client.get("/cgi-bin/luci/admin/status") == "<p>ok</p>"
+    assert router.logins == 1
+    assert seen == [("session1", "http")]
+    await client.async_close()
+
+
+async def test_restored_session_skips_login(router):
+    router.sessions.add("saved")
+    client = _client(router)
+    client.restore_session("saved", "http")
+
+    assert await client.get("/cgi-bin/luci/admin/status") == "<p>ok</p>"
+    assert router.logins == 0
+    await client.async_close()
+
+
+@pytest.mark.parametrize("expired_answer", [403, 200])
+async def test_stale_restored_session_logs_in_again(router, expired_answer: int):
+    router.expired_answer = expired_answer
+    client = _client(router)
+    client.restore_session("stale", "http")
+
+    assert await client.get("/cgi-bin/luci/admin/status") == "<p>ok</p>"
+    assert router.logins == 1
+    assert client.sysauth == "session1"
+    await client.async_close()
+
+
+async def test_learned_scheme_is_reused(router):
+    client = CudyClient(f"127.0.0.1:{router.server.port}", "admin", "pw", use_https=True)
+    seen = []
+    client.set_session_listener(lambda sysauth, scheme: seen.append(scheme))
+
+    assert await client.get("/cgi-bin/luci/admin/status") == "<p>ok</p>"
+    assert client.base_url.startswith("http://")
+    assert client.stats.scheme_fallbacks == 1
+    assert seen == ["http"]
+
+    router.sessions.clear()
+    assert await client.get("/cgi-bin/luci/admin/status") == "<p>ok</p>"
+    assert client.stats.logins == 2
+    assert client.stats.reauths == 1
+    assert client.stats.scheme_fallbacks == 1
+    await client.async_close()
+
+
+async def test_concurrent_requests_share_one_login(router):
+    client = _client(router)
+    client.restore_session("stale", "http")
+
+    results = await asyncio.gather(
+        *(client.get("/cgi-bin/luci/admin/status") for _ in range(5))
+    )
+
+    assert results == ["<p>ok</p>"] * 5
+    assert router.logins == 1
+    await client.async_close()
+
+
+async def test_repeated_login_failures_back_off(router):
+    router.accept_logins = False
+    client = _client(router)
+
+    for _ in range(LOGIN_FAILURES_BEFORE_BACKOFF):
+        assert await client.authenticate() is False
+    # both schemes are tried per login, only http reaches the router
+    assert router.logins == LOGIN_FAILURES_BEFORE_BACKOFF
+
+    assert await client.authenticate() is False
+    assert router.logins == LOGIN_FAILURES_BEFORE_BACKOFF
+    assert client.stats.blocked_logins == 1
+    await client.async_close()
+
+
+async def test_poll_reuses_pooled_connections(router):
+    client = CudyClient(f"127.0.0.1:{router.server.port}", "admin", "pw", connection_limit=2)
+
+    for _ in range(3):
+        await asyncio.gather(*(client.get("/cgi-bin/luci/admin/status") for _ in range(4)))
+
+    stats = client.connection_stats
+    # login GET + POST + 12 status requests
+    assert stats.requests == 14
+    assert stats.connections_opened <= 2
+    assert stats.connections_reused == stats.requests - stats.connections_opened
+    await client.async_close()
+
+
+async def test_external_session_is_not_closed(router, hass):
+    from homeassistant.helpers.aiohttp_client import async_get_clientsession
+
+    session = async_get_clientsession(hass)
+    client = CudyClient(f"127.0.0.1:{router.server.port}", "admin", "pw", session=session)
+
+    assert await client.authenticate() is True
+    await client.async_close()
+    assert not session.closed
+
+
+async def test_unreachable_router_does_not_trigger_backoff(router):
+    client = _client(router)
+    await router.server.close()
+
+    for _ in range(LOGIN_FAILURES_BEFORE_BACKOFF + 1):
+        with pytest.raises(ClientError):
+            await client.authenticate()
+
+    assert client.stats.login_errors == LOGIN_FAILURES_BEFORE_BACKOFF + 1
+    assert client.stats.login_failures == 0
+    assert client.stats.blocked_logins == 0
+    await client.async_close()
+
+
+async def test_stale_cookie_in_shared_jar_is_not_a_login(router):
+    session = ClientSession(cookie_jar=CookieJar(unsafe=True))
+    base = URL(f"http://127.0.0.1:{router.server.port}")
+    session.cookie_jar.update_cookies({"sysauth": "someone-elses"}, base)
+    router.accept_logins = False
+    client = CudyClient(f"127.0.0.1:{router.server.port}", "admin", "wrong", session=session)
+
+    assert await client.authenticate() is False
+    assert client.sysauth is None
+    await client.async_close()
+    await session.close()
+
+
+async def test_conditional_get_reports_not_modified(socket_enabled, aiohttp_server):
+    async def page(request: web.Request) -> web.Response:
+        if request.headers.get("If-None-Match") == '"v1"':
+            return web.Response(status=304)
+        return web.Response(text="<p>page</p>", content_type="text/html", headers={"ETag": '"v1"'})
+
+    app = web.Application()
+    app.router.add_get("/page", page)
+    server = await aiohttp_server(app)
+    client = CudyClient(f"127.0.0.1:{server.port}", "admin", "pw")
+    validators = PageValidators()
+
+    assert await client.get("/page", require_auth=False, validators=validators) == "<p>page</p>"
+    assert validators.etag == '"v1"' and not validators.not_modified
+
+    assert await client.get("/page", require_auth=False, validators=validators) == ""
+    assert validators.not_modified
+    await client.async_close()
@@ -1,14 +1,36 @@
 from __future__ import annotations
 
-from unittest.mock import AsyncMock
+from unittest.mock import AsyncMock, patch
 
 import pytest
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.update_coordinator import UpdateFailed
 from pytest_homeassistant_custom_component.common import MockConfigEntry
 
-from custom_components.hass_cudy_router.const import DOMAIN, SENSOR_SYSTEM_FIRMWARE_VERSION
+from custom_components.hass_cudy_router.const import (
+    DEFAULT_SCAN_INTERVAL,
+    DEFAULT_SCAN_INTERVAL_STATIC,
+    DEVICE_MAC,
+    DOMAIN,
+    MODULE_DEVICE_LIST,
+    MODULE_DEVICES,
+    MODULE_LAN,
+    MODULE_SYSTEM,
+    SENSOR_DEVICE_DOWNLOAD_TOTAL,
+    SENSOR_DEVICE_MESH_THROUGHPUT,
+    SENSOR_DEVICE_TOP_CLIENTS,
+    SENSOR_DEVICE_UPLOAD_TOTAL,
+    SENSOR_DEVICE_WIFI_5_THROUGHPUT,
+    SENSOR_DEVICE_WIRED_THROUGHPUT,
+    SENSOR_LAN_IP,
+    SENSOR_SYSTEM_FIRMWARE_VERSION,
+)
+from custom_components.hass_cudy_router.api import CudyApi
 from custom_components.hass_cudy_router.coordinator import CudyCoordinator
+from custom_components.hass_cudy_router.devices import DeviceRow, ThroughputTracker
+from custom_components.hass_cudy_router.scheduler import RouterPollScheduler
+from custom_components.hass_cudy_router.storage import CudyStorage
+from tests.cudy_router.test_api_fetch import _FlakyClient
 
 
 @pytest.mark.asyncio
@@ -48,4 +70,289 @@ async def test_coordinator_api_exception_wraps_updatefailed(hass: HomeAssistant)
     c = CudyCoordinator(hass=hass, entry=entry, api=api, host="test")
 
     with pytest.raises(UpdateFailed):
-        await c._async_update_data()
\ No newline at end of file
+        await c._async_update_data()
+
+@pytest.mark.asyncio
+async def test_coordinator_persists_capabilities(hass: HomeAssistant, hass_storage):
+    entry = MockConfigEntry(domain=DOMAIN, data={"host": "test"}, options={})
+    entry.add_to_hass(hass)
+
+    api = AsyncMock()
+    api.get_data.return_value = {"system": {SENSOR_SYSTEM_FIRMWARE_VERSION: "X"}}
+    api.capabilities = {"system"}
+    api.capabilities_probed_at = 1.0
+
+    store = CudyStorage(hass, entry.entry_id)
+    c = CudyCoordinator(hass=hass, entry=entry, api=api, host="test", store=store)
+
+    await c.async_refresh()
+    assert store.capabilities == {"system"}
+
+    restored = CudyStorage(hass, entry.entry_id)
+    await store._store.async_save(store._data)
+    await restored.async_load()
+    assert restored.capabilities == {"system"}
+    assert restored.capabilities_probed_at == 1.0
+
+
+@pytest.mark.asyncio
+async def test_coordinator_merges_partial_polls(hass: HomeAssistant, freezer):
+    entry = MockConfigEntry(domain=DOMAIN, data={"host": "test"}, options={})
+    entry.add_to_hass(hass)
+
+    api = AsyncMock()
+    api.get_data.return_value = {
+        MODULE_SYSTEM: {SENSOR_SYSTEM_FIRMWARE_VERSION: "X"},
+        MODULE_LAN: {SENSOR_LAN_IP: "192.168.10.1"},
+    }
+
+    c = CudyCoordinator(hass=hass, entry=entry, api=api, host="test")
+    await c.async_refresh()
+
+    api.get_data.return_value = {MODULE_SYSTEM: {SENSOR_SYSTEM_FIRMWARE_VERSION: "Y"}}
+    freezer.tick(DEFAULT_SCAN_INTERVAL)
+    await c.async_refresh()
+
+    requested = api.get_data.call_args.kwargs["modules"]
+    assert MODULE_SYSTEM in requested
+    assert MODULE_LAN not in requested
+    assert c.data[MODULE_SYSTEM][SENSOR_SYSTEM_FIRMWARE_VERSION] == "Y"
+    assert c.data[MODULE_LAN][SENSOR_LAN_IP] == "192.168.10.1"
+
+
+@pytest.mark.asyncio
+async def test_coordinator_keeps_static_module_that_failed(hass: HomeAssistant, freezer):
+    entry = MockConfigEntry(domain=DOMAIN, data={"host": "test"}, options={})
+    entry.add_to_hass(hass)
+    client = _FlakyClient("AP1300")
+    c = CudyCoordinator(hass=hass, entry=entry, api=CudyApi(client), host="test")
+    await c.async_refresh()
+    lan = c.data[MODULE_LAN]
+
+    # the static tier is due again, and the router answers it with a 500
+    client.errors[MODULE_LAN] = 500
+    freezer.tick(DEFAULT_SCAN_INTERVAL_STATIC)
+    await c.async_refresh()
+    assert c.last_update_success
+    assert c.data[MODULE_LAN] == lan
+    # ... so it is retried on the next fast cycle instead of in an hour
+    assert MODULE_LAN in c.scheduler.due_modules()
+
+    client.errors.clear()
+    client.empty.add(MODULE_LAN)
+    freezer.tick(DEFAULT_SCAN_INTERVAL)
+    await c.async_refresh()
+    # one empty answer is not definitive either
+    assert c.data[MODULE_LAN] == lan
+
+    freezer.tick(DEFAULT_SCAN_INTERVAL)
+    await c.async_refresh()
+    assert MODULE_LAN not in c.data
+    assert MODULE_LAN not in c.scheduler.due_modules()
+
+
+@pytest.mark.asyncio
+async def test_coordinator_notifies_only_changed_keys(hass: HomeAssistant, freezer):
+    entry = MockConfigEntry(domain=DOMAIN, data={"host": "test"}, options={})
+    entry.add_to_hass(hass)
+
+    api = AsyncMock()
+    api.get_data.return_value = {
+        MODULE_SYSTEM: {SENSOR_SYSTEM_FIRMWARE_VERSION: "X"},
+        MODULE_LAN: {SENSOR_LAN_IP: "192.168.10.1"},
+    }
+    c = CudyCoordinator(hass=hass, entry=entry, api=api, host="test")
+
+    calls: list[str] = []
+    remove_fw = c.async_add_key_listener(
+        MODULE_SYSTEM, SENSOR_SYSTEM_FIRMWARE_VERSION, lambda: calls.append("fw")
+    )
+    remove_ip = c.async_add_key_listener(MODULE_LAN, SENSOR_LAN_IP, lambda: calls.append("ip"))
+
+    await c.async_refresh()
+    assert sorted(calls) == ["fw", "ip"]
+
+    calls.clear()
+    api.get_data.return_value = {
+        MODULE_SYSTEM: {SENSOR_SYSTEM_FIRMWARE_VERSION: "Y"},
+        MODULE_LAN: {SENSOR_LAN_IP: "192.168.10.1"},
+    }
+    freezer.tick(DEFAULT_SCAN_INTERVAL * 1000)
+    await c.async_refresh()
+    assert calls == ["fw"]
+    assert c.update_stats.suppressed_writes == 1
+
+    # a failed refresh changes availability, so everyone hears about it
+    calls.clear()
+    api.get_data.side_effect = RuntimeError("boom")
+    await c.async_refresh()
+    assert sorted(calls) == ["fw", "ip"]
+
+    remove_fw()
+    calls.clear()
+    api.get_data.side_effect = None
+    await c.async_refresh()
+    assert calls == ["ip"]
+    remove_ip()
+
+
+@pytest.mark.asyncio
+async def test_key_listener_on_several_keys_is_called_once(hass: HomeAssistant, freezer):
+    entry = MockConfigEntry(domain=DOMAIN, data={"host": "test"}, options={})
+    entry.add_to_hass(hass)
+
+    api = AsyncMock()
+    api.get_data.return_value = {MODULE_LAN: {SENSOR_LAN_IP: "192.168.10.1", "mask": "/24"}}
+    c = CudyCoordinator(hass=hass, entry=entry, api=api, host="test")
+    await c.async_refresh()
+
+    calls: list[str] = []
+    remove = c.async_add_key_listener(
+        MODULE_LAN, [SENSOR_LAN_IP, "mask"], lambda: calls.append("lan")
+    )
+    api.get_data.return_value = {MODULE_LAN: {SENSOR_LAN_IP: "192.168.20.1", "mask": "/16"}}
+    freezer.tick(DEFAULT_SCAN_INTERVAL_STATIC)
+    await c.async_refresh()
+
+    assert calls == ["lan"]
+    assert c.update_stats.writes == 1
+
+    freezer.tick(DEFAULT_SCAN_INTERVAL_STATIC)
+    await c.async_refresh()
+    assert calls == ["lan"]
+    assert c.update_stats.suppressed_writes == 1
+    remove()
+
+
+@pytest.mark.asyncio
+async def test_coordinator_publishes_device_index(hass: HomeAssistant):
+    entry = MockConfigEntry(domain=DOMAIN, data={"host": "test"}, options={})
+    entry.add_to_hass(hass)
+
+    devices = [{DEVICE_MAC: "AA:BB:CC:DD:EE:FF"}, {DEVICE_MAC: ""}]
+    api = AsyncMock()
+    api.get_data.return_value = {MODULE_DEVICES: {MODULE_DEVICE_LIST: devices}}
+    c = CudyCoordinator(hass=hass, entry=entry, api=api, host="test")
+
+    await c.async_refresh()
+
+    assert c.device_index == {"aabbccddeeff": devices[0]}
+
+
+@pytest.mark.asyncio
+async def test_coordinator_indexes_only_tracked_devices(hass: HomeAssistant):
+    entry = MockConfigEntry(
+        domain=DOMAIN, data={"host": "test"}, options={MODULE_DEVICE_LIST: "aa:bb"}
+    )
+    entry.add_to_hass(hass)
+
+    api = AsyncMock()
+    api.get_data.return_value = {
+        MODULE_DEVICES: {MODULE_DEVICE_LIST: [_row("AA:BB", 1000, 0), _row("CC:DD", 2000, 0)]}
+    }
+    c = CudyCoordinator(hass=hass, entry=entry, api=api, host="test")
+
+    await c.async_refresh()
+
+    assert list(c.device_index) == ["aabb"]
+    # throughput totals still cover every client
+    assert c.data[MODULE_DEVICES][SENSOR_DEVICE_UPLOAD_TOTAL] == 3.0
+
+
+def _row(mac: str, up: float, down: float, kind: str = "5G WiFi") -> DeviceRow:
+    return DeviceRow(mac=mac, upload_bps=up, download_bps=down, connection_type=kind)
+
+
+def test_throughput_tracker_applies_only_changed_rows():
+    tracker = ThroughputTracker(top_n=2)
+    a, b, c = _row("a", 1000, 2000), _row("b", 3000, 0, "Wired"), _row("c", 0, 500, "Mesh")
+
+    tracker.update({"a": a, "b": b, "c": c})
+    summary = tracker.summary()
+    assert summary[SENSOR_DEVICE_UPLOAD_TOTAL] == 4.0
+    assert summary[SENSOR_DEVICE_DOWNLOAD_TOTAL] == 2.5
+    assert summary[SENSOR_DEVICE_WIFI_5_THROUGHPUT] == 3.0
+    assert summary[SENSOR_DEVICE_WIRED_THROUGHPUT] == 3.0
+    assert summary[SENSOR_DEVICE_MESH_THROUGHPUT] == 0.5
+    assert [d[DEVICE_MAC] for d in summary[SENSOR_DEVICE_TOP_CLIENTS]["clients"]] == ["a", "b"]
+
+    # b left, a sped up, c is the same object and is not re-applied
+    tracker.update({"a": _row("a", 9000, 2000), "c": c})
+    summary = tracker.summary()
+    assert summary[SENSOR_DEVICE_UPLOAD_TOTAL] == 9.0
+    assert summary[SENSOR_DEVICE_WIRED_THROUGHPUT] == 0.0
+    assert [d[DEVICE_MAC] for d in summary[SENSOR_DEVICE_TOP_CLIENTS]["clients"]] == ["a", "c"]
+
+    tracker.update({})
+    assert tracker.summary() == {}
+
+
+def test_throughput_tracker_skips_equal_rows_from_a_new_parse():
+    tracker = ThroughputTracker()
+    tracker.update({"a": _row("a", 1000, 2000), "b": _row("b", 3000, 0, "Wired")})
+
+    with patch.object(tracker, "_apply", wraps=tracker._apply) as apply:
+        tracker.update({"a": _row("a", 1000, 2000), "b": _row("b", 3000, 0, "Wired")})
+        apply.assert_not_called()
+
+        tracker.update({"a": _row("a", 1000, 2000), "b": _row("b", 4000, 0, "Wired")})
+        assert apply.call_count == 2
+
+    assert tracker.summary()[SENSOR_DEVICE_UPLOAD_TOTAL] == 5.0
+
+
+@pytest.mark.asyncio
+async def test_coordinator_keeps_device_rows_when_only_the_devlist_failed(
+    hass: HomeAssistant,
+):
+    entry = MockConfigEntry(domain=DOMAIN, data={"host": "test"}, options={})
+    entry.add_to_hass(hass)
+    rows = [_row("AA:BB", 1000, 0)]
+    api = AsyncMock()
+    api.capabilities = {MODULE_DEVICES, MODULE_DEVICE_LIST}
+    api.get_data.return_value = {MODULE_DEVICES: {"count": 1, MODULE_DEVICE_LIST: rows}}
+    c = CudyCoordinator(hass=hass, entry=entry, api=api, host="test")
+    await c.async_refresh()
+
+    api.get_data.return_value = {MODULE_DEVICES: {"count": 2}}
+    await c.async_refresh()
+
+    assert c.data[MODULE_DEVICES]["count"] == 2
+    assert c.data[MODULE_DEVICES][MODULE_DEVICE_LIST] is rows
+    assert list(c.device_index) == ["aabb"]
+
+
+@pytest.mark.asyncio
+async def test_coordinator_adds_throughput_to_devices(hass: HomeAssistant):
+    entry = MockConfigEntry(domain=DOMAIN, data={"host": "test"}, options={})
+    entry.add_to_hass(hass)
+
+    api = AsyncMock()
+    api.get_data.return_value = {
+        MODULE_DEVICES: {MODULE_DEVICE_LIST: [_row("AA:BB", 1500, 2500)]}
+    }
+    c = CudyCoordinator(hass=hass, entry=entry, api=api, host="test")
+
+    await c.async_refresh()
+
+    assert c.data[MODULE_DEVICES][SENSOR_DEVICE_UPLOAD_TOTAL] == 1.5
+    assert c.data[MODULE_DEVICES][SENSOR_DEVICE_DOWNLOAD_TOTAL] == 2.5
+
+
+@pytest.mark.asyncio
+async def test_coordinator_polls_in_its_slot(hass: HomeAssistant):
+    entry = MockConfigEntry(domain=DOMAIN, data={"host": "test"}, options={})
+    entry.add_to_hass(hass)
+
+    api = AsyncMock()
+    api.get_data.return_value = {MODULE_SYSTEM: {SENSOR_SYSTEM_FIRMWARE_VERSION: "X"}}
+    poll_scheduler = RouterPollScheduler()
+    c = CudyCoordinator(
+        hass=hass, entry=entry, api=api, host="test", poll_scheduler=poll_scheduler
+    )
+
+    await c.async_refresh()
+
+    delay = c.update_interval.total_seconds()
+    assert DEFAULT_SCAN_INTERVAL / 2 <= delay <= DEFAULT_SCAN_INTERVAL * 1.5
+    assert entry.entry_id in poll_scheduler.lag
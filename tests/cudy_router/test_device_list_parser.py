@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import pytest
+
+from custom_components.hass_cudy_router.const import *
+from custom_components.hass_cudy_router.parser import (
+    iter_device_list,
+    parse_device_list,
+    parse_device_list_streaming,
+    parse_html,
+    parse_online_time,
+    parse_rate,
+    parse_signal,
+)
+from tests.cudy_router.fixtures import BASE, read_html, synthetic_device_list
+
+DEVLIST_MODELS = sorted(
+    p.name for p in BASE.iterdir() if (p / "device_list.html").is_file()
+)
+
+
+@pytest.mark.parametrize("model", DEVLIST_MODELS)
+def test_streaming_matches_dom_parser(model: str):
+    html = read_html(model, "device_list.html")
+    assert parse_device_list_streaming(html) == parse_device_list(html)
+
+
+def test_streaming_large_table_any_chunk_size():
+    base = len(parse_device_list(read_html("AP1300", "device_list.html")))
+    html = synthetic_device_list(200)
+    expected = parse_device_list(html)
+
+    assert len(expected) == base + 199
+    for chunk_size in (1, 17, 4096, len(html)):
+        assert list(iter_device_list(html, chunk_size)) == expected
+
+
+def test_parse_html_devlist_uses_streaming(monkeypatch):
+    from custom_components.hass_cudy_router import parser
+
+    def _no_dom(html):
+        raise AssertionError("devlist should not build a DOM")
+
+    monkeypatch.setattr(parser, "make_soup", _no_dom)
+    html = read_html("AP1300", "device_list.html")
+
+    assert parse_html(MODULE_DEVICE_LIST, html) == parse_device_list_streaming(html)
+
+
+def test_device_rows_are_compact() -> None:
+    rows = parse_html(MODULE_DEVICE_LIST, read_html("AP1300", "device_list.html"))
+
+    row = rows[0]
+    assert not hasattr(row, "__dict__")
+    assert row.get(DEVICE_MAC) == row.mac == "80:AF:CA:27:FC:FE"
+    assert row.get("unknown", "x") == "x"
+    assert set(row.as_dict()) == {
+        DEVICE_HOSTNAME, DEVICE_IP, DEVICE_MAC, DEVICE_UPLOAD_SPEED,
+        DEVICE_DOWNLOAD_SPEED, DEVICE_SIGNAL, DEVICE_ONLINE_TIME, DEVICE_CONNECTION_TYPE,
+        DEVICE_UPLOAD_BPS, DEVICE_DOWNLOAD_BPS, DEVICE_SIGNAL_DB, DEVICE_ONLINE_SECONDS,
+    }
+
+
+def test_device_rows_carry_numeric_values() -> None:
+    row = parse_html(MODULE_DEVICE_LIST, read_html("LT500-Outdoor", "device_list.html"))[0]
+
+    assert (row.upload_speed, row.download_speed) == ("0.50Kbps", "0.58Kbps")
+    assert (row.upload_bps, row.download_bps) == (500.0, 580.0)
+    assert row.signal_db == 21.0
+    assert row.online_seconds == 9 * 60 + 36
+
+
+@pytest.mark.parametrize(
+    ("func", "text", "expected"),
+    [
+        (parse_rate, "1.23Mbps", 1_230_000.0),
+        (parse_rate, "12 bps", 12.0),
+        (parse_rate, None, None),
+        (parse_signal, "-67 dBm", -67.0),
+        (parse_signal, "---", None),
+        (parse_online_time, "3 Day 17:14:44", 3 * 86400 + 17 * 3600 + 14 * 60 + 44),
+        (parse_online_time, "", None),
+    ],
+)
+def test_device_value_normalizers(func, text, expected) -> None:
+    assert func(text) == expected
@@ -5,8 +5,11 @@ from unittest.mock import MagicMock
 
 import pytest
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+from pytest_homeassistant_custom_component.common import MockConfigEntry
 
 from custom_components.hass_cudy_router.const import *
+from custom_components.hass_cudy_router.devices import DeviceRow, build_device_index, tracked_macs
 from custom_components.hass_cudy_router.device_tracker import (
     async_setup_entry,
     CudyDeviceTracker,
@@ -148,4 +151,96 @@ def test_extra_state_attributes_returns_device_dict(coordinator: MagicMock):
         device,
     )
 
-    assert tracker.extra_state_attributes == device
\ No newline at end of file
+    assert tracker.extra_state_attributes == device
+
+def test_tracker_uses_coordinator_device_index(coordinator: MagicMock):
+    device = {DEVICE_MAC: "AA-BB-CC-DD-EE-FF", DEVICE_IP: "192.168.0.50"}
+    _set_devices(coordinator, [device])
+    coordinator.device_index = build_device_index(coordinator.data)
+
+    tracker = CudyDeviceTracker(
+        coordinator,
+        MagicMock(entry_id="x"),
+        {DEVICE_MAC: "aa:bb:cc:dd:ee:ff"},
+    )
+
+    assert tracker.ip_address == "192.168.0.50"
+    # trackers read the published index, not the raw list
+    _set_devices(coordinator, [])
+    assert tracker.is_connected is True
+    coordinator.device_index = {}
+    assert tracker.is_connected is False
+
+
+@pytest.mark.asyncio
+async def test_new_clients_get_trackers_on_update(
+    hass: HomeAssistant, coordinator: MagicMock
+):
+    entry = MagicMock()
+    entry.entry_id = "test_entry"
+    hass.data.setdefault(DOMAIN, {})[entry.entry_id] = {"coordinator": coordinator}
+    _set_devices(coordinator, [{DEVICE_MAC: "AA:BB:CC:DD:EE:FF"}])
+    coordinator.device_index = build_device_index(coordinator.data)
+
+    added: list[Any] = []
+    await async_setup_entry(hass, entry, added.extend)
+    assert [e.mac_address for e in added] == ["AA:BB:CC:DD:EE:FF"]
+
+    on_update = coordinator.async_add_listener.call_args.args[0]
+    _set_devices(
+        coordinator,
+        [{DEVICE_MAC: "aa-bb-cc-dd-ee-ff"}, {DEVICE_MAC: "11:22:33:44:55:66"}],
+    )
+    coordinator.device_index = build_device_index(coordinator.data)
+    on_update()
+    on_update()
+
+    assert [e.mac_address for e in added] == ["AA:BB:CC:DD:EE:FF", "11:22:33:44:55:66"]
+    entry.async_on_unload.assert_called_once()
+
+
+def test_tracker_attributes_from_device_row(coordinator: MagicMock):
+    row = DeviceRow(mac="AA", ip="192.168.0.50", hostname="Phone")
+    _set_devices(coordinator, [row])
+
+    tracker = CudyDeviceTracker(coordinator, MagicMock(entry_id="x"), row)
+
+    assert tracker.ip_address == "192.168.0.50"
+    assert tracker.extra_state_attributes == row.as_dict()
+
+
+def test_tracked_macs_option_accepts_any_separator():
+    assert tracked_macs("AA:BB:CC:DD:EE:FF, 11-22-33-44-55-66\n  aabb.ccdd.eeff;") == {
+        "aabbccddeeff",
+        "112233445566",
+    }
+    assert tracked_macs("") == set()
+    assert tracked_macs(None) == set()
+
+
+@pytest.mark.asyncio
+async def test_only_selected_clients_get_trackers(
+    hass: HomeAssistant, coordinator: MagicMock
+):
+    entry = MockConfigEntry(
+        domain=DOMAIN, data={}, options={MODULE_DEVICE_LIST: "11:22:33:44:55:66"}
+    )
+    entry.add_to_hass(hass)
+    registry = er.async_get(hass)
+    unselected = registry.async_get_or_create(
+        "device_tracker", DOMAIN, f"{entry.entry_id}_dev_aabbccddeeff", config_entry=entry
+    )
+    hass.data.setdefault(DOMAIN, {})[entry.entry_id] = {"coordinator": coordinator}
+    _set_devices(
+        coordinator,
+        [{DEVICE_MAC: "AA:BB:CC:DD:EE:FF"}, {DEVICE_MAC: "11:22:33:44:55:66"}],
+    )
+    coordinator.device_index = build_device_index(coordinator.data)
+
+    added: list[Any] = []
+    await async_setup_entry(hass, entry, added.extend)
+
+    assert [e.mac_address for e in added] == ["11:22:33:44:55:66"]
+    # deselected MACs lose their old tracker
+    assert registry.async_get(unselected.entity_id) is None
+
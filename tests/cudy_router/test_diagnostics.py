@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+from unittest.mock import MagicMock
+
+import pytest
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from custom_components.hass_cudy_router.api import CudyApi
+from custom_components.hass_cudy_router.const import *
+from custom_components.hass_cudy_router.coordinator import CudyCoordinator
+from custom_components.hass_cudy_router.diagnostics import async_get_config_entry_diagnostics
+from custom_components.hass_cudy_router.sensor import async_setup_entry as sensor_setup
+from tests.cudy_router.fixtures import FakeClient
+
+
+async def _setup(hass: HomeAssistant) -> tuple[MagicMock, CudyCoordinator]:
+    entry = MagicMock(spec=ConfigEntry)
+    entry.entry_id = "diag"
+    entry.data = {"host": "192.168.10.1", "username": "admin", "password": "secret"}
+    entry.options = {}
+    api = CudyApi(FakeClient("WR3000"))
+    coordinator = CudyCoordinator(hass=hass, entry=entry, api=api, host="test.local")
+    coordinator.data = await coordinator._async_update_data()
+    integration = MagicMock(api=api, model="WR3000")
+    hass.data.setdefault(DOMAIN, {})[entry.entry_id] = {
+        "client": MagicMock(stats=None, connection_stats=None),
+        "integration": integration,
+        "coordinator": coordinator,
+    }
+    return entry, coordinator
+
+
+@pytest.mark.asyncio
+async def test_diagnostics_download_has_metrics_and_redacts(hass: HomeAssistant):
+    entry, _coordinator = await _setup(hass)
+
+    diag = await async_get_config_entry_diagnostics(hass, entry)
+
+    assert diag["entry"]["data"]["password"] == "**REDACTED**"
+    assert diag["entry"]["data"]["host"] == "**REDACTED**"
+    assert diag["model"] == "WR3000"
+    assert MODULE_SYSTEM in diag["capabilities"]
+    assert diag["metrics"]["polls"] == 1
+    assert diag["metrics"]["modules"][MODULE_SYSTEM]["phases_ms"]["parse"]["count"] == 1
+    assert diag["parse_stats"]["pages"] > 0
+    assert diag["update_stats"] == {"writes": 0, "suppressed_writes": 0}
+
+
+@pytest.mark.asyncio
+async def test_diagnostic_sensors_are_disabled_by_default(hass: HomeAssistant):
+    entry, coordinator = await _setup(hass)
+    added = []
+
+    await sensor_setup(hass, entry, added.extend)
+
+    diagnostic = {
+        e.unique_id.removeprefix(f"{entry.entry_id}_{MODULE_DIAGNOSTICS}_"): e
+        for e in added
+        if e.unique_id.startswith(f"{entry.entry_id}_{MODULE_DIAGNOSTICS}_")
+    }
+    assert set(diagnostic) == {sd[SENSORS_KEY_KEY] for sd in DERIVED_SENSORS[MODULE_DIAGNOSTICS]}
+    assert not any(e.entity_registry_enabled_default for e in diagnostic.values())
+    assert diagnostic[SENSOR_POLL_DURATION_P95].native_value is not None
+    assert set(diagnostic[SENSOR_POLL_DURATION_P95].extra_state_attributes) >= {"ttfb", "parse"}
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from custom_components.hass_cudy_router.api import CudyApi
+from custom_components.hass_cudy_router.client import CudyClient
+from custom_components.hass_cudy_router.const import *
+from tests.cudy_router.emulator import PASSWORD, USERNAME, EmulatorConfig, LuciEmulator
+from tests.cudy_router.fixtures import FakeClient
+
+
+async def _start(aiohttp_server, model: str, **config) -> tuple[LuciEmulator, CudyClient]:
+    emulator = LuciEmulator(model, EmulatorConfig(**config))
+    server = await aiohttp_server(emulator.app())
+    client = CudyClient(f"127.0.0.1:{server.port}", USERNAME, PASSWORD)
+    return emulator, client
+
+
+@pytest.mark.parametrize("model", ["AP1300", "WR3000", "LT500-Outdoor"])
+async def test_get_data_over_http_matches_in_process(socket_enabled, aiohttp_server, model):
+    emulator, client = await _start(aiohttp_server, model)
+
+    over_http = await CudyApi(client).get_data()
+    in_process = await CudyApi(FakeClient(model)).get_data()
+
+    assert emulator.stats.logins == 1
+    # FakeClient does not serve the devlist
+    over_http.get(MODULE_DEVICES, {}).pop(MODULE_DEVICE_LIST, None)
+    assert over_http == in_process
+    await client.async_close()
+
+
+async def test_wrong_password_is_rejected(socket_enabled, aiohttp_server):
+    emulator = LuciEmulator("AP1300")
+    server = await aiohttp_server(emulator.app())
+    client = CudyClient(f"127.0.0.1:{server.port}", USERNAME, "wrong")
+
+    assert await client.authenticate() is False
+    assert emulator.stats.failed_logins == 1
+    await client.async_close()
+
+
+@pytest.mark.parametrize("expired_answer", [403, 200])
+async def test_expired_session_logs_in_again(socket_enabled, aiohttp_server, expired_answer):
+    emulator, client = await _start(aiohttp_server, "AP1300", expired_answer=expired_answer)
+    api = CudyApi(client)
+    first = await api.get_data()
+
+    emulator.expire_sessions()
+    client.restore_session(client.sysauth)  # unverified, like after a restart
+    second = await api.get_data()
+
+    assert second == first
+    assert emulator.stats.logins == 2
+    assert emulator.stats.rejected >= 1
+    await client.async_close()
+
+
+async def test_latency_and_connection_cap(socket_enabled, aiohttp_server):
+    emulator, client = await _start(
+        aiohttp_server, "AP1300", latency=0.02, jitter=0.01, max_concurrent=2
+    )
+    api = CudyApi(client, max_concurrent_requests=6)
+
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    data = await api.get_data()
+
+    assert MODULE_SYSTEM in data
+    assert emulator.stats.peak_in_flight <= 2
+    assert loop.time() - started >= 0.01 * emulator.stats.requests / 2
+    await client.async_close()
+
+
+async def test_injected_errors_drop_modules_not_the_poll(socket_enabled, aiohttp_server):
+    emulator, client = await _start(aiohttp_server, "AP1300", error_rate=0.5, seed=3)
+
+    data = await CudyApi(client).get_data()
+
+    assert emulator.stats.errors > 0
+    assert isinstance(data, dict)
+    await client.async_close()
+
+
+async def test_injected_errors_do_not_shrink_capabilities(socket_enabled, aiohttp_server):
+    _emulator, clean = await _start(aiohttp_server, "AP1300")
+    flaky_emulator, flaky = await _start(aiohttp_server, "AP1300", error_rate=0.3, seed=3)
+    clean_api, flaky_api = CudyApi(clean), CudyApi(flaky)
+
+    await clean_api.get_data()
+    await flaky_api.get_data()
+
+    assert flaky_emulator.stats.errors > 0
+    assert flaky_api.capabilities >= clean_api.capabilities
+    await clean.async_close()
+    await flaky.async_close()
+
+
+async def test_request_timings_bytes_and_relogins(socket_enabled, aiohttp_server):
+    emulator, client = await _start(aiohttp_server, "AP1300", latency=0.01)
+    api = CudyApi(client)
+    await api.get_data()
+
+    emulator.expire_sessions()
+    await api.get_data()
+
+    metrics = api.metrics
+    assert metrics.polls == 2
+    # the first request after the expiry logged in again, the others waited for it
+    assert metrics.relogins == 1
+    assert metrics.phases["ttfb"].p50 >= 0.01
+    assert metrics.phases["connect"].p95 > 0
+    assert metrics.phases["login"].p95 > 0
+    assert metrics.poll_bytes.p50 > 10_000
+    system = metrics.modules[MODULE_SYSTEM]
+    assert system.requests == 2
+    assert system.bytes.p50 > 0
+    assert len(system.phases["parse"]) == 1  # unchanged the second time
+    await client.async_close()
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+from custom_components.hass_cudy_router.const import *
+from custom_components.hass_cudy_router.metrics import PollMetrics, RequestTiming, RollingStat
+
+
+def test_rolling_stat_percentiles_over_window():
+    stat = RollingStat(window=20)
+    assert stat.p50 is None
+
+    for value in range(1, 41):
+        stat.add(value)
+
+    # only 21..40 are left
+    assert len(stat) == 20
+    assert stat.p50 == 30
+    assert stat.p95 == 39
+    assert stat.percentile(100) == 40
+
+
+def test_poll_metrics_sensor_values_in_ms():
+    metrics = PollMetrics()
+    for ttfb in (0.010, 0.020, 0.200):
+        metrics.record_request(MODULE_SYSTEM, RequestTiming(ttfb=ttfb, bytes=1000))
+    metrics.record_request(MODULE_LAN, RequestTiming(ttfb=0.01, bytes=500, relogins=1))
+    metrics.record_parse(MODULE_SYSTEM, 0.004)
+    metrics.record_poll(0.25, 3500)
+
+    values = metrics.sensor_values()
+
+    assert values[SENSOR_POLL_DURATION_P50] == 250.0
+    assert values[SENSOR_REQUEST_TTFB_P95] == 200.0
+    assert values[SENSOR_PARSE_TIME_P95] == 4.0
+    assert values[SENSOR_POLL_BYTES_P50] == 3500
+    assert values[SENSOR_RELOGINS] == 1
+    assert values[SENSOR_POLL_PHASES]["ttfb"] == {"count": 4, "p50": 10.0, "p95": 200.0}
+
+    per_module = metrics.as_dict()["modules"]
+    assert per_module[MODULE_SYSTEM]["requests"] == 3
+    assert per_module[MODULE_LAN]["relogins"] == 1
+    assert per_module[MODULE_LAN]["phases_ms"]["parse"]["count"] == 0
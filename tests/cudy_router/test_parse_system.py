@@ -1,6 +1,7 @@
 import pytest
 
 from custom_components.hass_cudy_router.const import *
+from custom_components.hass_cudy_router import parser
 from custom_components.hass_cudy_router.parser import parse_module_by_sensors
 from tests.cudy_router.fixtures import read_html, html_exists
 
@@ -16,4 +17,33 @@ async def test_parse_system(model: str):
             for sensor in sensors:
                 sensor_key = sensor[SENSORS_KEY_KEY]
                 assert sensor_key in data
-                assert data[sensor_key] != 'n/a'
\ No newline at end of file
+                assert data[sensor_key] != 'n/a'
+
+@pytest.mark.parametrize("module_key", [MODULE_SYSTEM, MODULE_DEVICES])
+def test_parse_html_builds_one_dom(monkeypatch, module_key: str):
+    calls = []
+    original = parser.make_soup
+
+    def _counting(html):
+        calls.append(html)
+        return original(html)
+
+    monkeypatch.setattr(parser, "make_soup", _counting)
+
+    parser.parse_html(module_key, read_html("AP1300", f"{module_key}.html"))
+
+    assert len(calls) == 1
+
+
+def test_parse_module_by_sensors_label_precedence(monkeypatch):
+    # "Model Name" is the second label of the model sensor, "Model" the first
+    kv = {"Model Name": "second", "MODEL": "upper", "model": "lower"}
+    monkeypatch.setattr(parser, "extract_kv_pairs", lambda doc: kv)
+
+    data = parse_module_by_sensors(MODULE_SYSTEM, "<html/>")
+    assert data[SENSOR_SYSTEM_MODEL] == "lower"
+
+    kv["Model"] = "exact"
+    data = parse_module_by_sensors(MODULE_SYSTEM, "<html/>")
+    assert data[SENSOR_SYSTEM_MODEL] == "exact"
+    assert set(data) == {spec[SENSORS_KEY_KEY] for spec in SENSORS[MODULE_SYSTEM]}
@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+import pytest
+
+from custom_components.hass_cudy_router import parser
+from tests.cudy_router.fixtures import BASE
+
+MODEL_FOLDERS = sorted(p.name for p in BASE.iterdir() if p.is_dir())
+
+
+def _parse_folder(model: str) -> dict[str, object]:
+    return {
+        page.stem: parser.parse_html(page.stem, page.read_text(encoding="utf-8", errors="ignore"))
+        for page in sorted((BASE / model).glob("*.html"))
+    }
+
+
+def test_backend_selected_once():
+    assert parser.PARSER_BACKEND in ("lxml", "html.parser")
+
+
+@pytest.mark.parametrize("model", MODEL_FOLDERS)
+def test_lxml_backend_matches_html_parser(monkeypatch, model: str):
+    pytest.importorskip("lxml")
+
+    monkeypatch.setattr(parser, "PARSER_BACKEND", "html.parser")
+    reference = _parse_folder(model)
+
+    monkeypatch.setattr(parser, "PARSER_BACKEND", "lxml")
+    assert _parse_folder(model) == reference
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+import pytest
+
+from custom_components.hass_cudy_router.const import *
+from custom_components.hass_cudy_router.scheduler import (
+    ModuleScheduler,
+    RouterPollScheduler,
+    tier_intervals,
+)
+
+
+def _scheduler() -> ModuleScheduler:
+    return ModuleScheduler(tier_intervals({}, DEFAULT_SCAN_INTERVAL))
+
+
+def test_everything_due_initially():
+    assert _scheduler().due_modules(now=0) == list(CAPABILITY_URLS.keys())
+
+
+def test_slow_and_static_modules_skipped_until_due():
+    s = _scheduler()
+    s.mark_polled(CAPABILITY_URLS.keys(), now=0)
+
+    due = s.due_modules(now=DEFAULT_SCAN_INTERVAL)
+    assert MODULE_SYSTEM in due
+    assert MODULE_DEVICES in due
+    assert MODULE_WAN not in due
+    assert MODULE_LAN not in due
+
+    due = s.due_modules(now=DEFAULT_SCAN_INTERVAL_SLOW)
+    assert MODULE_WAN in due
+    assert MODULE_LAN not in due
+
+    due = s.due_modules(now=DEFAULT_SCAN_INTERVAL_STATIC)
+    assert MODULE_LAN in due
+
+
+def test_tier_intervals_never_faster_than_scan_interval():
+    intervals = tier_intervals(
+        {CONF_SCAN_INTERVAL_SLOW: 5, CONF_SCAN_INTERVAL_STATIC: 7200}, 60
+    )
+    assert intervals[POLL_TIER_FAST] == 60
+    assert intervals[POLL_TIER_SLOW] == 60
+    assert intervals[POLL_TIER_STATIC] == 7200
+
+
+def test_reset_makes_everything_due():
+    s = _scheduler()
+    s.mark_polled(CAPABILITY_URLS.keys(), now=0)
+    s.reset()
+    assert s.due_modules(now=1) == list(CAPABILITY_URLS.keys())
+
+
+def test_router_polls_are_spread_over_the_interval():
+    scheduler = RouterPollScheduler()
+    for entry_id in ("a", "b", "c", "d"):
+        scheduler.register(entry_id, 40)
+
+    offsets = sorted(scheduler.offset(e) for e in ("a", "b", "c", "d"))
+    assert offsets == [0.0, 10.0, 20.0, 30.0]
+
+    # the order only depends on the entry ids
+    again = RouterPollScheduler()
+    for entry_id in ("d", "c", "b", "a"):
+        again.register(entry_id, 40)
+    assert all(again.offset(e) == scheduler.offset(e) for e in "abcd")
+
+
+def test_router_slot_delay_and_unregister():
+    scheduler = RouterPollScheduler()
+    unregister_a = scheduler.register("a", 30)
+    scheduler.register("b", 30)
+    offset_b = scheduler.offset("b")
+
+    # just after the slot: wait a whole interval, never poll twice in a row
+    assert scheduler.delay_to_next_slot("b", now=offset_b + 300.5) == pytest.approx(29.5)
+    assert scheduler.delay_to_next_slot("b", now=offset_b + 310) == pytest.approx(20)
+
+    unregister_a()
+    assert scheduler.offset("b") == 0.0
+    assert scheduler.delay_to_next_slot("a") is None
+
+
+async def test_router_polls_respect_global_cap_and_record_lag():
+    scheduler = RouterPollScheduler(max_concurrent=2)
+    entries = [f"e{i}" for i in range(5)]
+    for entry_id in entries:
+        scheduler.register(entry_id, 30)
+        scheduler._planned[entry_id] = time.monotonic()
+
+    running = peak = 0
+
+    async def poll(entry_id: str) -> None:
+        nonlocal running, peak
+        async with scheduler.poll(entry_id):
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.02)
+            running -= 1
+
+    await asyncio.gather(*(poll(e) for e in entries))
+
+    assert peak == 2
+    assert all(scheduler.lag[e].polls == 1 for e in entries)
+    assert max(scheduler.lag[e].last_seconds for e in entries) >= 0.03
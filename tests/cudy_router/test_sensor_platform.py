@@ -1,12 +1,21 @@
 import pytest
-from unittest.mock import MagicMock
+from datetime import timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
 
 from homeassistant.core import HomeAssistant
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.components.sensor import SCAN_INTERVAL
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    MockEntityPlatform,
+    async_fire_time_changed,
+)
 
 from custom_components.hass_cudy_router.const import *
 from custom_components.hass_cudy_router.api import CudyApi
 from custom_components.hass_cudy_router.coordinator import CudyCoordinator
+from custom_components.hass_cudy_router.sensor import CudySensor, _SensorDef
 from custom_components.hass_cudy_router.sensor import async_setup_entry as sensor_setup
 from tests.cudy_router.fixtures import html_exists, FakeClient
 
@@ -42,4 +51,86 @@ async def test_sensor_platform(hass: HomeAssistant, model: str):
 
     fw_entities = [e for e in added if getattr(e, "unique_id", "").endswith(SENSOR_SYSTEM_FIRMWARE_VERSION)]
     assert fw_entities
-    assert fw_entities[0].native_value == coordinator.data[MODULE_SYSTEM][SENSOR_SYSTEM_FIRMWARE_VERSION]
\ No newline at end of file
+    assert fw_entities[0].native_value == coordinator.data[MODULE_SYSTEM][SENSOR_SYSTEM_FIRMWARE_VERSION]
+
+@pytest.mark.asyncio
+async def test_unchanged_sensor_is_not_rewritten(hass: HomeAssistant):
+    entry = MockConfigEntry(domain=DOMAIN, data={"host": "test"}, options={})
+    entry.add_to_hass(hass)
+    api = AsyncMock()
+    api.get_data.return_value = {MODULE_SYSTEM: {SENSOR_SYSTEM_FIRMWARE_VERSION: "X"}}
+    coordinator = CudyCoordinator(hass=hass, entry=entry, api=api, host="test")
+    await coordinator.async_refresh()
+
+    sensor = CudySensor(
+        coordinator,
+        entry,
+        _SensorDef(
+            module=MODULE_SYSTEM,
+            key=SENSOR_SYSTEM_FIRMWARE_VERSION,
+            icon=None,
+            entity_category=None,
+            state_class=None,
+            translation_key=SENSOR_SYSTEM_FIRMWARE_VERSION,
+        ),
+    )
+    platform = MockEntityPlatform(hass, scan_interval=SCAN_INTERVAL)
+    await platform.async_add_entities([sensor])
+    assert not sensor.should_poll
+
+    with patch.object(sensor, "_async_write_ha_state") as write:
+        async_fire_time_changed(
+            hass, dt_util.utcnow() + SCAN_INTERVAL + timedelta(seconds=DEFAULT_SCAN_INTERVAL)
+        )
+        await hass.async_block_till_done()
+
+    assert api.get_data.await_count >= 2
+    write.assert_not_called()
+    await platform.async_reset()
+
+
+@pytest.mark.asyncio
+async def test_sensor_writes_once_when_value_and_attributes_change(hass: HomeAssistant):
+    entry = MockConfigEntry(domain=DOMAIN, data={"host": "test"}, options={})
+    entry.add_to_hass(hass)
+    api = AsyncMock()
+    api.get_data.return_value = {
+        MODULE_DEVICES: {
+            SENSOR_DEVICE_UPLOAD_TOTAL: 1.0,
+            SENSOR_DEVICE_TOP_CLIENTS: {"clients": []},
+        }
+    }
+    coordinator = CudyCoordinator(hass=hass, entry=entry, api=api, host="test")
+    await coordinator.async_refresh()
+
+    sensor = CudySensor(
+        coordinator,
+        entry,
+        _SensorDef(
+            module=MODULE_DEVICES,
+            key=SENSOR_DEVICE_UPLOAD_TOTAL,
+            icon=None,
+            entity_category=None,
+            state_class=None,
+            translation_key=SENSOR_DEVICE_UPLOAD_TOTAL,
+            attributes_key=SENSOR_DEVICE_TOP_CLIENTS,
+        ),
+    )
+    platform = MockEntityPlatform(hass, scan_interval=SCAN_INTERVAL)
+    await platform.async_add_entities([sensor])
+    assert sensor.available
+
+    api.get_data.return_value = {
+        MODULE_DEVICES: {
+            SENSOR_DEVICE_UPLOAD_TOTAL: 2.0,
+            SENSOR_DEVICE_TOP_CLIENTS: {"clients": [{"mac": "AA"}]},
+        }
+    }
+    with patch.object(sensor, "_async_write_ha_state") as write:
+        await coordinator.async_refresh()
+    assert write.call_count == 1
+
+    # the module is gone from the data: the sensor is unavailable
+    coordinator.data = {}
+    assert not sensor.available
+    await platform.async_reset()
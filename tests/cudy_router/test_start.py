@@ -5,6 +5,7 @@ from pytest_homeassistant_custom_component.common import MockConfigEntry
 
 from homeassistant.helpers import entity_registry as er
 
+from custom_components.hass_cudy_router.api import CudyApi
 from custom_components.hass_cudy_router.const import *
 
 from tests.cudy_router.fixtures import FakeClient, html_exists
@@ -55,7 +56,7 @@ async def test_platform_setup_creates_entities(
     )
 
     # Patch model detection to return the requested model
-    async def _detect_model(_client):
+    async def _detect_model(_client, **kwargs):
         return model
 
     monkeypatch.setattr(
@@ -105,4 +106,89 @@ async def test_platform_setup_creates_entities(
                 sensor = sensor_list[entity_id]
                 assert sensor
         else:
-            assert module not in data
\ No newline at end of file
+            assert module not in data
+
+
+@pytest.mark.asyncio
+async def test_setup_polls_once_and_reuses_system_page(hass, monkeypatch) -> None:
+    fake = FakeClient("AP1300")
+    paths: list[str] = []
+    get = fake.get
+
+    async def _counting_get(path: str):
+        paths.append(path)
+        return await get(path)
+
+    async def _noop(*args, **kwargs):
+        return None
+
+    setattr(fake, "get", _counting_get)
+    setattr(fake, "async_close", _noop)
+
+    monkeypatch.setattr(
+        "custom_components.hass_cudy_router.CudyClient",
+        lambda *args, **kwargs: fake,
+    )
+
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        title="Cudy Router (AP1300)",
+        data={
+            "protocol": "http",
+            "host": "192.168.1.1",
+            "username": "admin",
+            "password": "admin",
+        },
+    )
+    entry.add_to_hass(hass)
+
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    system_path = CudyApi.luci(CAPABILITY_URLS[MODULE_SYSTEM][0])
+    assert paths.count(system_path) == 1
+    assert len(paths) == len(CAPABILITY_URLS)
+    assert hass.data[DOMAIN][entry.entry_id]["integration"].model == "AP1300"
+
+
+@pytest.mark.asyncio
+async def test_options_change_reloads_entry(hass, monkeypatch) -> None:
+    clients: list[FakeClient] = []
+
+    async def _noop(*args, **kwargs):
+        return None
+
+    def _client(*args, **kwargs):
+        fake = FakeClient("AP1300")
+        setattr(fake, "async_close", _noop)
+        fake.connection_limit = kwargs.get("connection_limit")
+        clients.append(fake)
+        return fake
+
+    monkeypatch.setattr("custom_components.hass_cudy_router.CudyClient", _client)
+
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        title="Cudy Router (AP1300)",
+        data={
+            "protocol": "http",
+            "host": "192.168.1.1",
+            "username": "admin",
+            "password": "admin",
+        },
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    hass.config_entries.async_update_entry(
+        entry, options={CONF_MAX_CONCURRENT_REQUESTS: 2, CONF_SCAN_INTERVAL_SLOW: 600}
+    )
+    await hass.async_block_till_done()
+
+    assert len(clients) == 2
+    assert clients[-1].connection_limit == 2
+    assert hass.data[DOMAIN][entry.entry_id]["client"] is clients[-1]
+    coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+    assert coordinator.scheduler.interval_for(MODULE_WAN) == 600
+    await hass.config_entries.async_unload(entry.entry_id)
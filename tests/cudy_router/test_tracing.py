@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import ServiceValidationError
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.hass_cudy_router.api import CudyApi
+from custom_components.hass_cudy_router.const import *
+from custom_components.hass_cudy_router.coordinator import CudyCoordinator
+from custom_components.hass_cudy_router.services import async_setup_services
+from custom_components.hass_cudy_router.tracing import CURRENT_TRACER, PollTracer, span
+from tests.cudy_router.fixtures import FakeClient
+from tests.cudy_router.test_emulator import _start
+
+
+def _spans(trace: dict) -> list[dict]:
+    return [e for e in trace["traceEvents"] if e["ph"] == "X"]
+
+
+def _tracks(trace: dict) -> dict[int, str]:
+    return {
+        e["tid"]: e["args"]["name"] for e in trace["traceEvents"] if e["name"] == "thread_name"
+    }
+
+
+def test_span_is_a_no_op_without_tracer():
+    with span("nothing", "test"):
+        pass
+    assert CURRENT_TRACER.get() is None
+
+
+async def test_get_data_spans_over_http(socket_enabled, aiohttp_server, tmp_path):
+    _emulator, client = await _start(aiohttp_server, "AP1300", latency=0.01)
+    tracer = PollTracer(1, str(tmp_path / "trace.json"))
+    token = CURRENT_TRACER.set(tracer)
+    try:
+        await CudyApi(client, max_concurrent_requests=2).get_data()
+    finally:
+        CURRENT_TRACER.reset(token)
+        await client.async_close()
+
+    trace = json.loads(open(tracer.write(), encoding="utf-8").read())
+    spans = _spans(trace)
+    names = {e["name"] for e in spans}
+    tracks = _tracks(trace)
+
+    assert {"login", "connect", "read body", f"fetch {MODULE_SYSTEM}", f"parse {MODULE_SYSTEM}"} <= names
+    assert any(e["name"].startswith("GET /cgi-bin/luci/") and e["args"]["status"] == 200 for e in spans)
+    assert {"cudy login", MODULE_SYSTEM, "parse"} <= set(tracks.values())
+    # each page's request sits on its own track, inside its fetch span
+    fetch = next(e for e in spans if e["name"] == f"fetch {MODULE_SYSTEM}")
+    body = [e for e in spans if e["name"] == "read body" and e["tid"] == fetch["tid"]]
+    assert body and fetch["ts"] <= body[0]["ts"] <= fetch["ts"] + fetch["dur"]
+    # only two requests could be in flight at a time
+    assert any(e["name"] == "wait for request slot" and e["dur"] > 0 for e in spans)
+
+
+@pytest.mark.asyncio
+async def test_coordinator_traces_next_polls_then_stops(hass: HomeAssistant, freezer, tmp_path):
+    entry = MockConfigEntry(domain=DOMAIN, data={"host": "test"}, options={})
+    entry.add_to_hass(hass)
+    c = CudyCoordinator(hass=hass, entry=entry, api=CudyApi(FakeClient("WR3000")), host="test")
+    remove = c.async_add_key_listener(MODULE_SYSTEM, SENSOR_SYSTEM_FIRMWARE_VERSION, lambda: None)
+
+    path = tmp_path / "trace.json"
+    c.async_start_trace(2, str(path))
+    for _ in range(3):
+        await c.async_refresh()
+        await hass.async_block_till_done()
+        freezer.tick(DEFAULT_SCAN_INTERVAL)
+    remove()
+
+    assert c.tracer is None
+    spans = _spans(json.loads(path.read_text(encoding="utf-8")))
+    names = [e["name"] for e in spans]
+    assert names.count("poll") == 2
+    assert names.count("update entities") == 2
+    assert any(e["cat"] == "parse" for e in spans)
+    assert any(e["cat"] == "entity" and e["name"] != "update entities" for e in spans)
+
+
+@pytest.mark.asyncio
+async def test_trace_polls_service(hass: HomeAssistant):
+    entry = MockConfigEntry(domain=DOMAIN, data={"host": "test"}, options={})
+    entry.add_to_hass(hass)
+    c = CudyCoordinator(hass=hass, entry=entry, api=CudyApi(FakeClient("WR3000")), host="test")
+    hass.data.setdefault(DOMAIN, {})[entry.entry_id] = {"coordinator": c}
+    async_setup_services(hass)
+
+    with pytest.raises(ServiceValidationError):
+        await hass.services.async_call(
+            DOMAIN, SERVICE_TRACE_POLLS, {ATTR_ENTRY_ID: "nope"}, blocking=True
+        )
+    await hass.services.async_call(
+        DOMAIN, SERVICE_TRACE_POLLS, {ATTR_ENTRY_ID: entry.entry_id, ATTR_POLLS: 3}, blocking=True
+    )
+
+    assert c.tracer is not None
+    assert c.tracer.remaining == 3
+    assert c.tracer.path.startswith(hass.config.path(f"{DOMAIN}_trace_{entry.entry_id}_"))